@@ -15,7 +15,7 @@ Optimizations over v1:
 - Barge-in cancellation of in-flight TTS
 
 Usage:
-    pip install websockets aiohttp
+    pip install websockets aiohttp numpy
     export DEEPGRAM_API_KEY="your-key"
     export OPENAI_API_KEY="your-key"
     export ELEVENLABS_API_KEY="your-key"
@@ -27,14 +27,24 @@ from __future__ import annotations
 import asyncio
 import json
 import os
-import struct
+import socket
 import sys
 import time
+import warnings
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import aclosing
 from typing import Any
 
 import aiohttp
+import numpy as np
 import websockets
-from websockets.server import WebSocketServerProtocol
+from aiohttp import WSMsgType, web
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -58,63 +68,176 @@ be natural and concise. Don't use markdown or special formatting."""
 BOT_HOST = "0.0.0.0"
 BOT_PORT = 9000
 
+# Outbound audio is paced to real time (8kHz mulaw = 8000 bytes/sec), letting
+# at most PLAYBACK_LEAD seconds sit queued at the far end. Keeps barge-in
+# responsive and end_of_speech close to when the caller actually stops hearing us.
+MULAW_BYTES_PER_SEC = 8000
+PLAYBACK_LEAD = 0.2
+
+# Max messages waiting for the per-call writer task; bounds how far TTS can
+# run ahead of playback (and what a barge-in has to throw away)
+OUTBOUND_QUEUE_SIZE = 16
+
+# Audio reads smaller than this (60ms of mulaw) are merged with any audio
+# already waiting in the queue, so a run of small network reads goes out as
+# one WebSocket frame. Only queued audio is merged; nothing waits for more.
+OUTBOUND_MIN_FRAME_BYTES = 480
+
+# Deepgram connections kept open and ready so call pickup skips the TLS +
+# WebSocket handshake. Idle ones are kept alive with KeepAlive messages
+# (Deepgram closes a stream after ~10s without data).
+STT_POOL_SIZE = 1
+STT_KEEPALIVE_INTERVAL = 5.0
+STT_POOL_RETRY_DELAY = 2.0
+# How long a new call waits for a pooled session before connecting its own
+# (the pool may be stuck retrying while Deepgram is unreachable)
+STT_CHECKOUT_TIMEOUT = 3.0
+
+# Kernel send/receive buffer for bot connections. Audio is ~8KB/s each way,
+# so this is seconds of headroom without letting stale audio pile up.
+SOCKET_BUFFER_SIZE = 64 * 1024
+
+# ElevenLabs requests a single reply may have in flight at once. Two is
+# enough for the next sentence to synthesize while the current one plays.
+TTS_MAX_CONCURRENT = 2
+
+# TTS reads at least this big (16kHz PCM16, ~1s of audio) are converted on a
+# worker thread so a burst from ElevenLabs doesn't stall inbound audio.
+# Smaller reads convert in microseconds, less than a thread hop costs.
+ENCODE_OFFLOAD_BYTES = 32 * 1024
+
+# Largest ElevenLabs read converted per loop iteration. A read returns as
+# soon as any audio is buffered, so this only caps how much a burst is
+# handed over at once (8KB = 256ms at 16kHz); it never delays the first byte.
+TTS_READ_SIZE = 8192
+
+# The last 5ms of each utterance (16kHz PCM16) is held back and faded out,
+# so audio never stops on a non-zero sample: an audible click, especially
+# where back-to-back sentences meet.
+TTS_FADE_BYTES = 160
+
+# Caller audio is forwarded to Deepgram in 100ms batches (8kHz mu-law) rather
+# than one WebSocket frame per 20ms packet: 5x fewer frames for at most 80ms
+# of added transcription delay, well under the 200ms endpointing window.
+STT_BATCH_BYTES = 800
+
 
 # ---------------------------------------------------------------------------
-# Audio conversion helpers
+# JSON helpers
 # ---------------------------------------------------------------------------
 
-# mu-law decompression table (ITU-T G.711)
-MULAW_DECODE_TABLE = []
-for _i in range(256):
-    _i_inv = ~_i & 0xFF
-    _sign = -1 if (_i_inv & 0x80) else 1
-    _exp = (_i_inv >> 4) & 0x07
-    _mant = _i_inv & 0x0F
-    _sample = _sign * (((_mant << 1) + 33) * (1 << (_exp + 2)) - 132)
-    MULAW_DECODE_TABLE.append(max(-32768, min(32767, _sample)))
-
-
-def mulaw_to_pcm16(mulaw_bytes: bytes) -> bytes:
-    """Convert mu-law bytes to signed 16-bit PCM (little-endian)."""
-    samples = [MULAW_DECODE_TABLE[b] for b in mulaw_bytes]
-    return struct.pack(f"<{len(samples)}h", *samples)
-
-
-def pcm16_to_mulaw(pcm_bytes: bytes) -> bytes:
-    """Convert signed 16-bit PCM (little-endian) to mu-law."""
-    n_samples = len(pcm_bytes) // 2
-    samples = struct.unpack(f"<{n_samples}h", pcm_bytes)
-    result = bytearray(n_samples)
-    for i, sample in enumerate(samples):
-        sign = 0x80 if sample >= 0 else 0
-        if sample < 0:
-            sample = -sample
-        sample = min(sample, 32635)
-        sample += 0x84
-
-        exponent = 7
-        exp_mask = 0x4000
-        while exponent > 0:
-            if sample & exp_mask:
-                break
-            exponent -= 1
-            exp_mask >>= 1
+# Every control message and streamed token goes through these; orjson (C)
+# when installed, stdlib otherwise. orjson.JSONDecodeError subclasses
+# json.JSONDecodeError, so callers catch the stdlib exception either way.
+if orjson is not None:
+    json_loads = orjson.loads
+
+    def json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
 
-        mantissa = (sample >> (exponent + 3)) & 0x0F
-        mulaw_byte = ~(sign | (exponent << 4) | mantissa) & 0xFF
-        result[i] = mulaw_byte
+else:
+    json_loads = json.loads
+    json_dumps = json.dumps
 
-    return bytes(result)
+# Fixed control messages, encoded once
+KEEPALIVE_MSG = json_dumps({"type": "KeepAlive"})
+CLOSE_STREAM_MSG = json_dumps({"type": "CloseStream"})
+END_OF_SPEECH_MSG = json_dumps({"type": "end_of_speech"})
+
+
+# ---------------------------------------------------------------------------
+# Audio conversion helpers
+# ---------------------------------------------------------------------------
+
+# PCM16 -> G.711 mu-law for TTS audio (caller audio goes to Deepgram as
+# mu-law, undecoded). CPython's audioop does this in C; it was removed
+# from the stdlib in Python 3.13, where we use the Numba-compiled codec in
+# voice_bot_codec_numba.py if numba is installed, else NumPy lookup tables.
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop
+except ImportError:
+    audioop = None
+
+voice_bot_codec_numba = None
+if audioop is None:
+    try:
+        import voice_bot_codec_numba
+    except ImportError:
+        pass
+
+
+if audioop is not None:
+
+    def pcm16_to_mulaw(pcm_bytes: bytes) -> bytes:
+        """Convert signed 16-bit PCM (little-endian) to mu-law."""
+        return audioop.lin2ulaw(pcm_bytes, 2)
+
+    def _encode_samples(samples: np.ndarray) -> bytes:
+        """Encode an int16 array (any stride) to mu-law."""
+        return audioop.lin2ulaw(samples.tobytes(), 2)
+
+elif voice_bot_codec_numba is not None:
+
+    # The kernel fills the returned bytearray in place through a NumPy view,
+    # so there is no separate ndarray -> bytes copy per frame
+
+    def _encode_samples(samples: np.ndarray) -> bytearray:
+        """Encode an int16 array (any stride) to mu-law."""
+        mulaw = bytearray(len(samples))
+        voice_bot_codec_numba.encode_into(samples, np.frombuffer(mulaw, dtype=np.uint8))
+        return mulaw
+
+    def pcm16_to_mulaw(pcm_bytes: bytes) -> bytes:
+        """Convert signed 16-bit PCM (little-endian) to mu-law."""
+        return _encode_samples(np.frombuffer(pcm_bytes, dtype="<i2", count=len(pcm_bytes) // 2))
+
+else:
+    # mu-law compression table indexed by the sample's uint16 bit pattern
+    # (64KB), computed for all 65536 values at once. The segment (exponent)
+    # is the top set bit of the biased magnitude's bits 7-14, found by
+    # counting thresholds rather than a per-sample bit-scan loop.
+    _pcm = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32)
+    _biased = np.minimum(np.abs(_pcm), 32635) + 0x84
+    _exponent = sum(((_biased >> 7) >= (1 << _k)).astype(np.int32) for _k in range(1, 8))
+    _mantissa = (_biased >> (_exponent + 3)) & 0x0F
+    _MULAW_ENCODE_LUT = (
+        ~(np.where(_pcm < 0, 0x80, 0) | (_exponent << 4) | _mantissa) & 0xFF
+    ).astype(np.uint8)
+    del _pcm, _biased, _exponent, _mantissa
+
+    def _encode_samples(samples: np.ndarray) -> bytes:
+        """Encode an int16 array (any stride) to mu-law."""
+        return _MULAW_ENCODE_LUT[samples.view(np.uint16)].tobytes()
+
+    def pcm16_to_mulaw(pcm_bytes: bytes) -> bytes:
+        """Convert signed 16-bit PCM (little-endian) to mu-law."""
+        return _encode_samples(np.frombuffer(pcm_bytes, dtype="<i2", count=len(pcm_bytes) // 2))
 
 
 def downsample_16k_to_8k(pcm16_data: bytes) -> bytes:
     """Simple 2:1 downsampling from 16kHz to 8kHz PCM16."""
-    n_samples = len(pcm16_data) // 2
-    if n_samples == 0:
-        return b""
-    samples = struct.unpack(f"<{n_samples}h", pcm16_data)
-    downsampled = samples[::2]
-    return struct.pack(f"<{len(downsampled)}h", *downsampled)
+    samples = np.frombuffer(pcm16_data, dtype="<i2", count=len(pcm16_data) // 2)
+    return samples[::2].tobytes()
+
+
+def fade_out(pcm16_data: bytes) -> bytes:
+    """Linearly ramp PCM16 down to silence; a trailing half sample is dropped."""
+    samples = np.frombuffer(pcm16_data, dtype="<i2", count=len(pcm16_data) // 2)
+    ramp = np.linspace(1.0, 0.0, len(samples))
+    return (samples * ramp).astype("<i2").tobytes()
+
+
+def encode_tts_audio(pcm16_16k: bytes | memoryview) -> bytes:
+    """Convert 16kHz PCM16 from ElevenLabs to 8kHz mu-law for the call.
+
+    Decimation and encoding are fused: the encoder reads every other sample
+    straight out of the input through a strided view, so no intermediate
+    8kHz PCM buffer is built (except for audioop, which needs bytes).
+    """
+    samples = np.frombuffer(pcm16_16k, dtype="<i2", count=len(pcm16_16k) // 2)
+    return _encode_samples(samples[::2])
 
 
 # ---------------------------------------------------------------------------
@@ -123,15 +246,52 @@ def downsample_16k_to_8k(pcm16_data: bytes) -> bytes:
 
 _http_session: aiohttp.ClientSession | None = None
 
+# Hosts whose first request per call is latency-critical (greeting TTS, first
+# LLM turn). Deepgram is covered separately by the pre-connected STT pool.
+WARM_URLS = ("https://api.openai.com/", "https://api.elevenlabs.io/")
+
 
 async def get_http_session() -> aiohttp.ClientSession:
     """Get or create a shared aiohttp session (reuses TCP + TLS)."""
     global _http_session
     if _http_session is None or _http_session.closed:
-        _http_session = aiohttp.ClientSession()
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=32,
+                limit_per_host=8,
+                keepalive_timeout=60,
+                ttl_dns_cache=600,  # default is 10s; these hosts don't move
+            ),
+        )
     return _http_session
 
 
+async def warm_http_connections() -> None:
+    """Open a pooled connection to each API host ahead of the first request.
+
+    A small GET to the host root pays the TCP + TLS handshake now; reading
+    its (tiny error) body to the end returns a keep-alive connection to the
+    shared pool for the real POST. (A HEAD is not reliably pooled when the
+    reply lacks a body length.) Failures are ignored; the real request will
+    just connect on its own.
+    """
+    session = await get_http_session()
+
+    async def _warm(url: str) -> None:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as resp:
+            await resp.read()
+
+    await asyncio.gather(*(_warm(url) for url in WARM_URLS), return_exceptions=True)
+
+
+async def close_http_session() -> None:
+    """Close the shared aiohttp session and its pooled connections."""
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
+
 # ---------------------------------------------------------------------------
 # Deepgram STT (streaming)
 # ---------------------------------------------------------------------------
@@ -144,12 +304,15 @@ class DeepgramSTT:
         self.ws: Any = None
         self.transcript_queue: asyncio.Queue[str] = asyncio.Queue()
         self._running = False
+        self._last_send = 0.0
+        self._recv_task: asyncio.Task | None = None
+        self._keepalive_task: asyncio.Task | None = None
 
     async def connect(self) -> None:
         """Open a streaming connection to Deepgram."""
         url = (
             "wss://api.deepgram.com/v1/listen"
-            "?encoding=linear16"
+            "?encoding=mulaw"        # caller audio as-is, no decode
             "&sample_rate=8000"
             "&channels=1"
             "&punctuate=true"
@@ -159,24 +322,57 @@ class DeepgramSTT:
             "&smart_format=true"
         )
         headers = {"Authorization": f"Token {self.api_key}"}
-        self.ws = await websockets.connect(url, additional_headers=headers)
+        self.ws = await websockets.connect(url, additional_headers=headers, compression=None)
         self._running = True
-        asyncio.create_task(self._recv_loop())
+        self._last_send = time.monotonic()
+        # Keep references: the event loop only holds tasks weakly, so an
+        # unreferenced recv loop could be garbage-collected mid-call
+        self._recv_task = asyncio.create_task(self._recv_loop(), name="deepgram-recv")
+        self._keepalive_task = asyncio.create_task(
+            self._keepalive_loop(), name="deepgram-keepalive"
+        )
         print("[Deepgram] Connected (endpointing=200ms)")
 
-    async def send_audio(self, pcm16_bytes: bytes) -> None:
-        """Send PCM16 audio to Deepgram."""
+    @property
+    def is_open(self) -> bool:
+        return self._running
+
+    async def send_audio(self, mulaw_bytes: bytes | bytearray | memoryview) -> None:
+        """Send 8kHz mu-law audio to Deepgram."""
         if self.ws and self._running:
             try:
-                await self.ws.send(pcm16_bytes)
+                await self.ws.send(mulaw_bytes)
+                self._last_send = time.monotonic()
             except Exception:
                 pass
 
+    async def _keepalive_loop(self) -> None:
+        """Keep the stream open while no audio is flowing (e.g. pooled, idle)."""
+        try:
+            while self._running:
+                await asyncio.sleep(STT_KEEPALIVE_INTERVAL)
+                if time.monotonic() - self._last_send >= STT_KEEPALIVE_INTERVAL:
+                    await self.ws.send(KEEPALIVE_MSG)
+                    self._last_send = time.monotonic()
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            pass
+
     async def _recv_loop(self) -> None:
         """Receive transcripts from Deepgram."""
         try:
-            async for msg in self.ws:
-                data = json.loads(msg)
+            while True:
+                # Take text frames as raw bytes: the JSON parser reads UTF-8
+                # itself, so decoding each frame to str first is wasted work
+                msg = await self.ws.recv(decode=False)
+
+                # Skip Metadata, SpeechStarted, etc. without parsing them.
+                # A substring test is tolerant of whitespace in the JSON;
+                # the type check below still decides.
+                if b'"Results"' not in msg:
+                    continue
+                data = json_loads(msg)
                 if data.get("type") == "Results":
                     # Only use final results (is_final=true)
                     if not data.get("is_final", False):
@@ -188,6 +384,8 @@ class DeepgramSTT:
                         if transcript:
                             print(f"[Deepgram] Final: {transcript}")
                             await self.transcript_queue.put(transcript)
+        except websockets.exceptions.ConnectionClosedOK:
+            pass
         except Exception as e:
             if self._running:
                 print(f"[Deepgram] Recv error: {e}")
@@ -196,12 +394,16 @@ class DeepgramSTT:
 
     async def close(self) -> None:
         self._running = False
+        if self._keepalive_task:
+            self._keepalive_task.cancel()
         if self.ws:
             try:
-                await self.ws.send(json.dumps({"type": "CloseStream"}))
+                await self.ws.send(CLOSE_STREAM_MSG)
                 await self.ws.close()
             except Exception:
                 pass
+        if self._recv_task:
+            self._recv_task.cancel()
 
 
 # ---------------------------------------------------------------------------
@@ -218,9 +420,28 @@ class OpenAILLM:
     def __init__(self, api_key: str, model: str = "gpt-4o-mini"):
         self.api_key = api_key
         self.model = model
-        self.conversation: list[dict[str, str]] = [
-            {"role": "system", "content": SYSTEM_PROMPT}
-        ]
+        self.system_message = {"role": "system", "content": SYSTEM_PROMPT}
+
+        # Fixed per bot; only the messages change between turns. The body
+        # is spliced as '{"messages":<messages>,' + the rest of the options.
+        self._url = "https://api.openai.com/v1/chat/completions"
+        self._headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+        self._body_rest = json_dumps({
+            "model": model,
+            "max_tokens": 150,
+            "temperature": 0.7,
+            "stream": True,  # ← KEY: enable streaming
+        })[1:]
+        # Rolling window of recent turns; old messages fall off the front
+        # as new ones are appended, keeping context (and the request) small
+        self.conversation: deque[dict[str, str]] = deque(maxlen=10)
+
+    def reset(self) -> None:
+        """Forget the conversation (the system prompt stays)."""
+        self.conversation.clear()
 
     async def stream_response(self, user_text: str):
         """Yield text chunks as they stream from OpenAI.
@@ -230,46 +451,32 @@ class OpenAILLM:
         """
         self.conversation.append({"role": "user", "content": user_text})
 
-        # Keep conversation short to avoid context bloat
-        if len(self.conversation) > 20:
-            self.conversation = [self.conversation[0]] + self.conversation[-10:]
-
-        url = "https://api.openai.com/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-        payload = {
-            "model": self.model,
-            "messages": self.conversation,
-            "max_tokens": 150,
-            "temperature": 0.7,
-            "stream": True,  # ← KEY: enable streaming
-        }
+        messages = [self.system_message, *self.conversation]
+        body = '{"messages":' + json_dumps(messages) + "," + self._body_rest
 
         full_response = ""
         session = await get_http_session()
 
         try:
-            async with session.post(url, json=payload, headers=headers) as resp:
+            # Encoded with json_dumps (orjson when installed) rather than
+            # aiohttp's stdlib json=; the history is most of the body
+            async with session.post(self._url, data=body, headers=self._headers) as resp:
                 if resp.status != 200:
                     error_text = await resp.text()
                     print(f"[OpenAI] Error {resp.status}: {error_text}")
                     yield "Sorry, I had trouble thinking of a response."
                     return
 
-                # Parse SSE stream
+                # Parse SSE stream. The framing is ASCII, so match it on the
+                # raw bytes and hand the payload to the JSON parser as bytes
+                # (the trailing newline is just whitespace to it)
                 async for line in resp.content:
-                    line = line.decode("utf-8").strip()
-                    if not line.startswith("data: "):
+                    if not line.startswith(b"data: "):
                         continue
-                    data_str = line[6:]  # strip "data: "
-                    if data_str == "[DONE]":
+                    if line.startswith(b"data: [DONE]"):
                         break
                     try:
-                        data = json.loads(data_str)
-                        delta = data["choices"][0].get("delta", {})
-                        token = delta.get("content", "")
+                        token = json_loads(line[6:])["choices"][0]["delta"].get("content")
                         if token:
                             full_response += token
                             yield token
@@ -293,7 +500,7 @@ class ElevenLabsTTS:
     """Streaming text-to-speech via ElevenLabs.
 
     Instead of buffering the entire audio response, this streams chunks
-    back as they arrive from ElevenLabs, converting and sending each one
+    back as they arrive from ElevenLabs, converting and yielding each one
     immediately. This cuts TTS latency from ~1.5s to ~300ms.
     """
 
@@ -301,34 +508,37 @@ class ElevenLabsTTS:
         self.api_key = api_key
         self.voice_id = voice_id
 
-    async def synthesize_streaming(self, text: str, ws, cancel_event: asyncio.Event):
-        """Stream TTS audio directly to VoxBridge WebSocket as it arrives.
-
-        Args:
-            text: Text to synthesize
-            ws: WebSocket to send audio chunks to
-            cancel_event: Set this to cancel mid-stream (barge-in)
-
-        Returns:
-            True if completed, False if cancelled
-        """
-        url = (
-            f"https://api.elevenlabs.io/v1/text-to-speech/{self.voice_id}/stream"
+        # Everything but the text is fixed, so build it once. The body is
+        # spliced as '{"text":<text>,' + the rest of the settings object.
+        self._url = (
+            f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream"
             f"?output_format=pcm_16000"
             f"&optimize_streaming_latency=3"  # ← Aggressive latency optimization
         )
-        headers = {
-            "xi-api-key": self.api_key,
+        self._headers = {
+            "xi-api-key": api_key,
             "Content-Type": "application/json",
         }
-        payload = {
-            "text": text,
+        self._body_rest = json_dumps({
             "model_id": "eleven_turbo_v2",
             "voice_settings": {
                 "stability": 0.5,
                 "similarity_boost": 0.75,
             },
-        }
+        })[1:]
+
+    async def synthesize(self, text: str) -> AsyncIterator[bytes]:
+        """Stream TTS audio as 8kHz mu-law chunks as it arrives.
+
+        Everything received from ElevenLabs in one network read is converted
+        and yielded as a single mu-law chunk, so playback starts on the first
+        HTTP chunk and the caller sends one WebSocket frame per read instead
+        of one per 20ms. Errors are logged and end the stream early.
+
+        Args:
+            text: Text to synthesize
+        """
+        body = '{"text":' + json_dumps(text) + "," + self._body_rest
 
         session = await get_http_session()
         total_bytes = 0
@@ -336,68 +546,64 @@ class ElevenLabsTTS:
         first_chunk = True
 
         try:
-            async with session.post(url, json=payload, headers=headers) as resp:
+            async with session.post(self._url, data=body, headers=self._headers) as resp:
                 if resp.status != 200:
                     error_text = await resp.text()
                     print(f"[ElevenLabs] Error {resp.status}: {error_text}")
-                    return False
-
-                # Buffer for accumulating PCM data for aligned processing
-                pcm_buffer = b""
+                    return
 
-                async for chunk in resp.content.iter_chunked(4096):
-                    # Check for barge-in cancellation
-                    if cancel_event.is_set():
-                        print("[ElevenLabs] Cancelled (barge-in)")
-                        return False
+                # Bytes held over from the previous read: the fade-out tail
+                # plus anything short of a whole pair of samples
+                pcm_carry = b""
 
+                async for chunk in resp.content.iter_chunked(TTS_READ_SIZE):
                     if first_chunk:
                         elapsed = (time.monotonic() - t_start) * 1000
                         print(f"[ElevenLabs] First audio chunk in {elapsed:.0f}ms")
                         first_chunk = False
 
-                    pcm_buffer += chunk
-
-                    # Process in 640-byte blocks (20ms at 16kHz, 16-bit)
-                    # which becomes 320 bytes at 8kHz → 160 mulaw bytes (20ms)
-                    block_size = 640
-                    while len(pcm_buffer) >= block_size:
-                        block = pcm_buffer[:block_size]
-                        pcm_buffer = pcm_buffer[block_size:]
-
-                        # Downsample 16kHz → 8kHz
-                        pcm_8k = downsample_16k_to_8k(block)
-                        # Convert to mulaw
-                        mulaw_chunk = pcm16_to_mulaw(pcm_8k)
-                        total_bytes += len(mulaw_chunk)
-
-                        try:
-                            await ws.send(mulaw_chunk)
-                        except Exception:
-                            return False
-
-                # Flush remaining buffer
-                if pcm_buffer and not cancel_event.is_set():
-                    # Pad to even sample count
-                    if len(pcm_buffer) % 2 != 0:
-                        pcm_buffer += b"\x00"
-                    pcm_8k = downsample_16k_to_8k(pcm_buffer)
-                    if pcm_8k:
-                        mulaw_chunk = pcm16_to_mulaw(pcm_8k)
+                    if pcm_carry:
+                        chunk = pcm_carry + chunk
+
+                    # Convert whole pairs of 16kHz samples (4 bytes → 1 mulaw
+                    # byte) so 2:1 decimation stays in phase across reads,
+                    # holding back at least TTS_FADE_BYTES in case this is the
+                    # end of the stream. Slicing a view converts in place.
+                    view = memoryview(chunk)
+                    ready = (len(view) - TTS_FADE_BYTES) // 4 * 4
+                    if ready <= 0:
+                        pcm_carry = bytes(view)
+                        continue
+                    pcm_carry = bytes(view[ready:])
+                    block = view[:ready]
+
+                    # Downsample 16kHz → 8kHz, then convert to mulaw;
+                    # large bursts go to the default thread pool
+                    if len(block) >= ENCODE_OFFLOAD_BYTES:
+                        mulaw_chunk = await asyncio.get_running_loop().run_in_executor(
+                            None, encode_tts_audio, block
+                        )
+                    else:
+                        mulaw_chunk = encode_tts_audio(block)
+                    total_bytes += len(mulaw_chunk)
+                    yield mulaw_chunk
+
+                # Flush the held-back tail, faded to silence
+                if pcm_carry:
+                    mulaw_chunk = encode_tts_audio(fade_out(pcm_carry))
+                    if mulaw_chunk:
                         total_bytes += len(mulaw_chunk)
-                        try:
-                            await ws.send(mulaw_chunk)
-                        except Exception:
-                            return False
+                        yield mulaw_chunk
 
         except Exception as e:
-            print(f"[ElevenLabs] Stream error: {e}")
-            return False
+            # Timeouts and mid-stream failures end this sentence's audio
+            # rather than the turn; cancellation (barge-in) still propagates
+            print(f"[ElevenLabs] Stream error: {e!r}")
+            return
 
         elapsed = (time.monotonic() - t_start) * 1000
         duration_ms = (total_bytes / 8000) * 1000  # 8kHz mulaw = 8000 bytes/sec
         print(f"[ElevenLabs] Streamed {total_bytes} bytes ({duration_ms:.0f}ms audio) in {elapsed:.0f}ms")
-        return True
 
 
 # ---------------------------------------------------------------------------
@@ -413,42 +619,121 @@ class VoiceBot:
     - Sentence-level TTS: starts speaking the first sentence while LLM
       is still generating the rest
     - Streaming TTS: audio plays as ElevenLabs generates it (no buffering)
-    - Barge-in aware: cancels in-flight TTS when caller interrupts
+    - Barge-in aware: cancels the in-flight turn (LLM + TTS requests) and
+      drops queued audio the moment the caller interrupts
+    - Pre-connected Deepgram sessions: call pickup skips the wss handshake
     """
 
     def __init__(self):
-        self.stt = DeepgramSTT(DEEPGRAM_API_KEY)
+        self.stt: DeepgramSTT | None = None
         self.llm = OpenAILLM(OPENAI_API_KEY, OPENAI_MODEL)
         self.tts = ElevenLabsTTS(ELEVENLABS_API_KEY, ELEVENLABS_VOICE_ID)
-        self._cancel_tts = asyncio.Event()
-        self._is_speaking = False
+        self._turn_task: asyncio.Task | None = None  # greeting or reply being spoken
+        self._playback_deadline = 0.0  # loop time when queued audio finishes playing
+        self._out_q: asyncio.Queue[bytes | str] = asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
+        self._stt_pool: asyncio.Queue[DeepgramSTT] = asyncio.Queue()
+        self._stt_slots = asyncio.Semaphore(STT_POOL_SIZE)
+        self._stt_pool_task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Start pre-connecting Deepgram sessions and warm the HTTP pool."""
+        self._stt_pool_task = asyncio.create_task(self._maintain_stt_pool(), name="stt-pool")
+        await warm_http_connections()
+
+    async def close(self) -> None:
+        """Stop the STT pool and close any idle pre-connected sessions."""
+        if self._stt_pool_task:
+            self._stt_pool_task.cancel()
+        while not self._stt_pool.empty():
+            await self._stt_pool.get_nowait().close()
+
+    async def _maintain_stt_pool(self) -> None:
+        """Keep STT_POOL_SIZE connected Deepgram sessions ready in the pool."""
+        try:
+            while True:
+                await self._stt_slots.acquire()
+                stt = DeepgramSTT(DEEPGRAM_API_KEY)
+                try:
+                    await stt.connect()
+                except Exception as e:
+                    print(f"[Deepgram] Pre-connect failed: {e}")
+                    self._stt_slots.release()
+                    await asyncio.sleep(STT_POOL_RETRY_DELAY)
+                    continue
+                self._stt_pool.put_nowait(stt)
+        except asyncio.CancelledError:
+            pass
+
+    async def _checkout_stt(self) -> DeepgramSTT:
+        """Take a ready Deepgram session from the pool (one call uses it, then closes it).
+
+        Falls back to connecting a session directly if none is ready within
+        STT_CHECKOUT_TIMEOUT; that connect raises if Deepgram is unreachable.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + STT_CHECKOUT_TIMEOUT
+        while True:
+            try:
+                stt = await asyncio.wait_for(self._stt_pool.get(), deadline - loop.time())
+            except asyncio.TimeoutError:
+                break
+            self._stt_slots.release()
+            if stt.is_open:
+                return stt
+            await stt.close()
+
+        print(f"[Deepgram] No pooled session after {STT_CHECKOUT_TIMEOUT:.0f}s, connecting directly")
+        stt = DeepgramSTT(DEEPGRAM_API_KEY)
+        await stt.connect()
+        return stt
 
-    async def handle_connection(self, ws: WebSocketServerProtocol) -> None:
+    async def handle_connection(self, request: web.Request) -> web.WebSocketResponse:
         """Handle a single call from VoxBridge."""
+        # Audio frames are small and already compressed, so skip
+        # permessage-deflate; bound frame size
+        ws = web.WebSocketResponse(compress=False, max_msg_size=2**20, heartbeat=20)
+        await ws.prepare(request)
+
         print("\n" + "=" * 60)
         print("[Bot] New call connected!")
         print("=" * 60)
 
         # Reset state for this call
-        self._cancel_tts.clear()
-        self._is_speaking = False
+        self._turn_task = None
+        self._playback_deadline = 0.0
+        self._out_q = asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
 
-        # Connect to Deepgram STT
-        await self.stt.connect()
+        # Pooled HTTP connections may have idled out since the last call;
+        # reopen them while the greeting starts and the caller first speaks
+        warm_task = asyncio.create_task(warm_http_connections(), name="warm-http")
+
+        # Take a pre-connected Deepgram session; the pool reconnects a spare
+        try:
+            self.stt = await self._checkout_stt()
+        except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+            print(f"[Bot] Deepgram unavailable, dropping call: {e}")
+            await ws.close()
+            return ws
 
-        # Start the response pipeline
-        response_task = asyncio.create_task(self._response_loop(ws))
+        # Single writer owns the socket's send side; start the response pipeline
+        writer_task = asyncio.create_task(self._writer_loop(ws), name="bot-writer")
+        response_task = asyncio.create_task(self._response_loop(), name="bot-response")
+
+        # Caller audio waiting to go to Deepgram as one STT_BATCH_BYTES frame
+        stt_batch = bytearray()
 
         try:
             async for message in ws:
-                if isinstance(message, bytes):
+                if message.type == WSMsgType.BINARY:
                     # Raw audio from VoxBridge (mulaw 8kHz)
-                    pcm16 = mulaw_to_pcm16(message)
-                    await self.stt.send_audio(pcm16)
+                    stt_batch += message.data
+                    if len(stt_batch) >= STT_BATCH_BYTES:
+                        await self.stt.send_audio(bytes(stt_batch))
+                        stt_batch.clear()
 
-                elif isinstance(message, str):
+                elif message.type == WSMsgType.TEXT:
                     try:
-                        msg = json.loads(message)
+                        msg = json_loads(message.data)
                         msg_type = msg.get("type", "")
 
                         if msg_type == "start":
@@ -460,8 +745,9 @@ class VoiceBot:
                             if sip_headers:
                                 print(f"[Bot] SIP Headers: {sip_headers}")
 
-                            # Send a greeting (streamed!)
-                            await self._speak(ws, "Hello! How can I help you today?")
+                            # Send a greeting (streamed!) without holding up
+                            # inbound audio while it plays
+                            self._start_turn(self._speak("Hello! How can I help you today?"))
 
                         elif msg_type == "stop":
                             print("[Bot] Call ended")
@@ -473,7 +759,8 @@ class VoiceBot:
 
                         elif msg_type == "barge_in":
                             print("[Bot] ⚡ Barge-in — cancelling TTS")
-                            self._cancel_tts.set()
+                            self._cancel_turn()
+                            self._drain_outbound()
 
                         elif msg_type == "mark":
                             mark_name = msg.get("name", "")
@@ -482,16 +769,92 @@ class VoiceBot:
                     except json.JSONDecodeError:
                         pass
 
-        except websockets.exceptions.ConnectionClosed:
-            print("[Bot] Connection closed")
+                elif message.type == WSMsgType.ERROR:
+                    print(f"[Bot] Connection error: {ws.exception()}")
+                    break
+            else:
+                print("[Bot] Connection closed")
+
         finally:
+            warm_task.cancel()
             response_task.cancel()
+            self._cancel_turn()
+            writer_task.cancel()
+            await ws.close()
             await self.stt.close()
             # Reset conversation for next call
-            self.llm.conversation = [self.llm.conversation[0]]
+            self.llm.reset()
             print("[Bot] Call cleanup complete\n")
 
-    async def _response_loop(self, ws: WebSocketServerProtocol) -> None:
+        return ws
+
+    async def _writer_loop(self, ws: web.WebSocketResponse) -> None:
+        """Send queued messages to VoxBridge, pacing audio to real time."""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                message = await self._out_q.get()
+                if isinstance(message, str):
+                    await ws.send_str(message)
+                    continue
+
+                # Coalesce small reads already queued behind this one; a
+                # control message stops the merge and is sent after the audio
+                trailer = None
+                if len(message) < OUTBOUND_MIN_FRAME_BYTES and not self._out_q.empty():
+                    frame = bytearray(message)
+                    while len(frame) < OUTBOUND_MIN_FRAME_BYTES and not self._out_q.empty():
+                        queued = self._out_q.get_nowait()
+                        if isinstance(queued, str):
+                            trailer = queued
+                            break
+                        frame += queued
+                    message = frame
+                await ws.send_bytes(message)
+
+                # Advance the playback deadline by this chunk's duration. If
+                # we fell behind (far end ran dry) restart from now rather
+                # than bursting to catch up; sleep off anything beyond the lead.
+                now = loop.time()
+                self._playback_deadline = (
+                    max(self._playback_deadline, now)
+                    + len(message) / MULAW_BYTES_PER_SEC
+                )
+                delay = self._playback_deadline - PLAYBACK_LEAD - now
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if trailer is not None:
+                    await ws.send_str(trailer)
+
+        except asyncio.CancelledError:
+            pass
+        except ConnectionResetError:
+            pass
+
+    def _start_turn(self, coro) -> asyncio.Task:
+        """Run a greeting or reply as the current turn, replacing any other."""
+        self._cancel_turn()
+        self._turn_task = asyncio.create_task(coro, name="bot-turn")
+        return self._turn_task
+
+    def _cancel_turn(self) -> None:
+        """Cancel the current turn wherever it is waiting.
+
+        Cancelling the task aborts in-flight OpenAI / ElevenLabs requests
+        immediately instead of at the next audio chunk, and nothing more is
+        queued once it returns, so a following _drain_outbound() is final.
+        """
+        if self._turn_task and not self._turn_task.done():
+            self._turn_task.cancel()
+        self._turn_task = None
+
+    def _drain_outbound(self) -> None:
+        """Drop audio queued for sending (barge-in): the caller won't hear it."""
+        while not self._out_q.empty():
+            self._out_q.get_nowait()
+        self._playback_deadline = 0.0
+
+    async def _response_loop(self) -> None:
         """Listen for transcripts and generate streaming responses."""
         try:
             while True:
@@ -502,8 +865,14 @@ class VoiceBot:
                 t_start = time.monotonic()
                 print(f"\n[Bot] 🎤 User said: '{transcript}'")
 
-                # Stream LLM response and TTS it sentence-by-sentence
-                await self._stream_and_speak(ws, transcript)
+                # Stream LLM response and TTS it sentence-by-sentence. Wait
+                # on the task rather than awaiting it so a barge-in
+                # cancelling the turn doesn't also end this loop.
+                turn = self._start_turn(self._stream_and_speak(transcript))
+                await asyncio.wait({turn})
+                if turn.cancelled():
+                    print("[Bot] Response cancelled (barge-in)")
+                    continue
 
                 elapsed = (time.monotonic() - t_start) * 1000
                 print(f"[Bot] ✅ Full response in {elapsed:.0f}ms")
@@ -513,7 +882,7 @@ class VoiceBot:
         except Exception as e:
             print(f"[Bot] Response loop error: {e}")
 
-    async def _stream_and_speak(self, ws, user_text: str) -> None:
+    async def _stream_and_speak(self, user_text: str) -> None:
         """Stream LLM tokens, accumulate sentences, TTS each sentence immediately.
 
         This is the key latency optimization: instead of waiting for the full
@@ -521,70 +890,127 @@ class VoiceBot:
         1. Stream tokens from OpenAI
         2. As soon as we have a complete sentence, fire off TTS
         3. Stream TTS audio to the caller while OpenAI keeps generating
+
+        Each sentence's TTS runs in its own task, so sentence N+1 is already
+        synthesizing while sentence N plays; a player task forwards their
+        audio to the outbound queue strictly in sentence order.
         """
+        # One audio queue per sentence, in speaking order; None ends the reply
+        sentences: asyncio.Queue[asyncio.Queue[bytes | None] | None] = asyncio.Queue()
+        tts_slots = asyncio.Semaphore(TTS_MAX_CONCURRENT)
+        tts_tasks: list[asyncio.Task] = []
+        player = asyncio.create_task(self._play_sentences(sentences), name="tts-player")
+
+        def speak(sentence: str) -> None:
+            audio: asyncio.Queue[bytes | None] = asyncio.Queue()
+            tts_tasks.append(asyncio.create_task(
+                self._synthesize_into(sentence, audio, tts_slots), name="tts-sentence"
+            ))
+            sentences.put_nowait(audio)
+
+        try:
+            await self._collect_sentences(user_text, speak)
+            sentences.put_nowait(None)
+            await player
+        finally:
+            player.cancel()
+            for task in tts_tasks:
+                task.cancel()
+
+    async def _collect_sentences(self, user_text: str, speak) -> None:
+        """Stream the LLM reply, calling speak() with each complete sentence."""
         sentence_buffer = ""
         sentence_delimiters = {'.', '!', '?', ':', ';'}
         is_first_sentence = True
 
-        self._cancel_tts.clear()
-
         async for token in self.llm.stream_response(user_text):
-            if self._cancel_tts.is_set():
-                print("[Bot] LLM streaming cancelled (barge-in)")
-                break
-
             sentence_buffer += token
 
             # Check if we have a complete sentence
             has_delimiter = any(d in token for d in sentence_delimiters)
+            cut = max(sentence_buffer.rfind(d) for d in sentence_delimiters) + 1
 
-            if has_delimiter and len(sentence_buffer.strip()) > 5:
-                # We have a sentence — speak it immediately
-                sentence = sentence_buffer.strip()
-                sentence_buffer = ""
+            if has_delimiter and len(sentence_buffer[:cut].strip()) > 5:
+                # We have a sentence — speak it immediately, keeping any
+                # text after the delimiter for the next sentence
+                sentence = sentence_buffer[:cut].strip()
+                sentence_buffer = sentence_buffer[cut:]
 
                 if is_first_sentence:
                     is_first_sentence = False
                     print(f"[Bot] 🗣️ Speaking first sentence: '{sentence}'")
 
-                await self._speak(ws, sentence)
-
-                if self._cancel_tts.is_set():
-                    break
+                speak(sentence)
 
         # Speak any remaining text
         remaining = sentence_buffer.strip()
-        if remaining and not self._cancel_tts.is_set():
-            await self._speak(ws, remaining)
+        if remaining:
+            speak(remaining)
 
-    async def _speak(self, ws, text: str) -> None:
-        """Stream TTS audio directly to VoxBridge (no buffering)."""
-        if not text or self._cancel_tts.is_set():
-            return
+    async def _synthesize_into(
+        self, text: str, audio: asyncio.Queue[bytes | None], slots: asyncio.Semaphore
+    ) -> None:
+        """Stream one sentence's TTS audio into its queue, then None."""
+        try:
+            async with slots, aclosing(self.tts.synthesize(text)) as chunks:
+                async for mulaw_chunk in chunks:
+                    audio.put_nowait(mulaw_chunk)
+        finally:
+            audio.put_nowait(None)
 
-        self._is_speaking = True
-        self._cancel_tts.clear()
+    async def _play_sentences(self, sentences: asyncio.Queue) -> None:
+        """Forward each sentence's audio to the outbound queue, in order."""
+        queued_audio = False
+        while (audio := await sentences.get()) is not None:
+            while (mulaw_chunk := await audio.get()) is not None:
+                await self._out_q.put(mulaw_chunk)
+                queued_audio = True
 
-        completed = await self.tts.synthesize_streaming(text, ws, self._cancel_tts)
+        # Queue end-of-speech marker behind the whole reply
+        if queued_audio:
+            await self._out_q.put(END_OF_SPEECH_MSG)
 
-        self._is_speaking = False
+    async def _speak(self, text: str) -> None:
+        """Stream TTS audio to the outbound queue as it is synthesized.
 
-        # Send end-of-speech marker
-        if completed:
-            try:
-                await ws.send(json.dumps({"type": "end_of_speech"}))
-            except Exception:
-                pass
+        Barge-in cancels the task running this, so a cancelled utterance
+        never queues its end-of-speech marker.
+        """
+        if not text:
+            return
+
+        queued_audio = False
 
-    async def _speak_greeting(self, ws, text: str) -> None:
-        """Alias for speaking — used for the initial greeting."""
-        await self._speak(ws, text)
+        async with aclosing(self.tts.synthesize(text)) as audio:
+            async for mulaw_chunk in audio:
+                await self._out_q.put(mulaw_chunk)
+                queued_audio = True
+
+        # Queue end-of-speech marker behind the audio
+        if queued_audio:
+            await self._out_q.put(END_OF_SPEECH_MSG)
 
 
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
+def make_server_socket(host: str, port: int) -> socket.socket:
+    """Create the bot's listening socket, tuned for small real-time frames.
+
+    Accepted connections inherit these options. asyncio already turns on
+    TCP_NODELAY for every connection it creates; it is set here as well so
+    no 20ms audio frame ever waits on Nagle coalescing.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+    sock.bind((host, port))
+    return sock
+
+
 async def main():
     # Validate API keys
     missing = []
@@ -602,6 +1028,7 @@ async def main():
         sys.exit(1)
 
     bot = VoiceBot()
+    await bot.start()
 
     print(f"\n{'='*60}")
     print(f"  AI Voice Bot (Low-Latency Streaming)")
@@ -613,9 +1040,26 @@ async def main():
     print(f"{'='*60}")
     print(f"\nWaiting for VoxBridge to connect...\n")
 
-    async with websockets.serve(bot.handle_connection, BOT_HOST, BOT_PORT, ping_interval=20):
+    # aiohttp's WebSocket server handles frames with less per-message
+    # overhead than the websockets library on this hot path
+    app = web.Application()
+    app.router.add_get("/ws", bot.handle_connection)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+
+    try:
+        await web.SockSite(runner, make_server_socket(BOT_HOST, BOT_PORT)).start()
         await asyncio.Future()  # run forever
+    finally:
+        await runner.cleanup()
+        await bot.close()
+        await close_http_session()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop  # optional: libuv-based event loop, cheaper I/O wakeups
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
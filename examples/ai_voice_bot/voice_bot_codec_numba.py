@@ -0,0 +1,43 @@
+"""
+Numba-compiled G.711 mu-law encoder for the AI voice bot.
+
+Optional: voice_bot.py uses this only when the stdlib audioop module is
+unavailable (Python 3.13+) and numba is installed, in place of its NumPy
+lookup tables. Same algorithm the bot uses to build those tables, so
+output is bit-exact with the lookup-table path.
+
+The kernel writes into a caller-provided array, so the bot can hand it a
+view over the bytearray it is about to send and skip the ndarray -> bytes
+copy.
+
+Requirements:
+    pip install numba
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from numba import njit
+
+# Segment (exponent) for a biased magnitude, indexed by its bits 7-14:
+# the position of the highest set bit, found with one load instead of a loop
+_EXP_TABLE = np.array(
+    [0, 0] + [e for e in range(1, 8) for _ in range(1 << e)], dtype=np.int32
+)
+
+
+@njit(cache=True)
+def encode_into(pcm: np.ndarray, out: np.ndarray) -> None:
+    """Encode int16 PCM samples into uint8 mu-law ``out`` (ITU-T G.711)."""
+    for i in range(pcm.shape[0]):
+        sample = np.int32(pcm[i])
+        sign = 0
+        if sample < 0:
+            sign = 0x80
+            sample = -sample
+        sample = min(sample, 32635)
+        sample += 0x84
+
+        exponent = _EXP_TABLE[sample >> 7]
+        mantissa = (sample >> (exponent + 3)) & 0x0F
+        out[i] = ~(sign | (exponent << 4) | mantissa) & 0xFF
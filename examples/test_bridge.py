@@ -68,4 +68,12 @@ if __name__ == "__main__":
 ║  Make sure the echo bot is running first!        ║
 ╚══════════════════════════════════════════════════╝
 """)
-    bridge.run()
+    try:
+        import uvloop  # optional: libuv-based event loop, cheaper I/O wakeups
+    except ImportError:
+        bridge.run()
+    else:
+        try:
+            uvloop.run(bridge.run_async())
+        except KeyboardInterrupt:
+            print("VoxBridge stopped by user")
@@ -9,31 +9,52 @@ you should hear your own voice echoed back.
 
 Usage:
     pip install websockets
+    pip install uvloop  # optional, faster event loop (not on Windows)
     python test_echo_bot.py
+    ECHO_DEBUG=1 python test_echo_bot.py  # also log every audio frame
 
 The bot listens on ws://localhost:9000/ws
 """
 
 import asyncio
 import json
+import os
 import websockets
 
+# orjson (C) parses control messages faster when installed; its
+# JSONDecodeError subclasses json.JSONDecodeError, so one except covers both
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# Per-frame audio logging is off by default: at 50 frames/s per call the
+# formatting and console writes cost more than the echo itself
+DEBUG_AUDIO = os.environ.get("ECHO_DEBUG") == "1"
+
 
 async def echo_bot(websocket):
     """Handle a single voice bot session."""
     print("\n[BOT] New connection from VoxBridge!")
+    audio_frames = 0
+    audio_bytes = 0
 
     try:
         async for message in websocket:
             if isinstance(message, bytes):
-                # Audio data - echo it back
-                print(f"[BOT] Audio received: {len(message)} bytes -> echoing back")
+                # Audio data - echo it back as received
                 await websocket.send(message)
+                if DEBUG_AUDIO:
+                    print(f"[BOT] Audio received: {len(message)} bytes -> echoed back")
+                if not audio_frames:
+                    print("[BOT] Audio flowing -> echoing back")
+                audio_frames += 1
+                audio_bytes += len(message)
 
             elif isinstance(message, str):
                 # JSON control message
                 try:
-                    data = json.loads(message)
+                    data = json_loads(message)
                     msg_type = data.get("type", "unknown")
 
                     if msg_type == "start":
@@ -59,6 +80,7 @@ async def echo_bot(websocket):
     except websockets.exceptions.ConnectionClosed:
         print("[BOT] Connection closed")
 
+    print(f"[BOT] Echoed {audio_frames} audio frames ({audio_bytes} bytes)")
     print("[BOT] Session ended\n")
 
 
@@ -69,9 +91,19 @@ async def main():
     print(f"\n  Listening on ws://localhost:9000/ws")
     print(f"  Waiting for VoxBridge connections...\n")
 
-    async with websockets.serve(echo_bot, "localhost", 9000, ping_interval=30):
+    # No permessage-deflate: audio frames don't compress, so zlib on every
+    # frame is pure CPU; frames are small, so cap them at 64 KiB
+    async with websockets.serve(
+        echo_bot, "localhost", 9000,
+        ping_interval=30, compression=None, max_size=2**16,
+    ):
         await asyncio.Future()  # run forever
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop  # optional: libuv-based event loop, cheaper I/O wakeups
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -16,8 +16,11 @@ Endpoints:
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
 
 from app.models.database import AssistSession
 from app.services import agent_assist as assist_svc
@@ -39,6 +42,31 @@ class TranscriptEntryRequest(BaseModel):
     content: str = ""
 
 
+# add_transcript runs once per utterance, so it validates the raw body in
+# pydantic-core instead of json.loads -> dict -> model; the schema is still
+# published to the OpenAPI docs via openapi_extra.
+_TRANSCRIPT_BODY_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": TranscriptEntryRequest.model_json_schema()}},
+    },
+}
+
+
+# -- Response schemas ---------------------------------------------------------
+
+class SessionListItem(BaseModel):
+    id: str
+    call_id: str
+    human_agent_name: str
+    status: str
+    suggestions_count: int
+    suggestions_accepted: int
+    compliance_warnings: int
+    caller_sentiment: str
+    created_at: datetime
+
+
 # -- Session endpoints --------------------------------------------------------
 
 @router.post("/sessions")
@@ -57,7 +85,7 @@ async def start_session(
     return session.model_dump()
 
 
-@router.get("/sessions")
+@router.get("/sessions", response_model=list[SessionListItem])
 async def list_sessions(
     active_only: bool = False,
     customer_id: str = Depends(get_current_customer_id),
@@ -65,17 +93,17 @@ async def list_sessions(
     """List all assist sessions."""
     sessions = assist_svc.list_sessions(customer_id, active_only)
     return [
-        {
-            "id": s.id,
-            "call_id": s.call_id,
-            "human_agent_name": s.human_agent_name,
-            "status": s.status.value,
-            "suggestions_count": len(s.suggestions),
-            "suggestions_accepted": s.suggestions_accepted,
-            "compliance_warnings": s.compliance_warnings,
-            "caller_sentiment": s.caller_sentiment,
-            "created_at": s.created_at.isoformat(),
-        }
+        SessionListItem(
+            id=s.id,
+            call_id=s.call_id,
+            human_agent_name=s.human_agent_name,
+            status=s.status.value,
+            suggestions_count=len(s.suggestions),
+            suggestions_accepted=s.suggestions_accepted,
+            compliance_warnings=s.compliance_warnings,
+            caller_sentiment=s.caller_sentiment,
+            created_at=s.created_at,
+        )
         for s in sessions
     ]
 
@@ -86,8 +114,8 @@ async def get_session(
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Get full session details including transcript and suggestions."""
-    session = assist_svc.get_session(session_id)
-    if not session or session.customer_id != customer_id:
+    session = assist_svc.get_session_for_customer(session_id, customer_id)
+    if not session:
         raise HTTPException(404, "Session not found")
     return session.model_dump()
 
@@ -98,11 +126,11 @@ async def end_session(
     customer_id: str = Depends(get_current_customer_id),
 ):
     """End a session and generate call summary + next steps."""
-    session = assist_svc.get_session(session_id)
-    if not session or session.customer_id != customer_id:
+    session = assist_svc.get_session_for_customer(session_id, customer_id)
+    if not session:
         raise HTTPException(404, "Session not found")
 
-    result = assist_svc.end_session(session_id)
+    result = assist_svc.end_session(session)
     return {
         "session_id": result.id,
         "status": result.status.value,
@@ -122,19 +150,19 @@ async def delete_session(
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Delete a session."""
-    session = assist_svc.get_session(session_id)
-    if not session or session.customer_id != customer_id:
+    session = assist_svc.get_session_for_customer(session_id, customer_id)
+    if not session:
         raise HTTPException(404, "Session not found")
-    assist_svc.delete_session(session_id)
+    assist_svc.delete_session(session)
     return {"deleted": True}
 
 
 # -- Transcript + suggestions -------------------------------------------------
 
-@router.post("/sessions/{session_id}/transcript")
+@router.post("/sessions/{session_id}/transcript", openapi_extra=_TRANSCRIPT_BODY_SCHEMA)
 async def add_transcript(
     session_id: str,
-    req: TranscriptEntryRequest,
+    request: Request,
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Add a transcript entry and get real-time suggestions back.
@@ -142,11 +170,18 @@ async def add_transcript(
     This is the core endpoint — called each time someone speaks
     during the call. Returns any new suggestions generated.
     """
-    session = assist_svc.get_session(session_id)
-    if not session or session.customer_id != customer_id:
+    try:
+        req = TranscriptEntryRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+        )
+
+    session = assist_svc.get_session_for_customer(session_id, customer_id)
+    if not session:
         raise HTTPException(404, "Session not found")
 
-    suggestions = assist_svc.add_transcript_entry(session_id, req.role, req.content)
+    suggestions = assist_svc.add_transcript_entry(session, req.role, req.content)
     return {
         "suggestions": [s.model_dump() for s in suggestions],
         "transcript_length": len(session.transcript),
@@ -161,11 +196,11 @@ async def accept_suggestion(
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Mark a suggestion as accepted (used by the agent)."""
-    session = assist_svc.get_session(session_id)
-    if not session or session.customer_id != customer_id:
+    session = assist_svc.get_session_for_customer(session_id, customer_id)
+    if not session:
         raise HTTPException(404, "Session not found")
 
-    result = assist_svc.accept_suggestion(session_id, suggestion_id)
+    result = assist_svc.accept_suggestion(session, suggestion_id)
     if not result:
         raise HTTPException(404, "Suggestion not found")
     return {"accepted": True, "suggestion_id": suggestion_id}
@@ -178,11 +213,11 @@ async def dismiss_suggestion(
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Mark a suggestion as dismissed (not useful)."""
-    session = assist_svc.get_session(session_id)
-    if not session or session.customer_id != customer_id:
+    session = assist_svc.get_session_for_customer(session_id, customer_id)
+    if not session:
         raise HTTPException(404, "Session not found")
 
-    result = assist_svc.dismiss_suggestion(session_id, suggestion_id)
+    result = assist_svc.dismiss_suggestion(session, suggestion_id)
     if not result:
         raise HTTPException(404, "Suggestion not found")
     return {"dismissed": True, "suggestion_id": suggestion_id}
@@ -6,7 +6,7 @@ This is the core entity of the AI-first contact center platform.
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 
 from app.middleware.auth import get_current_customer
 from app.models.database import (
@@ -16,28 +16,33 @@ from app.models.database import (
     AgentStatsResponse,
     AgentUpdate,
     Customer,
+    PlanTier,
 )
 from app.services.database import (
-    count_agents,
     create_agent,
     delete_agent,
     get_agent,
+    get_agent_call_aggregates,
     get_agent_stats,
     list_agents,
-    list_calls,
     update_agent,
 )
+from app.services.json_cache import JsonCache
 
 router = APIRouter(prefix="/agents", tags=["Agents"])
 
 # Plan-based agent limits
 _AGENT_LIMITS = {
-    "free": 1,
-    "pro": 10,
-    "enterprise": 100,
+    PlanTier.FREE: 1,
+    PlanTier.PRO: 10,
+    PlanTier.ENTERPRISE: 100,
 }
 
 
+# Serialized AgentResponse bodies keyed by (id, updated_at)
+_agent_json = JsonCache(maxsize=1024)
+
+
 def _agent_to_response(agent) -> AgentResponse:
     """Convert an Agent model to an AgentResponse."""
     return AgentResponse(
@@ -65,6 +70,14 @@ def _agent_to_response(agent) -> AgentResponse:
     )
 
 
+def _agent_json_response(agent) -> Response:
+    """_agent_to_response as a JSON Response, reused while the row is unchanged."""
+    return _agent_json.response(
+        (agent.id, agent.updated_at),
+        lambda: _agent_to_response(agent),
+    )
+
+
 # ──────────────────────────────────────────────────────────────────
 # CRUD Endpoints
 # ──────────────────────────────────────────────────────────────────
@@ -75,10 +88,10 @@ async def create_new_agent(
     customer: Customer = Depends(get_current_customer),
 ):
     """Create a new AI agent."""
-    # Check agent limit for plan
-    current_count = count_agents(customer.id)
-    limit = _AGENT_LIMITS.get(customer.plan.value, 1)
-    if current_count >= limit:
+    # Check agent limit for plan (agent_count is kept current by a DB trigger,
+    # and the customer row was just loaded for auth)
+    limit = _AGENT_LIMITS.get(customer.plan, 1)
+    if customer.agent_count >= limit:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"Agent limit reached ({limit}) for your {customer.plan.value} plan. Upgrade to create more agents.",
@@ -94,19 +107,12 @@ async def list_all_agents(
 ):
     """List all AI agents for the current customer."""
     agents = list_agents(customer.id)
+    # Call count + avg duration for every agent in one roll-up query
+    stats = get_agent_call_aggregates(customer.id) if agents else {}
 
     result = []
     for agent in agents:
-        # Get quick call count for each agent
-        calls, total = list_calls(customer.id, agent_id=agent.id, limit=0)
-        total_calls = total
-
-        # Get avg duration from recent calls
-        recent_calls, _ = list_calls(customer.id, agent_id=agent.id, limit=100)
-        avg_dur = 0.0
-        if recent_calls:
-            avg_dur = sum(c.duration_seconds for c in recent_calls) / len(recent_calls)
-
+        total_calls, avg_dur = stats.get(agent.id, (0, 0.0))
         result.append(AgentListResponse(
             id=agent.id,
             name=agent.name,
@@ -134,7 +140,7 @@ async def get_agent_by_id(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Agent not found",
         )
-    return _agent_to_response(agent)
+    return _agent_json_response(agent)
 
 
 @router.patch("/{agent_id}", response_model=AgentResponse)
@@ -158,7 +164,7 @@ async def update_agent_by_id(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update agent",
         )
-    return _agent_to_response(updated)
+    return _agent_json_response(updated)
 
 
 @router.delete("/{agent_id}", status_code=status.HTTP_204_NO_CONTENT)
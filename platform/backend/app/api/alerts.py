@@ -18,7 +18,7 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
-from app.models.database import AlertRule, AlertType, AlertSeverity
+from app.models.database import Alert, AlertRule, AlertType, AlertSeverity
 from app.services import alerts as alert_svc
 from app.middleware.auth import get_current_customer_id
 
@@ -29,8 +29,8 @@ router = APIRouter(prefix="/alerts", tags=["alerts"])
 
 class CreateRuleRequest(BaseModel):
     name: str
-    alert_type: str = "high_volume"
-    severity: str = "warning"
+    alert_type: AlertType = AlertType.HIGH_VOLUME
+    severity: AlertSeverity = AlertSeverity.WARNING
     enabled: bool = True
     config: dict = {}
     notify_email: bool = True
@@ -40,7 +40,7 @@ class CreateRuleRequest(BaseModel):
 class UpdateRuleRequest(BaseModel):
     name: str | None = None
     enabled: bool | None = None
-    severity: str | None = None
+    severity: AlertSeverity | None = None
     config: dict | None = None
     notify_email: bool | None = None
     notify_webhook: str | None = None
@@ -61,8 +61,8 @@ async def create_rule(
     rule = AlertRule(
         customer_id=customer_id,
         name=req.name,
-        alert_type=AlertType(req.alert_type),
-        severity=AlertSeverity(req.severity),
+        alert_type=req.alert_type,
+        severity=req.severity,
         enabled=req.enabled,
         config=req.config,
         notify_email=req.notify_email,
@@ -72,11 +72,11 @@ async def create_rule(
     return rule.model_dump()
 
 
-@router.get("/rules")
+@router.get("/rules", response_model=list[AlertRule])
 async def list_rules(customer_id: str = Depends(get_current_customer_id)):
     """List all alert rules."""
-    rules = alert_svc.list_rules(customer_id)
-    return [r.model_dump() for r in rules]
+    # Returned as models so FastAPI serializes the list in one pydantic-core pass
+    return alert_svc.list_rules(customer_id)
 
 
 @router.patch("/rules/{rule_id}")
@@ -90,9 +90,8 @@ async def update_rule(
     if not rule or rule.customer_id != customer_id:
         raise HTTPException(404, "Rule not found")
 
-    updates = {k: v for k, v in req.model_dump().items() if v is not None}
-    if "severity" in updates:
-        updates["severity"] = AlertSeverity(updates["severity"])
+    # Only fields the client sent; severity is already an AlertSeverity
+    updates = {k: v for k, v in req.model_dump(exclude_unset=True).items() if v is not None}
     updated = alert_svc.update_rule(rule_id, updates)
     return updated.model_dump()
 
@@ -119,7 +118,7 @@ async def create_default_rules(customer_id: str = Depends(get_current_customer_i
 
 # ── Alert endpoints ──────────────────────────────────────────────
 
-@router.get("")
+@router.get("", response_model=list[Alert])
 async def list_alerts(
     unacknowledged: bool = False,
     severity: str | None = None,
@@ -127,8 +126,7 @@ async def list_alerts(
     customer_id: str = Depends(get_current_customer_id),
 ):
     """List triggered alerts."""
-    alerts = alert_svc.list_alerts(customer_id, unacknowledged, severity, limit)
-    return [a.model_dump() for a in alerts]
+    return alert_svc.list_alerts(customer_id, unacknowledged, severity, limit)
 
 
 @router.get("/summary")
@@ -164,9 +162,9 @@ async def evaluate_rules(
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Manually evaluate all rules against provided metrics."""
-    triggered = alert_svc.evaluate_all_rules(customer_id, req.metrics)
+    triggered, evaluated = alert_svc.evaluate_all_rules(customer_id, req.metrics)
     return {
-        "evaluated": len(alert_svc.list_rules(customer_id)),
+        "evaluated": evaluated,
         "triggered": len(triggered),
         "alerts": [a.model_dump() for a in triggered],
     }
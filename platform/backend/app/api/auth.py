@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from app.middleware.auth import get_current_customer
@@ -14,14 +16,27 @@ from app.models.database import (
 )
 from app.services.auth import (
     create_access_token,
+    customer_json_response,
     customer_to_response,
     hash_password,
+    password_needs_rehash,
     verify_password,
 )
-from app.services.database import create_customer, get_customer_by_email
+from app.services.database import (
+    create_customer,
+    get_customer_by_email,
+    update_customer_password_hash,
+)
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+# Verified against when the email is unknown, so a login for a missing
+# account costs the same argon2id work as one for a real account and the
+# response time doesn't reveal which emails are registered
+_DUMMY_PASSWORD_HASH = (
+    "$argon2id$v=19$m=19456,t=2,p=1$GAlU+CY2H0tPZfWShQWPNw$+NtVbFPNDjbFwuzzCxwnpER9l+z2YsascJ6AHaG4tM8"
+)
+
 
 @router.post("/signup", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def signup(body: CustomerCreate):
@@ -34,8 +49,8 @@ async def signup(body: CustomerCreate):
             detail="Email already registered",
         )
 
-    # Create customer
-    pw_hash = hash_password(body.password)
+    # Create customer (argon2id is CPU-heavy, so hash off the event loop)
+    pw_hash = await asyncio.to_thread(hash_password, body.password)
     customer = create_customer(body.email, body.name, pw_hash)
 
     # Generate JWT
@@ -51,12 +66,20 @@ async def signup(body: CustomerCreate):
 async def login(body: CustomerLogin):
     """Login with email and password."""
     customer = get_customer_by_email(body.email)
-    if not customer or not verify_password(body.password, customer.password_hash):
+    password_hash = customer.password_hash if customer else _DUMMY_PASSWORD_HASH
+    # argon2id costs tens of ms of CPU; verify in a worker thread so other
+    # requests on this worker keep being served
+    valid = await asyncio.to_thread(verify_password, body.password, password_hash)
+    if not valid or not customer:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
 
+    # Upgrade bcrypt (or outdated argon2) hashes while we have the plaintext
+    if password_needs_rehash(customer.password_hash):
+        await asyncio.to_thread(_upgrade_password_hash, customer.id, body.password)
+
     token = create_access_token(customer.id, customer.email)
 
     return TokenResponse(
@@ -65,7 +88,12 @@ async def login(body: CustomerLogin):
     )
 
 
+def _upgrade_password_hash(customer_id: str, password: str) -> None:
+    """Rehash with the current parameters and store it (blocking)."""
+    update_customer_password_hash(customer_id, hash_password(password))
+
+
 @router.get("/me", response_model=CustomerResponse)
 async def get_profile(customer: Customer = Depends(get_current_customer)):
     """Get current customer profile."""
-    return customer_to_response(customer)
+    return customer_json_response(customer)
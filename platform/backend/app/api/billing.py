@@ -9,10 +9,15 @@ Handles:
 
 from __future__ import annotations
 
+import asyncio
+import json
+import time
+from collections.abc import Callable
 from datetime import datetime, timezone
 
 import stripe
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from loguru import logger
 
 from app.config import settings
 from app.middleware.auth import get_current_customer
@@ -22,7 +27,9 @@ from app.services.database import (
     get_active_subscription,
     update_customer_plan,
     update_customer_stripe_id,
+    update_subscription_by_stripe_id,
 )
+from app.services.idempotency import IdempotencyCache
 
 router = APIRouter(prefix="/billing", tags=["Billing"])
 
@@ -81,6 +88,8 @@ PLANS = [
     },
 ]
 
+_PLANS_BY_ID: dict[str, dict] = {p["id"]: p for p in PLANS}
+
 
 @router.get("/plans")
 async def get_plans():
@@ -92,7 +101,7 @@ async def get_plans():
 async def get_current_plan(customer: Customer = Depends(get_current_customer)):
     """Get the customer's current plan and subscription status."""
     subscription = get_active_subscription(customer.id)
-    plan = next((p for p in PLANS if p["id"] == customer.plan.value), PLANS[0])
+    plan = _PLANS_BY_ID.get(customer.plan.value, PLANS[0])
 
     return {
         "plan": plan,
@@ -112,47 +121,81 @@ async def get_current_plan(customer: Customer = Depends(get_current_customer)):
 # Checkout
 # ──────────────────────────────────────────────────────────────────
 
+_PLAN_PRICE_IDS: dict[str, str] = {
+    "pro": settings.stripe_price_pro,
+    "enterprise": settings.stripe_price_enterprise,
+}
+
+_checkout_replays = IdempotencyCache()
+
+
 @router.post("/checkout")
 async def create_checkout_session(
     body: dict,
     customer: Customer = Depends(get_current_customer),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
 ):
-    """Create a Stripe checkout session for plan upgrade."""
-    plan = body.get("plan", "pro")
+    """Create a Stripe checkout session for plan upgrade.
 
-    price_map = {
-        "pro": settings.stripe_price_pro,
-        "enterprise": settings.stripe_price_enterprise,
-    }
+    Retries carrying the same Idempotency-Key get the original session.
+    """
+    plan = body.get("plan", "pro")
 
-    price_id = price_map.get(plan)
+    price_id = _PLAN_PRICE_IDS.get(plan)
     if not price_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid plan: {plan}. Choose 'pro' or 'enterprise'.",
         )
 
+    key = (customer.id, idempotency_key) if idempotency_key else None
+    return await _checkout_replays.run(
+        key, lambda: _create_checkout(customer, plan, price_id, idempotency_key)
+    )
+
+
+async def _create_checkout(
+    customer: Customer, plan: str, price_id: str, idempotency_key: str | None
+) -> dict:
+    """Create the Stripe customer (if needed) and checkout session.
+
+    The Stripe SDK and Supabase client are blocking, so each call runs in
+    a worker thread; saving a new Stripe customer ID overlaps with
+    creating the session, which only needs the ID.
+    """
     # Create or get Stripe customer
+    save_stripe_id = None
     if not customer.stripe_customer_id:
-        stripe_customer = stripe.Customer.create(
+        stripe_customer = await asyncio.to_thread(
+            stripe.Customer.create,
             email=customer.email,
             name=customer.name,
             metadata={"voxbridge_customer_id": customer.id},
         )
-        update_customer_stripe_id(customer.id, stripe_customer.id)
+        save_stripe_id = asyncio.create_task(asyncio.to_thread(
+            update_customer_stripe_id, customer.id, stripe_customer.id
+        ))
         stripe_customer_id = stripe_customer.id
     else:
         stripe_customer_id = customer.stripe_customer_id
 
     # Create checkout session
-    session = stripe.checkout.Session.create(
-        customer=stripe_customer_id,
-        mode="subscription",
-        line_items=[{"price": price_id, "quantity": 1}],
-        success_url=f"{settings.frontend_url}/dashboard/billing?success=true",
-        cancel_url=f"{settings.frontend_url}/dashboard/billing?canceled=true",
-        metadata={"voxbridge_customer_id": customer.id, "plan": plan},
-    )
+    try:
+        session = await asyncio.to_thread(
+            stripe.checkout.Session.create,
+            customer=stripe_customer_id,
+            mode="subscription",
+            line_items=[{"price": price_id, "quantity": 1}],
+            success_url=f"{settings.frontend_url}/dashboard/billing?success=true",
+            cancel_url=f"{settings.frontend_url}/dashboard/billing?canceled=true",
+            metadata={"voxbridge_customer_id": customer.id, "plan": plan},
+            # Lets Stripe dedupe retries that land on another worker
+            idempotency_key=f"checkout:{customer.id}:{idempotency_key}" if idempotency_key else None,
+        )
+    finally:
+        # Keep the new Stripe customer linked even if the session failed
+        if save_stripe_id is not None:
+            await save_stripe_id
 
     return {"checkout_url": session.url}
 
@@ -178,30 +221,93 @@ async def create_portal_session(customer: Customer = Depends(get_current_custome
 # Webhook
 # ──────────────────────────────────────────────────────────────────
 
+# Stripe redelivers events it considers unacknowledged; remember recent
+# event IDs so a redelivery is not applied twice. An event only counts as
+# seen once its handler has succeeded. Insertion order is expiry order.
+_SEEN_EVENT_TTL = 24 * 3600.0
+_SEEN_EVENT_MAX = 10_000
+_seen_events: dict[str, float] = {}
+# Events whose handler is still running, so a redelivery that arrives
+# meanwhile waits for the outcome instead of being acked early
+_inflight_events: dict[str, asyncio.Future] = {}
+
+
+def _already_applied(event_id: str) -> bool:
+    """Return True if the event's handler succeeded recently."""
+    now = time.monotonic()
+    while _seen_events and next(iter(_seen_events.values())) <= now:
+        del _seen_events[next(iter(_seen_events))]
+    return event_id in _seen_events
+
+
+def _mark_applied(event_id: str) -> None:
+    if len(_seen_events) >= _SEEN_EVENT_MAX:
+        del _seen_events[next(iter(_seen_events))]
+    _seen_events[event_id] = time.monotonic() + _SEEN_EVENT_TTL
+
+
+async def _apply_once(event: dict) -> None:
+    """Run the event's handler unless it already succeeded.
+
+    A duplicate delivered while the first attempt is running waits for it
+    and fails along with it, so neither is acked unless the change landed.
+    """
+    event_id = event["id"]
+    if _already_applied(event_id):
+        return
+
+    inflight = _inflight_events.get(event_id)
+    if inflight is not None:
+        await asyncio.wait({inflight})
+        if inflight.cancelled() or inflight.exception() is not None:
+            raise HTTPException(status_code=500, detail="Webhook handling failed")
+        return
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight_events[event_id] = future
+    try:
+        await asyncio.to_thread(_HANDLERS[event["type"]], event["data"]["object"])
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as exc:
+        future.set_exception(exc)
+        future.exception()  # mark retrieved when nobody was waiting
+        raise
+    else:
+        _mark_applied(event_id)
+        future.set_result(None)
+    finally:
+        del _inflight_events[event_id]
+
+
 @router.post("/webhook")
 async def stripe_webhook(request: Request):
-    """Handle Stripe webhook events."""
+    """Handle Stripe webhook events.
+
+    The handler's database and Stripe API calls run in a worker thread.
+    If it fails, the error propagates as a 500 and the event is not
+    marked seen, so Stripe redelivers it instead of the billing change
+    being lost.
+    """
     payload = await request.body()
     sig_header = request.headers.get("stripe-signature", "")
 
     try:
-        event = stripe.Webhook.construct_event(
-            payload, sig_header, settings.stripe_webhook_secret
+        # Verify against the raw body, then parse into plain dicts; skips
+        # construct_event's conversion of the payload into StripeObjects
+        # verify_header signs a str; older stripe-python versions don't
+        # decode bytes themselves (construct_event used to do it for them)
+        stripe.WebhookSignature.verify_header(
+            payload.decode("utf-8"), sig_header, settings.stripe_webhook_secret,
+            stripe.Webhook.DEFAULT_TOLERANCE,
         )
+        event = json.loads(payload)
     except (ValueError, stripe.error.SignatureVerificationError):
         raise HTTPException(status_code=400, detail="Invalid webhook signature")
 
-    event_type = event["type"]
-    data = event["data"]["object"]
-
-    if event_type == "checkout.session.completed":
-        _handle_checkout_completed(data)
-    elif event_type == "customer.subscription.updated":
-        _handle_subscription_updated(data)
-    elif event_type == "customer.subscription.deleted":
-        _handle_subscription_deleted(data)
-    elif event_type == "invoice.payment_failed":
-        _handle_payment_failed(data)
+    if event["type"] in _HANDLERS:
+        await _apply_once(event)
 
     return {"status": "ok"}
 
@@ -210,76 +316,62 @@ def _handle_checkout_completed(session: dict) -> None:
     """Process successful checkout."""
     customer_id = session.get("metadata", {}).get("voxbridge_customer_id")
     plan = session.get("metadata", {}).get("plan", "pro")
-    subscription_id = session.get("subscription")
+    subscription = session.get("subscription")
 
-    if not customer_id or not subscription_id:
+    if not customer_id or not subscription:
         return
 
     plan_tier = PlanTier(plan)
     update_customer_plan(customer_id, plan_tier)
 
-    # Fetch subscription details from Stripe
-    sub = stripe.Subscription.retrieve(subscription_id)
+    # Use the subscription when the session carries it expanded; webhook
+    # payloads normally hold only its ID, so fetch it from Stripe then
+    if isinstance(subscription, dict) and "current_period_start" in subscription:
+        sub = subscription
+    else:
+        sub = stripe.Subscription.retrieve(
+            subscription["id"] if isinstance(subscription, dict) else subscription
+        )
     create_subscription(
         customer_id=customer_id,
-        stripe_subscription_id=subscription_id,
+        stripe_subscription_id=sub["id"],
         plan=plan_tier,
-        current_period_start=datetime.fromtimestamp(sub.current_period_start, tz=timezone.utc),
-        current_period_end=datetime.fromtimestamp(sub.current_period_end, tz=timezone.utc),
+        current_period_start=datetime.fromtimestamp(sub["current_period_start"], tz=timezone.utc),
+        current_period_end=datetime.fromtimestamp(sub["current_period_end"], tz=timezone.utc),
     )
 
 
 def _handle_subscription_updated(subscription: dict) -> None:
     """Handle subscription updates (plan changes, renewals)."""
-    from app.services.database import get_client
-
-    stripe_sub_id = subscription.get("id")
-    status_val = subscription.get("status")
-
-    client = get_client()
-    result = (
-        client.table("subscriptions")
-        .select("*")
-        .eq("stripe_subscription_id", stripe_sub_id)
-        .execute()
-    )
-
-    if result.data:
-        client.table("subscriptions").update({
-            "status": status_val,
-            "current_period_start": datetime.fromtimestamp(
-                subscription["current_period_start"], tz=timezone.utc
-            ).isoformat(),
-            "current_period_end": datetime.fromtimestamp(
-                subscription["current_period_end"], tz=timezone.utc
-            ).isoformat(),
-        }).eq("stripe_subscription_id", stripe_sub_id).execute()
+    update_subscription_by_stripe_id(subscription.get("id"), {
+        "status": subscription.get("status"),
+        "current_period_start": datetime.fromtimestamp(
+            subscription["current_period_start"], tz=timezone.utc
+        ).isoformat(),
+        "current_period_end": datetime.fromtimestamp(
+            subscription["current_period_end"], tz=timezone.utc
+        ).isoformat(),
+    })
 
 
 def _handle_subscription_deleted(subscription: dict) -> None:
     """Handle subscription cancellation - downgrade to free."""
-    from app.services.database import get_client
-
-    stripe_sub_id = subscription.get("id")
-    client = get_client()
-
-    result = (
-        client.table("subscriptions")
-        .select("*")
-        .eq("stripe_subscription_id", stripe_sub_id)
-        .execute()
+    customer_id = update_subscription_by_stripe_id(
+        subscription.get("id"), {"status": "canceled"}
     )
-
-    if result.data:
-        customer_id = result.data[0]["customer_id"]
+    if customer_id:
         update_customer_plan(customer_id, PlanTier.FREE)
 
-        client.table("subscriptions").update({
-            "status": "canceled",
-        }).eq("stripe_subscription_id", stripe_sub_id).execute()
-
 
 def _handle_payment_failed(invoice: dict) -> None:
     """Handle failed payment."""
-    from loguru import logger
     logger.warning(f"Payment failed for invoice: {invoice.get('id')}")
+
+
+# Stripe event type -> handler; event types not listed are acknowledged and ignored
+_HANDLERS: dict[str, Callable[[dict], None]] = {
+    "checkout.session.completed": _handle_checkout_completed,
+    "customer.subscription.updated": _handle_subscription_updated,
+    "customer.subscription.deleted": _handle_subscription_deleted,
+    "invoice.payment_failed": _handle_payment_failed,
+}
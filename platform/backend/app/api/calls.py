@@ -6,7 +6,14 @@ and outbound call initiation via Twilio.
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import asyncio
+import hashlib
+import json
+from datetime import datetime
+from string import Template
+from xml.sax.saxutils import escape
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
 from loguru import logger
 
 from app.config import settings
@@ -14,86 +21,83 @@ from app.middleware.auth import get_current_customer
 from app.models.database import (
     CallDetailResponse,
     CallDirection,
-    CallResponse,
+    CallListResponse,
     CallStatus,
     Customer,
     OutboundCallRequest,
     OutboundCallResponse,
 )
 from app.services.database import (
+    billing_period_start,
     create_call,
     get_agent,
+    get_agent_names,
     get_call,
+    get_calls_period_stats,
     get_phone_number,
     get_tool_calls_for_call,
-    list_calls,
+    list_calls_summary,
     list_phone_numbers,
 )
+from app.services.idempotency import IdempotencyCache
+from app.services.telephony import get_twilio_client
 
 router = APIRouter(prefix="/calls", tags=["Calls"])
 
+# The webhook base URL is fixed for the process, so derive the stream
+# base and the TwiML boilerplate once rather than per outbound call
+_WS_BASE = settings.twilio_webhook_base_url.replace("https://", "wss://").replace("http://", "ws://")
+_STATUS_URL = f"{settings.twilio_webhook_base_url}/api/v1/webhooks/twilio/status"
 
-def _call_to_response(call, agent_name: str = "") -> CallResponse:
-    """Convert a Call model to a CallResponse."""
-    return CallResponse(
-        id=call.id,
-        agent_id=call.agent_id,
-        agent_name=agent_name,
-        direction=call.direction,
-        from_number=call.from_number,
-        to_number=call.to_number,
-        started_at=call.started_at,
-        ended_at=call.ended_at,
-        duration_seconds=call.duration_seconds,
-        status=call.status,
-        end_reason=call.end_reason,
-        escalated_to_human=call.escalated_to_human,
-        sentiment_score=call.sentiment_score,
-        resolution=call.resolution,
-        cost_cents=call.cost_cents,
-        created_at=call.created_at,
-    )
+_OUTBOUND_TWIML = Template("""<?xml version="1.0" encoding="UTF-8"?>
+<Response>
+    <Connect>
+        <Stream url="$stream_url">
+            <Parameter name="call_id" value="$call_id" />
+            <Parameter name="agent_id" value="$agent_id" />
+            <Parameter name="customer_id" value="$customer_id" />
+            <Parameter name="direction" value="outbound" />
+        </Stream>
+    </Connect>
+</Response>""")
+
+
+def _xml_attr(value: str) -> str:
+    """Escape a value for a double-quoted XML attribute."""
+    return escape(value, {'"': "&quot;"})
 
 
 # ──────────────────────────────────────────────────────────────────
 # List / Search
 # ──────────────────────────────────────────────────────────────────
 
-@router.get("", response_model=dict)
+@router.get("", response_model=CallListResponse)
 async def list_all_calls(
     agent_id: str | None = Query(None, description="Filter by agent ID"),
     call_status: CallStatus | None = Query(None, alias="status", description="Filter by call status"),
     direction: CallDirection | None = Query(None, description="Filter by direction"),
+    since: datetime | None = Query(None, description="Only calls created at or after this time"),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
     customer: Customer = Depends(get_current_customer),
 ):
     """List calls with optional filters. Returns paginated results."""
-    calls, total = list_calls(
+    calls, total = list_calls_summary(
         customer_id=customer.id,
         agent_id=agent_id,
         status=call_status.value if call_status else None,
         direction=direction.value if direction else None,
         limit=limit,
         offset=offset,
+        created_at_gte=since,
     )
 
-    # Build a cache of agent names for the response
-    agent_names: dict[str, str] = {}
-    for call in calls:
-        if call.agent_id not in agent_names:
-            agent = get_agent(call.agent_id, customer.id)
-            agent_names[call.agent_id] = agent.name if agent else "Unknown"
+    # One query for every agent on this page instead of one per agent
+    agent_names = get_agent_names({c.agent_id for c in calls}, customer.id)
+    for c in calls:
+        c.agent_name = agent_names.get(c.agent_id, "Unknown")
 
-    return {
-        "calls": [
-            _call_to_response(c, agent_names.get(c.agent_id, "Unknown"))
-            for c in calls
-        ],
-        "total": total,
-        "limit": limit,
-        "offset": offset,
-    }
+    return CallListResponse(calls=calls, total=total, limit=limit, offset=offset)
 
 
 # ──────────────────────────────────────────────────────────────────
@@ -106,19 +110,21 @@ async def get_call_detail(
     customer: Customer = Depends(get_current_customer),
 ):
     """Get full call detail including transcript and tool calls."""
-    call = get_call(call_id, customer.id)
+    call = await asyncio.to_thread(get_call, call_id, customer.id)
     if not call:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Call not found",
         )
 
-    # Get agent name
-    agent = get_agent(call.agent_id, customer.id)
+    # Agent name and tool calls only depend on the call row, so fetch
+    # them concurrently (the database client is blocking, hence threads)
+    agent, tool_calls = await asyncio.gather(
+        asyncio.to_thread(get_agent, call.agent_id, customer.id),
+        asyncio.to_thread(get_tool_calls_for_call, call_id),
+    )
     agent_name = agent.name if agent else "Unknown"
 
-    # Get tool calls for this call
-    tool_calls = get_tool_calls_for_call(call_id)
     tool_call_dicts = [
         {
             "id": tc.id,
@@ -159,30 +165,9 @@ async def get_call_detail(
 # Summary (dashboard overview)
 # ──────────────────────────────────────────────────────────────────
 
-@router.get("/summary/overview")
-async def get_calls_overview(
-    customer: Customer = Depends(get_current_customer),
-):
-    """Get a high-level calls overview for the dashboard.
-
-    Returns total calls, AI containment rate, avg duration,
-    and total cost for the current billing period.
-    """
-    from datetime import datetime, timezone
-
-    now = datetime.now(timezone.utc)
-    period_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-    # Get all calls this period (up to 10K for stats)
-    calls, total = list_calls(customer.id, limit=10000, offset=0)
-
-    # Filter to current period
-    period_calls = [
-        c for c in calls
-        if c.created_at >= period_start
-    ]
-
-    total_calls = len(period_calls)
+def _overview_from_stats(stats: dict) -> dict:
+    """Shape billing-period call totals into the dashboard overview."""
+    total_calls = stats["total"]
     if total_calls == 0:
         return {
             "total_calls": 0,
@@ -194,10 +179,10 @@ async def get_calls_overview(
             "total_cost_dollars": 0.0,
         }
 
-    ai_handled = sum(1 for c in period_calls if not c.escalated_to_human)
-    escalated = sum(1 for c in period_calls if c.escalated_to_human)
-    avg_dur = sum(c.duration_seconds for c in period_calls) / total_calls
-    total_cost = sum(c.cost_cents for c in period_calls)
+    escalated = stats["escalated"]
+    ai_handled = total_calls - escalated
+    avg_dur = stats["total_duration"] / total_calls
+    total_cost = stats["total_cost"]
 
     return {
         "total_calls": total_calls,
@@ -210,14 +195,39 @@ async def get_calls_overview(
     }
 
 
+@router.get("/summary/overview")
+async def get_calls_overview(
+    request: Request,
+    customer: Customer = Depends(get_current_customer),
+):
+    """Get a high-level calls overview for the dashboard.
+
+    Returns total calls, AI containment rate, avg duration,
+    and total cost for the current billing period. Carries an ETag so
+    polling dashboards get a bodyless 304 while nothing has changed.
+    """
+    stats = get_calls_period_stats(customer.id, billing_period_start())
+    body = json.dumps(_overview_from_stats(stats), separators=(",", ":")).encode()
+    etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 # ──────────────────────────────────────────────────────────────────
 # Outbound Call
 # ──────────────────────────────────────────────────────────────────
 
+_outbound_replays = IdempotencyCache()
+
+
 @router.post("", response_model=OutboundCallResponse, status_code=status.HTTP_201_CREATED)
 async def initiate_outbound_call(
     body: OutboundCallRequest,
     customer: Customer = Depends(get_current_customer),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
 ):
     """Initiate an outbound call to a phone number.
 
@@ -227,7 +237,18 @@ async def initiate_outbound_call(
     3. Create a call record
     4. Initiate the call via Twilio
     5. Return call details
+
+    Retries carrying the same Idempotency-Key get the original call back
+    instead of dialing again.
     """
+    key = (customer.id, idempotency_key) if idempotency_key else None
+    return await _outbound_replays.run(key, lambda: _place_outbound_call(body, customer))
+
+
+async def _place_outbound_call(
+    body: OutboundCallRequest, customer: Customer
+) -> OutboundCallResponse:
+    """Validate, record and dial an outbound call (steps 1-5 above)."""
     # 1. Validate agent
     agent = get_agent(body.agent_id, customer.id)
     if not agent:
@@ -279,33 +300,25 @@ async def initiate_outbound_call(
 
     # 4. Initiate via Twilio
     try:
-        from twilio.rest import Client as TwilioClient
-
-        twilio = TwilioClient(settings.twilio_account_sid, settings.twilio_auth_token)
+        twilio = get_twilio_client()
 
         # WebSocket URL for the AI pipeline to handle the call
-        ws_base = settings.twilio_webhook_base_url.replace("https://", "wss://").replace("http://", "ws://")
-        stream_url = f"{ws_base}/api/v1/ws/call/{call.id}"
-
-        twiml = f"""<?xml version="1.0" encoding="UTF-8"?>
-<Response>
-    <Connect>
-        <Stream url="{stream_url}">
-            <Parameter name="call_id" value="{call.id}" />
-            <Parameter name="agent_id" value="{agent.id}" />
-            <Parameter name="customer_id" value="{customer.id}" />
-            <Parameter name="direction" value="outbound" />
-        </Stream>
-    </Connect>
-</Response>"""
+        stream_url = f"{_WS_BASE}/api/v1/ws/call/{call.id}"
 
-        status_url = f"{settings.twilio_webhook_base_url}/api/v1/webhooks/twilio/status"
+        twiml = _OUTBOUND_TWIML.substitute(
+            stream_url=_xml_attr(stream_url),
+            call_id=_xml_attr(call.id),
+            agent_id=_xml_attr(agent.id),
+            customer_id=_xml_attr(customer.id),
+        )
 
-        twilio_call = twilio.calls.create(
+        # The SDK call is a blocking HTTP round-trip; keep it off the event loop
+        twilio_call = await asyncio.to_thread(
+            twilio.calls.create,
             twiml=twiml,
             to=body.to,
             from_=from_phone.phone_number,
-            status_callback=status_url,
+            status_callback=_STATUS_URL,
             status_callback_event=["initiated", "ringing", "answered", "completed"],
             status_callback_method="POST",
         )
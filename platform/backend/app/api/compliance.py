@@ -8,6 +8,7 @@ Endpoints:
     POST   /compliance/rules/defaults          Create default rule set
 
     POST   /compliance/scan                    Scan a transcript for violations
+    POST   /compliance/scan-batch              Scan several transcripts at once
     GET    /compliance/violations              List violations
     POST   /compliance/violations/{id}/resolve Resolve a violation
     GET    /compliance/summary                 Compliance overview
@@ -20,10 +21,18 @@ Endpoints:
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+import asyncio
 
-from app.models.database import AuditAction, ComplianceRule, ComplianceRuleType
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+
+from app.models.database import (
+    AuditAction,
+    AuditLogEntry,
+    ComplianceRule,
+    ComplianceRuleType,
+    ComplianceViolation,
+)
 from app.services import compliance as comp_svc
 from app.middleware.auth import get_current_customer_id
 
@@ -34,7 +43,7 @@ router = APIRouter(prefix="/compliance", tags=["compliance"])
 
 class CreateRuleRequest(BaseModel):
     name: str
-    rule_type: str = "pii_redaction"
+    rule_type: ComplianceRuleType = ComplianceRuleType.PII_REDACTION
     severity: str = "warning"
     config: dict = {}
     enabled: bool = True
@@ -52,12 +61,16 @@ class ScanRequest(BaseModel):
     transcript: list[dict] = []     # [{role: "agent"|"caller", content: "..."}]
 
 
+class ScanBatchRequest(BaseModel):
+    items: list[ScanRequest] = Field(default_factory=list, max_length=100)
+
+
 class RedactRequest(BaseModel):
     text: str = ""
 
 
 class LogActionRequest(BaseModel):
-    action: str = "login"
+    action: AuditAction = AuditAction.LOGIN
     resource_type: str = ""
     resource_id: str = ""
     description: str = ""
@@ -75,7 +88,7 @@ async def create_rule(
     rule = ComplianceRule(
         customer_id=customer_id,
         name=req.name,
-        rule_type=ComplianceRuleType(req.rule_type),
+        rule_type=req.rule_type,
         severity=req.severity,
         config=req.config,
         enabled=req.enabled,
@@ -84,11 +97,10 @@ async def create_rule(
     return rule.model_dump()
 
 
-@router.get("/rules")
+@router.get("/rules", response_model=list[ComplianceRule])
 async def list_rules(customer_id: str = Depends(get_current_customer_id)):
     """List all compliance rules."""
-    rules = comp_svc.list_rules(customer_id)
-    return [r.model_dump() for r in rules]
+    return comp_svc.list_rules(customer_id)
 
 
 @router.patch("/rules/{rule_id}")
@@ -98,11 +110,10 @@ async def update_rule(
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Update a compliance rule."""
-    rule = comp_svc.get_rule(rule_id)
-    if not rule or rule.customer_id != customer_id:
-        raise HTTPException(404, "Rule not found")
     updates = {k: v for k, v in req.model_dump().items() if v is not None}
-    updated = comp_svc.update_rule(rule_id, updates)
+    updated = comp_svc.update_rule(rule_id, updates, customer_id)
+    if not updated:
+        raise HTTPException(404, "Rule not found")
     return updated.model_dump()
 
 
@@ -112,10 +123,8 @@ async def delete_rule(
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Delete a compliance rule."""
-    rule = comp_svc.get_rule(rule_id)
-    if not rule or rule.customer_id != customer_id:
+    if not comp_svc.delete_rule(rule_id, customer_id):
         raise HTTPException(404, "Rule not found")
-    comp_svc.delete_rule(rule_id)
     return {"deleted": True}
 
 
@@ -134,16 +143,51 @@ async def scan_transcript(
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Scan a call transcript for compliance violations."""
-    violations = comp_svc.scan_transcript(customer_id, req.call_id, req.transcript)
+    # Regex matching a long transcript is CPU-bound, so it runs in a worker
+    # thread; the violation store is only written here on the event loop
+    [violations] = await asyncio.to_thread(
+        comp_svc.find_violations,
+        comp_svc.enabled_rules(customer_id),
+        customer_id,
+        [(req.call_id, req.transcript)],
+    )
+    comp_svc.record_violations(violations)
     return {
         "violations_found": len(violations),
         "violations": [v.model_dump() for v in violations],
     }
 
 
+@router.post("/scan-batch")
+async def scan_transcripts(
+    req: ScanBatchRequest,
+    customer_id: str = Depends(get_current_customer_id),
+):
+    """Scan several call transcripts in one request."""
+    found = await asyncio.to_thread(
+        comp_svc.find_violations,
+        comp_svc.enabled_rules(customer_id),
+        customer_id,
+        [(item.call_id, item.transcript) for item in req.items],
+    )
+    for violations in found:
+        comp_svc.record_violations(violations)
+    return {
+        "violations_found": sum(len(violations) for violations in found),
+        "results": [
+            {
+                "call_id": item.call_id,
+                "violations_found": len(violations),
+                "violations": [v.model_dump() for v in violations],
+            }
+            for item, violations in zip(req.items, found)
+        ],
+    }
+
+
 # -- Violations ---------------------------------------------------------------
 
-@router.get("/violations")
+@router.get("/violations", response_model=list[ComplianceViolation])
 async def list_violations(
     unresolved_only: bool = False,
     rule_type: str = "",
@@ -151,8 +195,7 @@ async def list_violations(
     customer_id: str = Depends(get_current_customer_id),
 ):
     """List compliance violations."""
-    violations = comp_svc.list_violations(customer_id, unresolved_only, rule_type, limit)
-    return [v.model_dump() for v in violations]
+    return comp_svc.list_violations(customer_id, unresolved_only, rule_type, limit)
 
 
 @router.post("/violations/{violation_id}/resolve")
@@ -161,10 +204,8 @@ async def resolve_violation(
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Mark a violation as resolved."""
-    v = comp_svc.get_violation(violation_id)
-    if not v or v.customer_id != customer_id:
+    if not comp_svc.resolve_violation(violation_id, "dashboard_user", customer_id):
         raise HTTPException(404, "Violation not found")
-    resolved = comp_svc.resolve_violation(violation_id, "dashboard_user")
     return {"resolved": True, "violation_id": violation_id}
 
 
@@ -191,15 +232,14 @@ async def get_summary(customer_id: str = Depends(get_current_customer_id)):
 
 # -- Audit Log ----------------------------------------------------------------
 
-@router.get("/audit-log")
+@router.get("/audit-log", response_model=list[AuditLogEntry])
 async def get_audit_log(
     action: str = "",
     limit: int = 50,
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Get audit log entries."""
-    entries = comp_svc.get_audit_log(customer_id, action, limit)
-    return [e.model_dump() for e in entries]
+    return comp_svc.get_audit_log(customer_id, action, limit)
 
 
 @router.post("/audit-log")
@@ -211,7 +251,7 @@ async def log_action(
     entry = comp_svc.log_action(
         customer_id=customer_id,
         user_email="dashboard_user",
-        action=AuditAction(req.action),
+        action=req.action,
         resource_type=req.resource_type,
         resource_id=req.resource_id,
         description=req.description,
@@ -19,7 +19,7 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
-from app.models.database import Connector, ConnectorType, ConnectorStatus
+from app.models.database import Connector, ConnectorEvent, ConnectorType, ConnectorStatus
 from app.services import connectors as conn_svc
 from app.middleware.auth import get_current_customer_id
 
@@ -30,7 +30,7 @@ router = APIRouter(prefix="/connectors", tags=["connectors"])
 
 class CreateConnectorRequest(BaseModel):
     name: str
-    connector_type: str = "twilio"
+    connector_type: ConnectorType = ConnectorType.TWILIO
     config: dict = {}
 
 
@@ -52,7 +52,7 @@ class RouteCallRequest(BaseModel):
 
 # -- Connector CRUD ----------------------------------------------------------
 
-@router.post("")
+@router.post("", response_model=Connector)
 async def create_connector(
     req: CreateConnectorRequest,
     customer_id: str = Depends(get_current_customer_id),
@@ -61,47 +61,44 @@ async def create_connector(
     conn = Connector(
         customer_id=customer_id,
         name=req.name,
-        connector_type=ConnectorType(req.connector_type),
+        connector_type=req.connector_type,
         status=ConnectorStatus.CONFIGURING,
         config=req.config,
     )
     conn_svc.create_connector(conn)
-    return conn.model_dump()
+    return conn
 
 
-@router.get("")
+@router.get("", response_model=list[Connector])
 async def list_connectors(customer_id: str = Depends(get_current_customer_id)):
     """List all connectors for the current customer."""
-    connectors = conn_svc.list_connectors(customer_id)
-    return [c.model_dump() for c in connectors]
+    return conn_svc.list_connectors(customer_id)
 
 
-@router.get("/{connector_id}")
+@router.get("/{connector_id}", response_model=Connector)
 async def get_connector(
     connector_id: str,
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Get a single connector."""
-    conn = conn_svc.get_connector(connector_id)
-    if not conn or conn.customer_id != customer_id:
+    conn = conn_svc.get_connector(connector_id, customer_id)
+    if not conn:
         raise HTTPException(404, "Connector not found")
-    return conn.model_dump()
+    return conn
 
 
-@router.patch("/{connector_id}")
+@router.patch("/{connector_id}", response_model=Connector)
 async def update_connector(
     connector_id: str,
     req: UpdateConnectorRequest,
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Update connector settings."""
-    conn = conn_svc.get_connector(connector_id)
-    if not conn or conn.customer_id != customer_id:
-        raise HTTPException(404, "Connector not found")
-
     updates = {k: v for k, v in req.model_dump().items() if v is not None}
-    updated = conn_svc.update_connector(connector_id, updates)
-    return updated.model_dump()
+    updated = conn_svc.update_connector(connector_id, updates, customer_id)
+    if not updated:
+        raise HTTPException(404, "Connector not found")
+    return updated
 
 
 @router.delete("/{connector_id}")
@@ -110,43 +107,37 @@ async def delete_connector(
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Delete a connector."""
-    conn = conn_svc.get_connector(connector_id)
-    if not conn or conn.customer_id != customer_id:
+    if not conn_svc.delete_connector(connector_id, customer_id):
         raise HTTPException(404, "Connector not found")
-    conn_svc.delete_connector(connector_id)
     return {"deleted": True}
 
 
 # -- Connection management ----------------------------------------------------
 
-@router.post("/{connector_id}/activate")
+@router.post("/{connector_id}/activate", response_model=Connector)
 async def activate_connector(
     connector_id: str,
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Activate a connector (validates config and connects)."""
-    conn = conn_svc.get_connector(connector_id)
-    if not conn or conn.customer_id != customer_id:
+    result = conn_svc.activate_connector(connector_id, customer_id)
+    if not result:
         raise HTTPException(404, "Connector not found")
-
-    result = conn_svc.activate_connector(connector_id)
-    if result and result.status == ConnectorStatus.ERROR:
+    if result.status == ConnectorStatus.ERROR:
         raise HTTPException(400, detail=result.error_message)
-    return result.model_dump() if result else {"error": "Activation failed"}
+    return result
 
 
-@router.post("/{connector_id}/deactivate")
+@router.post("/{connector_id}/deactivate", response_model=Connector)
 async def deactivate_connector(
     connector_id: str,
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Deactivate a connector."""
-    conn = conn_svc.get_connector(connector_id)
-    if not conn or conn.customer_id != customer_id:
+    result = conn_svc.deactivate_connector(connector_id, customer_id)
+    if not result:
         raise HTTPException(404, "Connector not found")
-
-    result = conn_svc.deactivate_connector(connector_id)
-    return result.model_dump() if result else {"error": "Deactivation failed"}
+    return result
 
 
 # -- Health & events ----------------------------------------------------------
@@ -157,24 +148,23 @@ async def get_health(
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Get connector health status."""
-    conn = conn_svc.get_connector(connector_id)
-    if not conn or conn.customer_id != customer_id:
+    conn = conn_svc.get_connector(connector_id, customer_id)
+    if not conn:
         raise HTTPException(404, "Connector not found")
     return conn_svc.get_health(connector_id)
 
 
-@router.get("/{connector_id}/events")
+@router.get("/{connector_id}/events", response_model=list[ConnectorEvent])
 async def list_events(
     connector_id: str,
     limit: int = 50,
     customer_id: str = Depends(get_current_customer_id),
 ):
     """List connector events (audit trail)."""
-    conn = conn_svc.get_connector(connector_id)
-    if not conn or conn.customer_id != customer_id:
+    conn = conn_svc.get_connector(connector_id, customer_id)
+    if not conn:
         raise HTTPException(404, "Connector not found")
-    events = conn_svc.get_events(connector_id, limit)
-    return [e.model_dump() for e in events]
+    return conn_svc.get_events(connector_id, limit)
 
 
 # -- Queue mapping & call routing ---------------------------------------------
@@ -186,8 +176,8 @@ async def map_queue(
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Map an external queue/skill to a VoxBridge department."""
-    conn = conn_svc.get_connector(connector_id)
-    if not conn or conn.customer_id != customer_id:
+    conn = conn_svc.get_connector(connector_id, customer_id)
+    if not conn:
         raise HTTPException(404, "Connector not found")
 
     result = conn_svc.map_queue_to_department(connector_id, req.external_queue_id, req.department_id)
@@ -203,8 +193,8 @@ async def route_call(
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Route an incoming call from an external platform."""
-    conn = conn_svc.get_connector(connector_id)
-    if not conn or conn.customer_id != customer_id:
+    conn = conn_svc.get_connector(connector_id, customer_id)
+    if not conn:
         raise HTTPException(404, "Connector not found")
 
     result = conn_svc.route_incoming_call(
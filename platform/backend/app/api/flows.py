@@ -18,7 +18,14 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
-from app.models.database import ConversationFlow, FlowNode, FlowEdge
+from app.models.database import (
+    ConversationFlow,
+    FlowEdge,
+    FlowNode,
+    FlowSummary,
+    FlowTestResult,
+    FlowVersion,
+)
 from app.services import flow_engine as fe
 from app.middleware.auth import get_current_customer_id
 
@@ -53,7 +60,7 @@ class CreateVersionRequest(BaseModel):
 
 # ── Endpoints ────────────────────────────────────────────────────
 
-@router.post("")
+@router.post("", response_model=ConversationFlow)
 async def create_flow(
     req: CreateFlowRequest,
     customer_id: str = Depends(get_current_customer_id),
@@ -71,48 +78,48 @@ async def create_flow(
         edges=edges,
     )
     fe.save_flow(flow)
-    return flow.model_dump()
+    return flow
 
 
-@router.get("")
+@router.get("", response_model=list[FlowSummary])
 async def list_flows(customer_id: str = Depends(get_current_customer_id)):
     """List all conversation flows."""
     flows = fe.list_flows(customer_id)
     return [
-        {
-            "id": f.id,
-            "agent_id": f.agent_id,
-            "name": f.name,
-            "description": f.description,
-            "is_active": f.is_active,
-            "version": f.version,
-            "node_count": len(f.nodes),
-            "edge_count": len(f.edges),
-            "created_at": f.created_at.isoformat(),
-            "updated_at": f.updated_at.isoformat(),
-        }
+        FlowSummary(
+            id=f.id,
+            agent_id=f.agent_id,
+            name=f.name,
+            description=f.description,
+            is_active=f.is_active,
+            version=f.version,
+            node_count=len(f.nodes),
+            edge_count=len(f.edges),
+            created_at=f.created_at,
+            updated_at=f.updated_at,
+        )
         for f in flows
     ]
 
 
-@router.get("/{flow_id}")
+@router.get("/{flow_id}", response_model=ConversationFlow)
 async def get_flow(flow_id: str, customer_id: str = Depends(get_current_customer_id)):
     """Get full flow details including nodes and edges."""
-    flow = fe.get_flow(flow_id)
-    if not flow or flow.customer_id != customer_id:
+    flow = fe.get_flow(flow_id, customer_id)
+    if not flow:
         raise HTTPException(404, "Flow not found")
-    return flow.model_dump()
+    return flow
 
 
-@router.patch("/{flow_id}")
+@router.patch("/{flow_id}", response_model=ConversationFlow)
 async def update_flow(
     flow_id: str,
     req: UpdateFlowRequest,
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Update a flow's name, description, nodes, or edges."""
-    flow = fe.get_flow(flow_id)
-    if not flow or flow.customer_id != customer_id:
+    flow = fe.get_flow(flow_id, customer_id)
+    if not flow:
         raise HTTPException(404, "Flow not found")
 
     if req.name is not None:
@@ -126,24 +133,22 @@ async def update_flow(
     flow.version += 1
 
     fe.save_flow(flow)
-    return flow.model_dump()
+    return flow
 
 
 @router.delete("/{flow_id}")
 async def delete_flow(flow_id: str, customer_id: str = Depends(get_current_customer_id)):
     """Delete a conversation flow."""
-    flow = fe.get_flow(flow_id)
-    if not flow or flow.customer_id != customer_id:
+    if not fe.delete_flow(flow_id, customer_id):
         raise HTTPException(404, "Flow not found")
-    fe.delete_flow(flow_id)
     return {"deleted": True}
 
 
 @router.post("/{flow_id}/activate")
 async def activate_flow(flow_id: str, customer_id: str = Depends(get_current_customer_id)):
     """Set a flow as the active flow for its agent."""
-    flow = fe.get_flow(flow_id)
-    if not flow or flow.customer_id != customer_id:
+    flow = fe.get_flow(flow_id, customer_id)
+    if not flow:
         raise HTTPException(404, "Flow not found")
 
     # Validate before activating
@@ -151,42 +156,37 @@ async def activate_flow(flow_id: str, customer_id: str = Depends(get_current_cus
     if errors:
         raise HTTPException(400, {"errors": errors})
 
-    # Deactivate other flows for same agent
-    for f in fe.list_flows(customer_id):
-        if f.agent_id == flow.agent_id:
-            f.is_active = False
-    flow.is_active = True
-    fe.save_flow(flow)
+    # Deactivates the agent's previously active flow
+    fe.activate_flow(flow)
     return {"activated": True, "flow_id": flow_id}
 
 
-@router.post("/{flow_id}/test")
+@router.post("/{flow_id}/test", response_model=FlowTestResult)
 async def test_flow(
     flow_id: str,
     req: TestFlowRequest,
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Simulate executing a flow with test inputs."""
-    flow = fe.get_flow(flow_id)
-    if not flow or flow.customer_id != customer_id:
+    flow = fe.get_flow(flow_id, customer_id)
+    if not flow:
         raise HTTPException(404, "Flow not found")
 
     result = fe.execute_flow(flow, req.inputs)
-    return result.model_dump()
+    return result
 
 
-@router.post("/{flow_id}/version")
+@router.post("/{flow_id}/version", response_model=FlowVersion)
 async def create_version(
     flow_id: str,
     req: CreateVersionRequest,
     customer_id: str = Depends(get_current_customer_id),
 ):
     """Create a versioned snapshot of the current flow for A/B testing."""
-    flow = fe.get_flow(flow_id)
-    if not flow or flow.customer_id != customer_id:
+    flow = fe.get_flow(flow_id, customer_id)
+    if not flow:
         raise HTTPException(404, "Flow not found")
 
-    from app.models.database import FlowVersion
     version = FlowVersion(
         flow_id=flow_id,
         version=flow.version,
@@ -196,21 +196,20 @@ async def create_version(
         traffic_percent=req.traffic_percent,
     )
     fe.save_version(flow_id, version)
-    return version.model_dump()
+    return version
 
 
-@router.get("/{flow_id}/versions")
+@router.get("/{flow_id}/versions", response_model=list[FlowVersion])
 async def list_versions(flow_id: str, customer_id: str = Depends(get_current_customer_id)):
     """List all versions of a flow."""
-    flow = fe.get_flow(flow_id)
-    if not flow or flow.customer_id != customer_id:
+    flow = fe.get_flow(flow_id, customer_id)
+    if not flow:
         raise HTTPException(404, "Flow not found")
 
-    versions = fe.get_versions(flow_id)
-    return [v.model_dump() for v in versions]
+    return fe.get_versions(flow_id)
 
 
-@router.post("/default")
+@router.post("/default", response_model=ConversationFlow)
 async def create_default(
     req: CreateFlowRequest,
     customer_id: str = Depends(get_current_customer_id),
@@ -218,4 +217,4 @@ async def create_default(
     """Create a default starter flow for quick setup."""
     flow = fe.create_default_flow(customer_id, req.agent_id, req.name)
     fe.save_flow(flow)
-    return flow.model_dump()
+    return flow
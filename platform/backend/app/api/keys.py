@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+import asyncio
+from weakref import WeakValueDictionary
+
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from app.middleware.auth import get_current_customer
@@ -12,6 +15,7 @@ from app.models.database import (
     Customer,
 )
 from app.services.database import (
+    count_active_api_keys,
     create_api_key,
     get_api_keys_for_customer,
     revoke_api_key,
@@ -19,6 +23,12 @@ from app.services.database import (
 
 router = APIRouter(prefix="/api-keys", tags=["API Keys"])
 
+MAX_ACTIVE_KEYS = 10
+
+# One lock per customer while a create is in flight, so two concurrent
+# requests can't both pass the limit check before either key is inserted
+_create_locks: WeakValueDictionary[str, asyncio.Lock] = WeakValueDictionary()
+
 
 @router.post("", response_model=ApiKeyCreatedResponse, status_code=status.HTTP_201_CREATED)
 async def create_key(
@@ -26,16 +36,20 @@ async def create_key(
     customer: Customer = Depends(get_current_customer),
 ):
     """Create a new API key. The full key is only returned once."""
-    # Limit number of keys
-    existing = get_api_keys_for_customer(customer.id)
-    active = [k for k in existing if k.status == "active"]
-    if len(active) >= 10:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Maximum 10 active API keys allowed",
-        )
+    lock = _create_locks.get(customer.id)
+    if lock is None:
+        lock = _create_locks[customer.id] = asyncio.Lock()
+
+    async with lock:
+        # Limit number of keys
+        active = await asyncio.to_thread(count_active_api_keys, customer.id)
+        if active >= MAX_ACTIVE_KEYS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Maximum {MAX_ACTIVE_KEYS} active API keys allowed",
+            )
 
-    api_key, full_key = create_api_key(customer.id, body.name)
+        api_key, full_key = await asyncio.to_thread(create_api_key, customer.id, body.name)
 
     return ApiKeyCreatedResponse(
         id=api_key.id,
@@ -51,18 +65,9 @@ async def create_key(
 @router.get("", response_model=list[ApiKeyResponse])
 async def list_keys(customer: Customer = Depends(get_current_customer)):
     """List all API keys for the current customer."""
-    keys = get_api_keys_for_customer(customer.id)
-    return [
-        ApiKeyResponse(
-            id=k.id,
-            name=k.name,
-            key_prefix=k.key_prefix,
-            status=k.status,
-            last_used_at=k.last_used_at,
-            created_at=k.created_at,
-        )
-        for k in keys
-    ]
+    # response_model validates the ApiKey rows by attribute, which
+    # drops key_hash and customer_id
+    return await asyncio.to_thread(get_api_keys_for_customer, customer.id)
 
 
 @router.delete("/{key_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -71,7 +76,7 @@ async def revoke_key(
     customer: Customer = Depends(get_current_customer),
 ):
     """Revoke an API key."""
-    success = revoke_api_key(key_id, customer.id)
+    success = await asyncio.to_thread(revoke_api_key, key_id, customer.id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
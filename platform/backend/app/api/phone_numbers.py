@@ -28,6 +28,7 @@ from app.services.database import (
     list_phone_numbers,
     release_phone_number,
 )
+from app.services.telephony import get_twilio_client
 
 router = APIRouter(prefix="/phone-numbers", tags=["Phone Numbers"])
 
@@ -69,9 +70,7 @@ async def search_available_numbers(
     area code, or pattern match.
     """
     try:
-        from twilio.rest import Client as TwilioClient
-
-        twilio = TwilioClient(settings.twilio_account_sid, settings.twilio_auth_token)
+        twilio = get_twilio_client()
 
         # Build search params
         search_kwargs: dict = {"limit": body.limit}
@@ -167,9 +166,7 @@ async def buy_phone_number(
     # Provision via Twilio
     provider_sid = ""
     try:
-        from twilio.rest import Client as TwilioClient
-
-        twilio = TwilioClient(settings.twilio_account_sid, settings.twilio_auth_token)
+        twilio = get_twilio_client()
 
         # Configure webhook URL for inbound calls
         webhook_url = f"{settings.twilio_webhook_base_url}/api/v1/webhooks/twilio/inbound"
@@ -319,10 +316,8 @@ async def release_phone_number_endpoint(
 
     # Release from Twilio
     try:
-        from twilio.rest import Client as TwilioClient
-
         if phone.provider_sid and not phone.provider_sid.startswith("PN_mock_"):
-            twilio = TwilioClient(settings.twilio_account_sid, settings.twilio_auth_token)
+            twilio = get_twilio_client()
             twilio.incoming_phone_numbers(phone.provider_sid).delete()
             logger.info(f"Released Twilio number {phone.phone_number} (SID: {phone.provider_sid})")
     except ImportError:
@@ -76,6 +76,7 @@ class Customer(BaseModel):
     password_hash: str = ""
     plan: PlanTier = PlanTier.FREE
     stripe_customer_id: str | None = None
+    agent_count: int = 0  # non-archived agents, maintained by a DB trigger
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -435,6 +436,14 @@ class CallDetailResponse(CallResponse):
     tool_calls: list[dict] = Field(default_factory=list)
 
 
+class CallListResponse(BaseModel):
+    """Paginated call list."""
+    calls: list[CallResponse]
+    total: int
+    limit: int
+    offset: int
+
+
 class CallListParams(BaseModel):
     """Query params for listing calls."""
     agent_id: str | None = None
@@ -862,6 +871,20 @@ class ConversationFlow(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class FlowSummary(BaseModel):
+    """Flow list entry: metadata and graph size, without the graph itself."""
+    id: str
+    agent_id: str
+    name: str
+    description: str
+    is_active: bool
+    version: int
+    node_count: int
+    edge_count: int
+    created_at: datetime
+    updated_at: datetime
+
+
 class FlowVersion(BaseModel):
     """Versioned snapshot of a flow for A/B testing."""
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -14,6 +14,7 @@ from __future__ import annotations
 
 import re
 import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 from typing import Any
 
@@ -36,6 +37,13 @@ _sessions: dict[str, AssistSession] = {}
 MAX_SESSIONS = 500
 MAX_SUGGESTIONS_PER_SESSION = 100
 
+# Per active session: recent caller utterances (normalized) that already
+# produced response suggestions. Live calls are full of repeats ("ok",
+# "yes", restated questions); re-suggesting the same templates for them
+# only duplicates what the agent already has on screen.
+_recent_utterances: dict[str, OrderedDict[str, None]] = {}
+RECENT_UTTERANCES_PER_SESSION = 64
+
 # PII patterns for compliance detection
 PII_PATTERNS = {
     "ssn": r"\b\d{3}[-\s]?\d{2}[-\s]?\d{4}\b",
@@ -44,6 +52,7 @@ PII_PATTERNS = {
     "email": r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b",
     "dob": r"\b(?:0[1-9]|1[0-2])[/\-](?:0[1-9]|[12]\d|3[01])[/\-](?:19|20)\d{2}\b",
 }
+_PII_REGEXES = [(pii_type, re.compile(pattern)) for pii_type, pattern in PII_PATTERNS.items()]
 
 # Negative sentiment indicators
 NEGATIVE_INDICATORS = [
@@ -92,6 +101,18 @@ def get_session(session_id: str) -> AssistSession | None:
     return _sessions.get(session_id)
 
 
+def get_session_for_customer(session_id: str, customer_id: str) -> AssistSession | None:
+    """Look up a session owned by ``customer_id`` (None if missing or not theirs).
+
+    The mutating functions below take the returned session, so a request
+    resolves its session once.
+    """
+    session = _sessions.get(session_id)
+    if session is None or session.customer_id != customer_id:
+        return None
+    return session
+
+
 def list_sessions(customer_id: str, active_only: bool = False) -> list[AssistSession]:
     sessions = [s for s in _sessions.values() if s.customer_id == customer_id]
     if active_only:
@@ -99,12 +120,8 @@ def list_sessions(customer_id: str, active_only: bool = False) -> list[AssistSes
     return sorted(sessions, key=lambda s: s.created_at, reverse=True)
 
 
-def end_session(session_id: str) -> AssistSession | None:
+def end_session(session: AssistSession) -> AssistSession:
     """End a session and generate call summary."""
-    session = _sessions.get(session_id)
-    if not session:
-        return None
-
     session.status = AssistSessionStatus.COMPLETED
     session.ended_at = datetime.now(timezone.utc)
 
@@ -112,12 +129,14 @@ def end_session(session_id: str) -> AssistSession | None:
     session.call_summary = generate_call_summary(session)
     session.next_steps = generate_next_steps(session)
 
-    logger.info(f"Assist session ended: {session_id}")
+    _recent_utterances.pop(session.id, None)
+    logger.info(f"Assist session ended: {session.id}")
     return session
 
 
-def delete_session(session_id: str) -> bool:
-    return _sessions.pop(session_id, None) is not None
+def delete_session(session: AssistSession) -> bool:
+    _recent_utterances.pop(session.id, None)
+    return _sessions.pop(session.id, None) is not None
 
 
 # ──────────────────────────────────────────────────────────────────
@@ -125,22 +144,21 @@ def delete_session(session_id: str) -> bool:
 # ──────────────────────────────────────────────────────────────────
 
 def add_transcript_entry(
-    session_id: str,
+    session: AssistSession,
     role: str,
     content: str,
 ) -> list[AssistSuggestion]:
     """Add a transcript entry and generate suggestions.
 
     Args:
-        session_id: The assist session ID.
+        session: The assist session.
         role: Who spoke — "caller" or "agent".
         content: What was said.
 
     Returns:
         List of new suggestions generated from this utterance.
     """
-    session = _sessions.get(session_id)
-    if not session or session.status != AssistSessionStatus.ACTIVE:
+    if session.status != AssistSessionStatus.ACTIVE:
         return []
 
     session.transcript.append({
@@ -160,8 +178,9 @@ def add_transcript_entry(
         sentiment_suggestions = detect_sentiment(session, content)
         new_suggestions.extend(sentiment_suggestions)
 
-    # 3. Generate response suggestions (only when caller speaks)
-    if role == "caller":
+    # 3. Generate response suggestions (only when caller speaks, and not
+    #    again for an utterance the caller just said)
+    if role == "caller" and not _seen_recently(session.id, content):
         response_suggestions = generate_response_suggestions(session, content)
         new_suggestions.extend(response_suggestions)
 
@@ -173,6 +192,19 @@ def add_transcript_entry(
     return new_suggestions
 
 
+def _seen_recently(session_id: str, content: str) -> bool:
+    """Record a caller utterance; True if it repeats a recent one."""
+    key = " ".join(content.lower().split())[-128:]
+    recent = _recent_utterances.setdefault(session_id, OrderedDict())
+    if key in recent:
+        recent.move_to_end(key)
+        return True
+    recent[key] = None
+    if len(recent) > RECENT_UTTERANCES_PER_SESSION:
+        recent.popitem(last=False)
+    return False
+
+
 # ──────────────────────────────────────────────────────────────────
 # PII detection
 # ──────────────────────────────────────────────────────────────────
@@ -185,8 +217,8 @@ def detect_pii(
     """Detect PII in transcript and generate compliance warnings."""
     suggestions = []
 
-    for pii_type, pattern in PII_PATTERNS.items():
-        if re.search(pattern, text):
+    for pii_type, regex in _PII_REGEXES:
+        if regex.search(text):
             session.pii_detected = True
             session.compliance_warnings += 1
 
@@ -322,11 +354,8 @@ def generate_response_suggestions(
 # Accept / dismiss suggestions
 # ──────────────────────────────────────────────────────────────────
 
-def accept_suggestion(session_id: str, suggestion_id: str) -> AssistSuggestion | None:
+def accept_suggestion(session: AssistSession, suggestion_id: str) -> AssistSuggestion | None:
     """Mark a suggestion as accepted (used by the agent)."""
-    session = _sessions.get(session_id)
-    if not session:
-        return None
     for s in session.suggestions:
         if s.id == suggestion_id:
             s.accepted = True
@@ -335,11 +364,8 @@ def accept_suggestion(session_id: str, suggestion_id: str) -> AssistSuggestion |
     return None
 
 
-def dismiss_suggestion(session_id: str, suggestion_id: str) -> AssistSuggestion | None:
+def dismiss_suggestion(session: AssistSession, suggestion_id: str) -> AssistSuggestion | None:
     """Mark a suggestion as dismissed (not useful)."""
-    session = _sessions.get(session_id)
-    if not session:
-        return None
     for s in session.suggestions:
         if s.id == suggestion_id:
             s.accepted = False
@@ -16,7 +16,9 @@ Alerts are stored in-memory (production would use DB + push notifications).
 from __future__ import annotations
 
 import time
+from collections import Counter
 from datetime import datetime, timezone
+from itertools import islice
 from typing import Any
 
 from loguru import logger
@@ -37,6 +39,12 @@ from app.services import event_bus
 
 _rules: dict[str, AlertRule] = {}
 _alerts: dict[str, Alert] = {}
+# Same alerts per customer. Both dicts keep insertion (= creation) order,
+# so the oldest alert is first and listings walk newest-first with reversed()
+_alerts_by_customer: dict[str, dict[str, Alert]] = {}
+# Running per-customer counts (by severity, plus "unacknowledged") kept in
+# step with the stores above, so the summary the dashboard polls is O(1)
+_alert_counts: dict[str, Counter] = {}
 
 MAX_ALERTS = 1000
 
@@ -77,13 +85,24 @@ def delete_rule(rule_id: str) -> bool:
 # Alert CRUD
 # ──────────────────────────────────────────────────────────────────
 
+def _count_alert(alert: Alert, delta: int) -> None:
+    counts = _alert_counts.setdefault(alert.customer_id, Counter())
+    counts[alert.severity] += delta
+    if not alert.acknowledged:
+        counts["unacknowledged"] += delta
+
+
 def create_alert(alert: Alert) -> Alert:
     """Create and store a new alert."""
     # Evict oldest if at capacity
     if len(_alerts) >= MAX_ALERTS:
-        oldest_key = min(_alerts, key=lambda k: _alerts[k].created_at)
-        del _alerts[oldest_key]
+        oldest = _alerts.pop(next(iter(_alerts)))
+        customer_alerts = _alerts_by_customer.get(oldest.customer_id)
+        if customer_alerts is not None and customer_alerts.pop(oldest.id, None):
+            _count_alert(oldest, -1)
     _alerts[alert.id] = alert
+    _alerts_by_customer.setdefault(alert.customer_id, {})[alert.id] = alert
+    _count_alert(alert, 1)
     logger.warning(f"ALERT [{alert.severity}]: {alert.title}")
     event_bus.publish(alert.customer_id, event_bus.EventType.ALERT_FIRED, {
         "alert_id": alert.id, "title": alert.title,
@@ -103,42 +122,52 @@ def list_alerts(
     severity: str | None = None,
     limit: int = 50,
 ) -> list[Alert]:
-    alerts = [a for a in _alerts.values() if a.customer_id == customer_id]
-    if unacknowledged_only:
-        alerts = [a for a in alerts if not a.acknowledged]
-    if severity:
-        alerts = [a for a in alerts if a.severity == severity]
-    alerts.sort(key=lambda a: a.created_at, reverse=True)
-    return alerts[:limit]
+    result: list[Alert] = []
+    if limit <= 0:
+        return result
+    # Newest first; stops as soon as `limit` matches are found
+    for alert in reversed(_alerts_by_customer.get(customer_id, {}).values()):
+        if unacknowledged_only and alert.acknowledged:
+            continue
+        if severity and alert.severity != severity:
+            continue
+        result.append(alert)
+        if len(result) >= limit:
+            break
+    return result
 
 
 def acknowledge_alert(alert_id: str) -> Alert | None:
     alert = _alerts.get(alert_id)
-    if alert:
+    if alert and not alert.acknowledged:
         alert.acknowledged = True
         alert.acknowledged_at = datetime.now(timezone.utc)
+        _alert_counts[alert.customer_id]["unacknowledged"] -= 1
     return alert
 
 
 def acknowledge_all(customer_id: str) -> int:
     count = 0
-    for alert in _alerts.values():
-        if alert.customer_id == customer_id and not alert.acknowledged:
+    for alert in _alerts_by_customer.get(customer_id, {}).values():
+        if not alert.acknowledged:
             alert.acknowledged = True
             alert.acknowledged_at = datetime.now(timezone.utc)
             count += 1
+    if count:
+        _alert_counts[customer_id]["unacknowledged"] -= count
     return count
 
 
 def get_alert_summary(customer_id: str) -> AlertSummary:
-    alerts = [a for a in _alerts.values() if a.customer_id == customer_id]
+    alerts = _alerts_by_customer.get(customer_id, {})
+    counts = _alert_counts.get(customer_id, Counter())
     return AlertSummary(
         total=len(alerts),
-        unacknowledged=sum(1 for a in alerts if not a.acknowledged),
-        critical=sum(1 for a in alerts if a.severity == AlertSeverity.CRITICAL),
-        warning=sum(1 for a in alerts if a.severity == AlertSeverity.WARNING),
-        info=sum(1 for a in alerts if a.severity == AlertSeverity.INFO),
-        recent=sorted(alerts, key=lambda a: a.created_at, reverse=True)[:10],
+        unacknowledged=counts["unacknowledged"],
+        critical=counts[AlertSeverity.CRITICAL],
+        warning=counts[AlertSeverity.WARNING],
+        info=counts[AlertSeverity.INFO],
+        recent=list(islice(reversed(alerts.values()), 10)),
     )
 
 
@@ -263,8 +292,11 @@ def evaluate_rule(
     return None
 
 
-def evaluate_all_rules(customer_id: str, metrics: dict[str, Any]) -> list[Alert]:
-    """Evaluate all enabled rules for a customer and create alerts."""
+def evaluate_all_rules(customer_id: str, metrics: dict[str, Any]) -> tuple[list[Alert], int]:
+    """Evaluate all enabled rules for a customer and create alerts.
+
+    Returns (triggered alerts, number of rules evaluated).
+    """
     rules = list_rules(customer_id)
     triggered: list[Alert] = []
     for rule in rules:
@@ -272,7 +304,7 @@ def evaluate_all_rules(customer_id: str, metrics: dict[str, Any]) -> list[Alert]
         if alert:
             create_alert(alert)
             triggered.append(alert)
-    return triggered
+    return triggered, len(rules)
 
 
 # ──────────────────────────────────────────────────────────────────
@@ -2,35 +2,96 @@
 
 from __future__ import annotations
 
+import base64
+import hashlib
+import hmac
+import json
 from datetime import datetime, timezone, timedelta
 
 import bcrypt
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from fastapi import Response
 from jose import JWTError, jwt
 
 from app.config import settings
 from app.models.database import Customer, CustomerResponse
+from app.services.json_cache import JsonCache
+
+_customer_json = JsonCache(maxsize=1024)
+
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+# HS* tokens are signed with a pre-keyed HMAC: copy() clones the state after
+# the key pads have been hashed, so each token costs one MAC over the payload
+# instead of re-deriving the key. Other algorithms go through python-jose.
+_JWT_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+_jwt_digest = _JWT_DIGESTS.get(settings.jwt_algorithm)
+_jwt_hmac = (
+    hmac.new(settings.jwt_secret.encode("utf-8"), digestmod=_jwt_digest)
+    if _jwt_digest is not None
+    else None
+)
+_jwt_header = _b64url(
+    json.dumps({"alg": settings.jwt_algorithm, "typ": "JWT"}, separators=(",", ":")).encode()
+)
+
+
+# argon2id at the OWASP baseline (19 MiB, 2 passes): memory-hard, so it costs
+# attackers far more per guess than bcrypt for similar server CPU per login
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
 
 
 def hash_password(password: str) -> str:
-    """Hash a password with bcrypt."""
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    """Hash a password with argon2id."""
+    return _password_hasher.hash(password)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    """Verify a plaintext password against a hash."""
-    return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+    """Verify a plaintext password against a hash.
+
+    Accepts argon2id hashes and bcrypt hashes stored before the switch.
+    """
+    if hashed.startswith("$2"):
+        return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+    try:
+        return _password_hasher.verify(hashed, plain)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+def password_needs_rehash(hashed: str) -> bool:
+    """True for bcrypt hashes and argon2 hashes with outdated parameters."""
+    if hashed.startswith("$2"):
+        return True
+    try:
+        return _password_hasher.check_needs_rehash(hashed)
+    except InvalidHashError:
+        return True
 
 
 def create_access_token(customer_id: str, email: str) -> str:
     """Create a JWT access token."""
-    expires = datetime.now(timezone.utc) + timedelta(minutes=settings.jwt_expiry_minutes)
+    now = datetime.now(timezone.utc)
+    expires = now + timedelta(minutes=settings.jwt_expiry_minutes)
     payload = {
         "sub": customer_id,
         "email": email,
-        "exp": expires,
-        "iat": datetime.now(timezone.utc),
+        "exp": int(expires.timestamp()),
+        "iat": int(now.timestamp()),
     }
-    return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+    if _jwt_hmac is None:
+        return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+
+    signing_input = (
+        _jwt_header + b"." + _b64url(json.dumps(payload, separators=(",", ":")).encode())
+    )
+    mac = _jwt_hmac.copy()
+    mac.update(signing_input)
+    return (signing_input + b"." + _b64url(mac.digest())).decode("ascii")
 
 
 def decode_token(token: str) -> dict | None:
@@ -53,3 +114,11 @@ def customer_to_response(customer: Customer) -> CustomerResponse:
         plan=customer.plan,
         created_at=customer.created_at,
     )
+
+
+def customer_json_response(customer: Customer) -> Response:
+    """customer_to_response as a JSON Response, reused while the row is unchanged."""
+    return _customer_json.response(
+        (customer.id, customer.updated_at),
+        lambda: customer_to_response(customer),
+    )
@@ -12,7 +12,9 @@ Enterprise requirement for SOC 2 / HIPAA / PCI DSS readiness.
 from __future__ import annotations
 
 import re
+from collections import deque
 from datetime import datetime, timezone
+from itertools import islice
 from typing import Any
 
 from loguru import logger
@@ -32,12 +34,15 @@ from app.models.database import (
 # ──────────────────────────────────────────────────────────────────
 
 _rules: dict[str, ComplianceRule] = {}
+_rules_by_customer: dict[str, dict[str, ComplianceRule]] = {}  # customer_id → {rule_id: rule}
 _violations: dict[str, ComplianceViolation] = {}
-_audit_log: list[AuditLogEntry] = []
 
 MAX_VIOLATIONS = 5000
 MAX_AUDIT_ENTRIES = 10000
 
+# Append-only, oldest first; the deque drops the oldest entry once full
+_audit_log: deque[AuditLogEntry] = deque(maxlen=MAX_AUDIT_ENTRIES)
+
 
 # PII patterns with redaction replacements
 PII_REDACTION_PATTERNS = {
@@ -63,6 +68,12 @@ PII_REDACTION_PATTERNS = {
     },
 }
 
+_PII_REGEXES = {key: re.compile(info["pattern"]) for key, info in PII_REDACTION_PATTERNS.items()}
+
+# Every PII pattern above needs at least one digit, so text without digits
+# can skip the per-pattern scans entirely
+_DIGIT = re.compile(r"\d")
+
 # Default forbidden phrases
 DEFAULT_FORBIDDEN = [
     "I guarantee",
@@ -80,20 +91,27 @@ DEFAULT_FORBIDDEN = [
 
 def create_rule(rule: ComplianceRule) -> ComplianceRule:
     _rules[rule.id] = rule
+    _rules_by_customer.setdefault(rule.customer_id, {})[rule.id] = rule
     logger.info(f"Compliance rule created: {rule.name} ({rule.rule_type})")
     return rule
 
 
-def get_rule(rule_id: str) -> ComplianceRule | None:
-    return _rules.get(rule_id)
+def get_rule(rule_id: str, customer_id: str | None = None) -> ComplianceRule | None:
+    """Look up a rule; with ``customer_id``, only if that customer owns it."""
+    rule = _rules.get(rule_id)
+    if rule is None or (customer_id is not None and rule.customer_id != customer_id):
+        return None
+    return rule
 
 
 def list_rules(customer_id: str) -> list[ComplianceRule]:
-    return [r for r in _rules.values() if r.customer_id == customer_id]
+    return list(_rules_by_customer.get(customer_id, {}).values())
 
 
-def update_rule(rule_id: str, updates: dict[str, Any]) -> ComplianceRule | None:
-    rule = _rules.get(rule_id)
+def update_rule(
+    rule_id: str, updates: dict[str, Any], customer_id: str | None = None
+) -> ComplianceRule | None:
+    rule = get_rule(rule_id, customer_id)
     if not rule:
         return None
     for key, value in updates.items():
@@ -102,8 +120,12 @@ def update_rule(rule_id: str, updates: dict[str, Any]) -> ComplianceRule | None:
     return rule
 
 
-def delete_rule(rule_id: str) -> bool:
-    return _rules.pop(rule_id, None) is not None
+def delete_rule(rule_id: str, customer_id: str | None = None) -> bool:
+    if get_rule(rule_id, customer_id) is None:
+        return False
+    rule = _rules.pop(rule_id)
+    _rules_by_customer.get(rule.customer_id, {}).pop(rule_id, None)
+    return True
 
 
 def create_default_rules(customer_id: str) -> list[ComplianceRule]:
@@ -162,8 +184,12 @@ def create_violation(violation: ComplianceViolation) -> ComplianceViolation:
     return violation
 
 
-def get_violation(violation_id: str) -> ComplianceViolation | None:
-    return _violations.get(violation_id)
+def get_violation(violation_id: str, customer_id: str | None = None) -> ComplianceViolation | None:
+    """Look up a violation; with ``customer_id``, only if that customer owns it."""
+    v = _violations.get(violation_id)
+    if v is None or (customer_id is not None and v.customer_id != customer_id):
+        return None
+    return v
 
 
 def list_violations(
@@ -172,17 +198,20 @@ def list_violations(
     rule_type: str = "",
     limit: int = 50,
 ) -> list[ComplianceViolation]:
-    violations = [v for v in _violations.values() if v.customer_id == customer_id]
-    if unresolved_only:
-        violations = [v for v in violations if not v.resolved]
-    if rule_type:
-        violations = [v for v in violations if v.rule_type.value == rule_type]
+    violations = [
+        v for v in _violations.values()
+        if v.customer_id == customer_id
+        and not (unresolved_only and v.resolved)
+        and (not rule_type or v.rule_type.value == rule_type)
+    ]
     violations.sort(key=lambda v: v.created_at, reverse=True)
     return violations[:limit]
 
 
-def resolve_violation(violation_id: str, resolved_by: str = "") -> ComplianceViolation | None:
-    v = _violations.get(violation_id)
+def resolve_violation(
+    violation_id: str, resolved_by: str = "", customer_id: str | None = None
+) -> ComplianceViolation | None:
+    v = get_violation(violation_id, customer_id)
     if not v:
         return None
     v.resolved = True
@@ -209,44 +238,121 @@ def scan_transcript(
     Returns:
         List of violations found.
     """
-    rules = [r for r in list_rules(customer_id) if r.enabled]
+    [violations] = find_violations(enabled_rules(customer_id), customer_id, [(call_id, transcript)])
+    record_violations(violations)
+    return violations
+
+
+def scan_transcripts(
+    customer_id: str,
+    items: list[tuple[str, list[dict]]],
+) -> list[list[ComplianceViolation]]:
+    """Scan several call transcripts against one snapshot of the enabled rules.
+
+    Args:
+        customer_id: Customer ID for looking up rules.
+        items: ``(call_id, transcript)`` pairs.
+
+    Returns:
+        The violations found for each item, in the same order.
+    """
+    found = find_violations(enabled_rules(customer_id), customer_id, items)
+    for violations in found:
+        record_violations(violations)
+    return found
+
+
+def enabled_rules(customer_id: str) -> list[ComplianceRule]:
+    """Snapshot of the customer's enabled rules, for ``find_violations``."""
+    return [r for r in _rules_by_customer.get(customer_id, {}).values() if r.enabled]
+
+
+def find_violations(
+    rules: list[ComplianceRule],
+    customer_id: str,
+    items: list[tuple[str, list[dict]]],
+) -> list[list[ComplianceViolation]]:
+    """Match ``(call_id, transcript)`` pairs against ``rules`` without storing anything.
+
+    Touches no module state, so it is safe to run in a worker thread; pass
+    the results to ``record_violations`` back on the caller's thread.
+    """
+    return [_scan(rules, customer_id, call_id, transcript) for call_id, transcript in items]
+
+
+def record_violations(violations: list[ComplianceViolation]) -> None:
+    for v in violations:
+        create_violation(v)
+
+
+def _scan(
+    rules: list[ComplianceRule],
+    customer_id: str,
+    call_id: str,
+    transcript: list[dict],
+) -> list[ComplianceViolation]:
     violations: list[ComplianceViolation] = []
+    if not rules:
+        return violations
 
+    # Derive everything the rules look at once per transcript, not once per rule
     full_text = " ".join(t.get("content", "") for t in transcript)
-    agent_text = " ".join(t.get("content", "") for t in transcript if t.get("role") == "agent")
+    agent_lower = " ".join(
+        t.get("content", "") for t in transcript if t.get("role") == "agent"
+    ).lower()
+    needs_pii = any(r.rule_type in _PII_RULE_TYPES for r in rules)
+    pii_counts = _count_pii(full_text) if needs_pii else {}
 
     for rule in rules:
-        rule_violations = _check_rule(rule, customer_id, call_id, full_text, agent_text, transcript)
+        rule_violations = _check_rule(rule, customer_id, call_id, agent_lower, pii_counts)
         violations.extend(rule_violations)
 
     return violations
 
 
+_PII_RULE_TYPES = {
+    ComplianceRuleType.PII_REDACTION,
+    ComplianceRuleType.HIPAA,
+    ComplianceRuleType.PCI_DSS,
+}
+
+
+def _count_pii(text: str) -> dict[str, int]:
+    """Occurrences of each PII pattern in ``text``; patterns with none are omitted."""
+    if not _DIGIT.search(text):
+        return {}
+    counts = {}
+    for pii_key, regex in _PII_REGEXES.items():
+        matches = regex.findall(text)
+        if matches:
+            counts[pii_key] = len(matches)
+    return counts
+
+
 def _check_rule(
     rule: ComplianceRule,
     customer_id: str,
     call_id: str,
-    full_text: str,
-    agent_text: str,
-    transcript: list[dict],
+    agent_lower: str,
+    pii_counts: dict[str, int],
 ) -> list[ComplianceViolation]:
     """Check a single compliance rule against the transcript."""
     violations = []
 
     if rule.rule_type == ComplianceRuleType.PII_REDACTION:
-        violations.extend(_check_pii(rule, customer_id, call_id, full_text))
+        violations.extend(_check_pii(rule, customer_id, call_id, pii_counts))
 
     elif rule.rule_type == ComplianceRuleType.FORBIDDEN_PHRASES:
-        violations.extend(_check_forbidden(rule, customer_id, call_id, agent_text))
+        violations.extend(_check_forbidden(rule, customer_id, call_id, agent_lower))
 
     elif rule.rule_type == ComplianceRuleType.DISCLOSURE_REQUIRED:
-        violations.extend(_check_disclosure(rule, customer_id, call_id, agent_text))
+        violations.extend(_check_disclosure(rule, customer_id, call_id, agent_lower))
 
     elif rule.rule_type == ComplianceRuleType.PCI_DSS:
-        violations.extend(_check_pci(rule, customer_id, call_id, full_text))
+        violations.extend(_check_pci(rule, customer_id, call_id, pii_counts))
 
     elif rule.rule_type == ComplianceRuleType.HIPAA:
-        violations.extend(_check_pii(rule, customer_id, call_id, full_text))
+        violations.extend(_check_pii(rule, customer_id, call_id, pii_counts))
 
     return violations
 
@@ -255,26 +361,24 @@ def _check_pii(
     rule: ComplianceRule,
     customer_id: str,
     call_id: str,
-    text: str,
+    pii_counts: dict[str, int],
 ) -> list[ComplianceViolation]:
-    """Check for PII patterns in text."""
+    """Report each PII pattern found in the transcript."""
     violations = []
-    for pii_key, pii_info in PII_REDACTION_PATTERNS.items():
-        matches = re.findall(pii_info["pattern"], text)
-        if matches:
-            v = ComplianceViolation(
-                customer_id=customer_id,
-                call_id=call_id,
-                rule_id=rule.id,
-                rule_name=rule.name,
-                rule_type=rule.rule_type,
-                severity=rule.severity,
-                description=f"{pii_info['label']} detected in transcript",
-                transcript_excerpt=f"[{pii_info['label']} found — {len(matches)} occurrence(s)]",
-                redacted_text=pii_info["replacement"],
-            )
-            create_violation(v)
-            violations.append(v)
+    for pii_key, count in pii_counts.items():
+        pii_info = PII_REDACTION_PATTERNS[pii_key]
+        v = ComplianceViolation(
+            customer_id=customer_id,
+            call_id=call_id,
+            rule_id=rule.id,
+            rule_name=rule.name,
+            rule_type=rule.rule_type,
+            severity=rule.severity,
+            description=f"{pii_info['label']} detected in transcript",
+            transcript_excerpt=f"[{pii_info['label']} found — {count} occurrence(s)]",
+            redacted_text=pii_info["replacement"],
+        )
+        violations.append(v)
     return violations
 
 
@@ -282,15 +386,14 @@ def _check_forbidden(
     rule: ComplianceRule,
     customer_id: str,
     call_id: str,
-    agent_text: str,
+    agent_lower: str,
 ) -> list[ComplianceViolation]:
     """Check for forbidden phrases in agent speech."""
     violations = []
     forbidden = rule.config.get("forbidden", DEFAULT_FORBIDDEN)
-    text_lower = agent_text.lower()
 
     for phrase in forbidden:
-        if phrase.lower() in text_lower:
+        if phrase.lower() in agent_lower:
             v = ComplianceViolation(
                 customer_id=customer_id,
                 call_id=call_id,
@@ -301,7 +404,6 @@ def _check_forbidden(
                 description=f"Forbidden phrase used: \"{phrase}\"",
                 transcript_excerpt=phrase,
             )
-            create_violation(v)
             violations.append(v)
     return violations
 
@@ -310,15 +412,14 @@ def _check_disclosure(
     rule: ComplianceRule,
     customer_id: str,
     call_id: str,
-    agent_text: str,
+    agent_lower: str,
 ) -> list[ComplianceViolation]:
     """Check that required disclosures were made."""
     violations = []
     required = rule.config.get("required_phrases", [])
-    text_lower = agent_text.lower()
 
     for phrase in required:
-        if phrase.lower() not in text_lower:
+        if phrase.lower() not in agent_lower:
             v = ComplianceViolation(
                 customer_id=customer_id,
                 call_id=call_id,
@@ -329,7 +430,6 @@ def _check_disclosure(
                 description=f"Required disclosure missing: \"{phrase}\"",
                 transcript_excerpt="[Disclosure not found in agent speech]",
             )
-            create_violation(v)
             violations.append(v)
     return violations
 
@@ -338,12 +438,11 @@ def _check_pci(
     rule: ComplianceRule,
     customer_id: str,
     call_id: str,
-    full_text: str,
+    pii_counts: dict[str, int],
 ) -> list[ComplianceViolation]:
     """PCI DSS check — detect credit card numbers in transcript."""
     violations = []
-    cc_pattern = PII_REDACTION_PATTERNS["credit_card"]["pattern"]
-    if re.search(cc_pattern, full_text):
+    if "credit_card" in pii_counts:
         v = ComplianceViolation(
             customer_id=customer_id,
             call_id=call_id,
@@ -355,7 +454,6 @@ def _check_pci(
             transcript_excerpt="[Card number redacted]",
             redacted_text="****-****-****-****",
         )
-        create_violation(v)
         violations.append(v)
     return violations
 
@@ -366,9 +464,11 @@ def _check_pci(
 
 def redact_text(text: str) -> str:
     """Redact all PII from text."""
+    if not _DIGIT.search(text):
+        return text
     redacted = text
     for pii_key, pii_info in PII_REDACTION_PATTERNS.items():
-        redacted = re.sub(pii_info["pattern"], pii_info["replacement"], redacted)
+        redacted = _PII_REGEXES[pii_key].sub(pii_info["replacement"], redacted)
     return redacted
 
 
@@ -397,11 +497,6 @@ def log_action(
         metadata=metadata or {},
         ip_address=ip_address,
     )
-
-    if len(_audit_log) >= MAX_AUDIT_ENTRIES:
-        # Trim oldest 20%
-        del _audit_log[:MAX_AUDIT_ENTRIES // 5]
-
     _audit_log.append(entry)
     logger.debug(f"Audit: {action.value} by {user_email} on {resource_type}/{resource_id}")
     return entry
@@ -412,12 +507,14 @@ def get_audit_log(
     action: str = "",
     limit: int = 50,
 ) -> list[AuditLogEntry]:
-    """Retrieve audit log entries."""
-    entries = [e for e in _audit_log if e.customer_id == customer_id]
-    if action:
-        entries = [e for e in entries if e.action.value == action]
-    entries.sort(key=lambda e: e.created_at, reverse=True)
-    return entries[:limit]
+    """Retrieve audit log entries, newest first."""
+    # Entries are appended in time order, so walking backwards yields
+    # newest first and can stop once ``limit`` matches are found
+    entries = (
+        e for e in reversed(_audit_log)
+        if e.customer_id == customer_id and (not action or e.action.value == action)
+    )
+    return list(islice(entries, limit))
 
 
 # ──────────────────────────────────────────────────────────────────
@@ -438,7 +535,7 @@ def get_compliance_summary(customer_id: str) -> ComplianceSummary:
     unresolved = [v for v in violations if not v.resolved]
     recent = sorted(violations, key=lambda v: v.created_at, reverse=True)[:10]
 
-    audit_entries = [e for e in _audit_log if e.customer_id == customer_id]
+    audit_count = sum(1 for e in _audit_log if e.customer_id == customer_id)
 
     return ComplianceSummary(
         total_rules=len(rules),
@@ -448,5 +545,5 @@ def get_compliance_summary(customer_id: str) -> ComplianceSummary:
         violations_by_type=by_type,
         violations_by_severity=by_severity,
         recent_violations=recent,
-        audit_log_count=len(audit_entries),
+        audit_log_count=audit_count,
     )
@@ -54,16 +54,22 @@ def create_connector(connector: Connector) -> Connector:
     return connector
 
 
-def get_connector(connector_id: str) -> Connector | None:
-    return _connectors.get(connector_id)
+def get_connector(connector_id: str, customer_id: str | None = None) -> Connector | None:
+    """Look up a connector; with ``customer_id``, only if that customer owns it."""
+    conn = _connectors.get(connector_id)
+    if conn is None or (customer_id is not None and conn.customer_id != customer_id):
+        return None
+    return conn
 
 
 def list_connectors(customer_id: str) -> list[Connector]:
     return [c for c in _connectors.values() if c.customer_id == customer_id]
 
 
-def update_connector(connector_id: str, updates: dict[str, Any]) -> Connector | None:
-    conn = _connectors.get(connector_id)
+def update_connector(
+    connector_id: str, updates: dict[str, Any], customer_id: str | None = None
+) -> Connector | None:
+    conn = get_connector(connector_id, customer_id)
     if not conn:
         return None
     for key, value in updates.items():
@@ -73,19 +79,21 @@ def update_connector(connector_id: str, updates: dict[str, Any]) -> Connector |
     return conn
 
 
-def delete_connector(connector_id: str) -> bool:
-    removed = _connectors.pop(connector_id, None)
+def delete_connector(connector_id: str, customer_id: str | None = None) -> bool:
+    if get_connector(connector_id, customer_id) is None:
+        return False
+    del _connectors[connector_id]
     _events.pop(connector_id, None)
-    return removed is not None
+    return True
 
 
 # ──────────────────────────────────────────────────────────────────
 # Connection management
 # ──────────────────────────────────────────────────────────────────
 
-def activate_connector(connector_id: str) -> Connector | None:
+def activate_connector(connector_id: str, customer_id: str | None = None) -> Connector | None:
     """Activate a connector (validate config and connect)."""
-    conn = _connectors.get(connector_id)
+    conn = get_connector(connector_id, customer_id)
     if not conn:
         return None
 
@@ -105,9 +113,9 @@ def activate_connector(connector_id: str) -> Connector | None:
     return conn
 
 
-def deactivate_connector(connector_id: str) -> Connector | None:
+def deactivate_connector(connector_id: str, customer_id: str | None = None) -> Connector | None:
     """Deactivate a connector."""
-    conn = _connectors.get(connector_id)
+    conn = get_connector(connector_id, customer_id)
     if not conn:
         return None
     conn.status = ConnectorStatus.INACTIVE
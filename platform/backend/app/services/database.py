@@ -7,7 +7,11 @@ from __future__ import annotations
 
 import hashlib
 import secrets
+import threading
+import time
+from collections.abc import Iterable
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 
 from loguru import logger
 
@@ -19,6 +23,7 @@ from app.models.database import (
     ApiKeyStatus,
     Call,
     CallQAScore,
+    CallResponse,
     CallStatus,
     Customer,
     Document,
@@ -47,6 +52,21 @@ def get_client() -> Client:
     return _supabase
 
 
+@lru_cache(maxsize=4)
+def _month_start(year: int, month: int) -> datetime:
+    return datetime(year, month, 1, tzinfo=timezone.utc)
+
+
+def billing_period_start(now: datetime | None = None) -> datetime:
+    """Start of the current billing period (first of the UTC month).
+
+    The same datetime object is returned all month, so callers keying
+    caches on it compare by identity first.
+    """
+    now = now or datetime.now(timezone.utc)
+    return _month_start(now.year, now.month)
+
+
 def _hash_key(key: str) -> str:
     """Hash an API key with SHA-256."""
     return hashlib.sha256(key.encode()).hexdigest()
@@ -65,6 +85,25 @@ def _generate_api_key() -> tuple[str, str, str]:
 # Customer operations
 # ──────────────────────────────────────────────────────────────────
 
+# Short-lived cache for email lookups (login/signup), holding misses (None)
+# too, so retries and repeated bad logins skip the DB. Entries are dropped
+# whenever the customer row is written. Insertion order is expiry order, so
+# the oldest entry is evicted first.
+_EMAIL_CACHE_TTL = 5.0
+_EMAIL_CACHE_MAX = 10_000
+_email_cache: dict[str, tuple[float, Customer | None]] = {}
+# Customer writes can run in worker threads (see billing checkout)
+_email_cache_lock = threading.Lock()
+
+
+def _forget_customer(customer_id: str) -> None:
+    """Drop cached email lookups for a customer whose row just changed."""
+    with _email_cache_lock:
+        for email, (_, customer) in list(_email_cache.items()):
+            if customer is not None and customer.id == customer_id:
+                _email_cache.pop(email, None)
+
+
 def create_customer(email: str, name: str, password_hash: str) -> Customer:
     """Create a new customer."""
     client = get_client()
@@ -74,16 +113,30 @@ def create_customer(email: str, name: str, password_hash: str) -> Customer:
     data["updated_at"] = data["updated_at"].isoformat()
 
     result = client.table("customers").insert(data).execute()
+    with _email_cache_lock:
+        _email_cache.pop(email, None)
     return Customer(**result.data[0])
 
 
 def get_customer_by_email(email: str) -> Customer | None:
-    """Lookup customer by email."""
+    """Lookup customer by email (cached for a few seconds, misses included)."""
+    now = time.monotonic()
+    with _email_cache_lock:
+        cached = _email_cache.get(email)
+        if cached is not None:
+            if cached[0] > now:
+                return cached[1]
+            _email_cache.pop(email, None)
+
     client = get_client()
     result = client.table("customers").select("*").eq("email", email).execute()
-    if result.data:
-        return Customer(**result.data[0])
-    return None
+    customer = Customer(**result.data[0]) if result.data else None
+
+    with _email_cache_lock:
+        if email not in _email_cache and len(_email_cache) >= _EMAIL_CACHE_MAX:
+            _email_cache.pop(next(iter(_email_cache)), None)
+        _email_cache[email] = (now + _EMAIL_CACHE_TTL, customer)
+    return customer
 
 
 def get_customer_by_id(customer_id: str) -> Customer | None:
@@ -101,6 +154,7 @@ get_customer = get_customer_by_id
 
 def update_customer_plan(customer_id: str, plan: PlanTier) -> Customer | None:
     """Update a customer's plan tier."""
+    _forget_customer(customer_id)
     client = get_client()
     result = (
         client.table("customers")
@@ -115,12 +169,22 @@ def update_customer_plan(customer_id: str, plan: PlanTier) -> Customer | None:
 
 def update_customer_stripe_id(customer_id: str, stripe_customer_id: str) -> None:
     """Set Stripe customer ID."""
+    _forget_customer(customer_id)
     client = get_client()
     client.table("customers").update(
         {"stripe_customer_id": stripe_customer_id, "updated_at": datetime.now(timezone.utc).isoformat()}
     ).eq("id", customer_id).execute()
 
 
+def update_customer_password_hash(customer_id: str, password_hash: str) -> None:
+    """Replace a customer's stored password hash (e.g. after a rehash on login)."""
+    _forget_customer(customer_id)
+    client = get_client()
+    client.table("customers").update(
+        {"password_hash": password_hash, "updated_at": datetime.now(timezone.utc).isoformat()}
+    ).eq("id", customer_id).execute()
+
+
 # ──────────────────────────────────────────────────────────────────
 # API Key operations
 # ──────────────────────────────────────────────────────────────────
@@ -158,6 +222,19 @@ def get_api_keys_for_customer(customer_id: str) -> list[ApiKey]:
     return [ApiKey(**row) for row in result.data]
 
 
+def count_active_api_keys(customer_id: str) -> int:
+    """Count a customer's active API keys without fetching the rows."""
+    client = get_client()
+    result = (
+        client.table("api_keys")
+        .select("id", count="exact", head=True)
+        .eq("customer_id", customer_id)
+        .eq("status", ApiKeyStatus.ACTIVE.value)
+        .execute()
+    )
+    return result.count or 0
+
+
 def validate_api_key(key: str) -> tuple[ApiKey | None, Customer | None]:
     """Validate an API key. Returns (api_key, customer) or (None, None)."""
     client = get_client()
@@ -248,8 +325,7 @@ def get_usage_for_customer(
 
     if start_date is None:
         # Default to current billing period (first of month)
-        now = datetime.now(timezone.utc)
-        start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        start_date = billing_period_start()
     if end_date is None:
         end_date = datetime.now(timezone.utc)
 
@@ -268,7 +344,7 @@ def get_usage_for_customer(
 def get_usage_summary(customer_id: str, plan: PlanTier) -> dict:
     """Get aggregated usage summary for dashboard."""
     now = datetime.now(timezone.utc)
-    period_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    period_start = billing_period_start(now)
 
     records = get_usage_for_customer(customer_id, period_start, now)
 
@@ -310,7 +386,7 @@ def get_usage_summary(customer_id: str, plan: PlanTier) -> dict:
 def check_usage_limit(customer_id: str, plan: PlanTier) -> tuple[bool, float]:
     """Check if customer is within their usage limit. Returns (allowed, remaining_minutes)."""
     now = datetime.now(timezone.utc)
-    period_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    period_start = billing_period_start(now)
     records = get_usage_for_customer(customer_id, period_start, now)
 
     total_seconds = sum(r.duration_seconds for r in records)
@@ -375,6 +451,23 @@ def get_active_subscription(customer_id: str) -> Subscription | None:
     return None
 
 
+def update_subscription_by_stripe_id(stripe_subscription_id: str, changes: dict) -> str | None:
+    """Update a subscription by its Stripe ID in one round-trip.
+
+    Returns the owning customer ID, or None if no such subscription exists.
+    """
+    client = get_client()
+    result = (
+        client.table("subscriptions")
+        .update(changes)
+        .eq("stripe_subscription_id", stripe_subscription_id)
+        .execute()
+    )
+    if result.data:
+        return result.data[0]["customer_id"]
+    return None
+
+
 # ──────────────────────────────────────────────────────────────────
 # Agent operations
 # ──────────────────────────────────────────────────────────────────
@@ -391,8 +484,28 @@ def create_agent(customer_id: str, data: dict) -> Agent:
     return Agent(**result.data[0])
 
 
+# Short-lived cache for get_agent: agent configs change rarely but are read
+# on every call detail, QA and webhook request. Only hits are cached, and
+# update_agent/delete_agent drop the entry. Insertion order is expiry order,
+# as with _email_cache. Call detail reads agents from worker threads, so
+# every access to the dict goes through _agent_cache_lock.
+_AGENT_CACHE_TTL = 30.0
+_AGENT_CACHE_MAX = 2048
+_agent_cache: dict[tuple[str, str], tuple[float, Agent]] = {}
+_agent_cache_lock = threading.Lock()
+
+
 def get_agent(agent_id: str, customer_id: str) -> Agent | None:
-    """Get a single agent by ID, scoped to customer."""
+    """Get a single agent by ID, scoped to customer (cached for 30 seconds)."""
+    key = (agent_id, customer_id)
+    now = time.monotonic()
+    with _agent_cache_lock:
+        cached = _agent_cache.get(key)
+        if cached is not None:
+            if cached[0] > now:
+                return cached[1]
+            _agent_cache.pop(key, None)
+
     client = get_client()
     result = (
         client.table("agents")
@@ -401,9 +514,15 @@ def get_agent(agent_id: str, customer_id: str) -> Agent | None:
         .eq("customer_id", customer_id)
         .execute()
     )
-    if result.data:
-        return Agent(**result.data[0])
-    return None
+    if not result.data:
+        return None
+
+    agent = Agent(**result.data[0])
+    with _agent_cache_lock:
+        if key not in _agent_cache and len(_agent_cache) >= _AGENT_CACHE_MAX:
+            _agent_cache.pop(next(iter(_agent_cache)), None)
+        _agent_cache[key] = (now + _AGENT_CACHE_TTL, agent)
+    return agent
 
 
 def list_agents(customer_id: str) -> list[Agent]:
@@ -437,6 +556,8 @@ def update_agent(agent_id: str, customer_id: str, updates: dict) -> Agent | None
         .eq("customer_id", customer_id)
         .execute()
     )
+    with _agent_cache_lock:
+        _agent_cache.pop((agent_id, customer_id), None)
     if result.data:
         return Agent(**result.data[0])
     return None
@@ -455,20 +576,28 @@ def delete_agent(agent_id: str, customer_id: str) -> bool:
         .eq("customer_id", customer_id)
         .execute()
     )
+    with _agent_cache_lock:
+        _agent_cache.pop((agent_id, customer_id), None)
     return len(result.data) > 0
 
 
-def count_agents(customer_id: str) -> int:
-    """Count active (non-archived) agents for a customer."""
+def get_agent_names(agent_ids: Iterable[str], customer_id: str) -> dict[str, str]:
+    """Map agent IDs to names in one query, scoped to customer.
+
+    IDs that don't exist (or belong to another customer) are absent.
+    """
+    ids = list(agent_ids)
+    if not ids:
+        return {}
     client = get_client()
     result = (
         client.table("agents")
-        .select("id", count="exact")
+        .select("id,name")
+        .in_("id", ids)
         .eq("customer_id", customer_id)
-        .neq("status", "archived")
         .execute()
     )
-    return result.count or 0
+    return {row["id"]: row["name"] for row in result.data or []}
 
 
 # ──────────────────────────────────────────────────────────────────
@@ -485,6 +614,7 @@ def create_call(data: dict) -> Call:
     if row.get("ended_at"):
         row["ended_at"] = row["ended_at"].isoformat()
     result = client.table("calls").insert(row).execute()
+    _period_stats_cache.pop(call.customer_id, None)
     return Call(**result.data[0])
 
 
@@ -503,19 +633,21 @@ def get_call(call_id: str, customer_id: str) -> Call | None:
     return None
 
 
-def list_calls(
+def _filtered_calls_query(
+    columns: str,
     customer_id: str,
-    agent_id: str | None = None,
-    status: str | None = None,
-    direction: str | None = None,
-    limit: int = 50,
-    offset: int = 0,
-) -> tuple[list[Call], int]:
-    """List calls for a customer with optional filters. Returns (calls, total_count)."""
+    agent_id: str | None,
+    status: str | None,
+    direction: str | None,
+    limit: int,
+    offset: int,
+    created_at_gte: datetime | None,
+):
+    """Build the paginated, filtered calls query shared by the list helpers."""
     client = get_client()
     query = (
         client.table("calls")
-        .select("*", count="exact")
+        .select(columns, count="exact")
         .eq("customer_id", customer_id)
     )
 
@@ -525,15 +657,59 @@ def list_calls(
         query = query.eq("status", status)
     if direction:
         query = query.eq("direction", direction)
+    if created_at_gte:
+        query = query.gte("created_at", created_at_gte.isoformat())
+
+    return query.order("created_at", desc=True).range(offset, offset + limit - 1)
 
-    query = query.order("created_at", desc=True).range(offset, offset + limit - 1)
-    result = query.execute()
+
+def list_calls(
+    customer_id: str,
+    agent_id: str | None = None,
+    status: str | None = None,
+    direction: str | None = None,
+    limit: int = 50,
+    offset: int = 0,
+    created_at_gte: datetime | None = None,
+) -> tuple[list[Call], int]:
+    """List calls for a customer with optional filters. Returns (calls, total_count)."""
+    result = _filtered_calls_query(
+        "*", customer_id, agent_id, status, direction, limit, offset, created_at_gte
+    ).execute()
 
     calls = [Call(**row) for row in result.data]
     total = result.count or len(calls)
     return calls, total
 
 
+# Exactly the columns CallResponse carries (agent_name is joined in by the
+# caller); skips the transcript, metadata and recording URL
+_CALL_SUMMARY_COLUMNS = ",".join(f for f in CallResponse.model_fields if f != "agent_name")
+
+
+def list_calls_summary(
+    customer_id: str,
+    agent_id: str | None = None,
+    status: str | None = None,
+    direction: str | None = None,
+    limit: int = 50,
+    offset: int = 0,
+    created_at_gte: datetime | None = None,
+) -> tuple[list[CallResponse], int]:
+    """Like list_calls, but fetch only the columns the call list shows.
+
+    Returns (calls, total_count); each call's agent_name is left empty.
+    """
+    result = _filtered_calls_query(
+        _CALL_SUMMARY_COLUMNS, customer_id, agent_id, status, direction,
+        limit, offset, created_at_gte,
+    ).execute()
+
+    calls = [CallResponse(**row) for row in result.data]
+    total = result.count or len(calls)
+    return calls, total
+
+
 def update_call(call_id: str, updates: dict) -> Call | None:
     """Update a call record (used for in-progress updates)."""
     client = get_client()
@@ -547,7 +723,9 @@ def update_call(call_id: str, updates: dict) -> Call | None:
         .execute()
     )
     if result.data:
-        return Call(**result.data[0])
+        call = Call(**result.data[0])
+        _period_stats_cache.pop(call.customer_id, None)
+        return call
     return None
 
 
@@ -571,10 +749,81 @@ def get_calls_for_agent(
     return [Call(**row) for row in result.data]
 
 
+def get_agent_call_aggregates(customer_id: str) -> dict[str, tuple[int, float]]:
+    """Get (total_calls, avg_duration_seconds) per agent in one query.
+
+    Agents with no calls are absent from the result.
+    """
+    client = get_client()
+    result = client.rpc(
+        "agent_call_aggregates",
+        {"match_customer_id": customer_id},
+    ).execute()
+    return {
+        row["agent_id"]: (row["total_calls"], row["avg_duration"] or 0.0)
+        for row in result.data or []
+    }
+
+
+# Dashboards poll the calls overview; hold each customer's period totals
+# briefly. create_call/update_call drop the entry, so a call starting or
+# ending in this process shows up on the next poll.
+_PERIOD_STATS_TTL = 45.0
+_PERIOD_STATS_MAX = 10_000
+_period_stats_cache: dict[str, tuple[float, datetime, dict]] = {}
+
+
+def get_calls_period_stats(customer_id: str, period_start: datetime) -> dict:
+    """Get call totals since ``period_start`` in one query (cached briefly).
+
+    Returns total, escalated, total_duration and total_cost (cents).
+    """
+    now = time.monotonic()
+    cached = _period_stats_cache.get(customer_id)
+    if cached is not None:
+        expires_at, cached_start, stats = cached
+        if expires_at > now and cached_start == period_start:
+            return stats
+        del _period_stats_cache[customer_id]
+
+    client = get_client()
+    result = client.rpc(
+        "calls_period_stats",
+        {"match_customer_id": customer_id, "period_start": period_start.isoformat()},
+    ).execute()
+    row = result.data[0] if result.data else {}
+    stats = {
+        "total": row.get("total") or 0,
+        "escalated": row.get("escalated") or 0,
+        "total_duration": row.get("total_duration") or 0.0,
+        "total_cost": row.get("total_cost") or 0,
+    }
+
+    if len(_period_stats_cache) >= _PERIOD_STATS_MAX:
+        del _period_stats_cache[next(iter(_period_stats_cache))]
+    _period_stats_cache[customer_id] = (now + _PERIOD_STATS_TTL, period_start, stats)
+    return stats
+
+
+# Only the columns get_agent_stats aggregates; full call rows carry the
+# transcript and metadata JSONB, which dwarf these for long calls
+_AGENT_STATS_COLUMNS = (
+    "status,escalated_to_human,duration_seconds,cost_cents,"
+    "sentiment_score,resolution,created_at"
+)
+
+
 def get_agent_stats(agent_id: str, customer_id: str) -> dict:
     """Compute performance stats for an agent."""
-    # Get all calls for this agent
-    calls = get_calls_for_agent(agent_id, customer_id)
+    # Get all calls for this agent (stats columns only)
+    client = get_client()
+    calls = (
+        client.table("calls")
+        .select(_AGENT_STATS_COLUMNS)
+        .eq("agent_id", agent_id)
+        .eq("customer_id", customer_id)
+        .execute()
+    ).data
 
     total = len(calls)
     if total == 0:
@@ -592,25 +841,35 @@ def get_agent_stats(agent_id: str, customer_id: str) -> dict:
             "calls_by_day": [],
         }
 
-    completed = sum(1 for c in calls if c.status == CallStatus.COMPLETED)
-    failed = sum(1 for c in calls if c.status == CallStatus.FAILED)
-    escalated = sum(1 for c in calls if c.escalated_to_human)
-    total_duration = sum(c.duration_seconds for c in calls)
-    total_cost = sum(c.cost_cents for c in calls)
-
-    sentiments = [c.sentiment_score for c in calls if c.sentiment_score is not None]
-    avg_sentiment = sum(sentiments) / len(sentiments) if sentiments else None
-
-    resolved = sum(1 for c in calls if c.resolution == "resolved")
-    resolution_rate = (resolved / total * 100) if total > 0 else 0.0
-    containment_rate = ((total - escalated) / total * 100) if total > 0 else 0.0
-
-    # Daily breakdown
+    # One pass over the rows for every counter and the daily breakdown
+    completed = failed = escalated = resolved = total_cost = 0
+    total_duration = sentiment_sum = 0.0
+    sentiment_count = 0
     daily: dict[str, int] = {}
     for c in calls:
-        day = c.created_at.strftime("%Y-%m-%d")
+        status = c["status"]
+        if status == CallStatus.COMPLETED:
+            completed += 1
+        elif status == CallStatus.FAILED:
+            failed += 1
+        if c["escalated_to_human"]:
+            escalated += 1
+        if c["resolution"] == "resolved":
+            resolved += 1
+        total_duration += c["duration_seconds"] or 0.0
+        total_cost += c["cost_cents"] or 0
+        sentiment = c["sentiment_score"]
+        if sentiment is not None:
+            sentiment_sum += sentiment
+            sentiment_count += 1
+        # created_at is ISO 8601, so its first 10 chars are the date
+        day = c["created_at"][:10]
         daily[day] = daily.get(day, 0) + 1
 
+    avg_sentiment = sentiment_sum / sentiment_count if sentiment_count else None
+    resolution_rate = resolved / total * 100
+    containment_rate = (total - escalated) / total * 100
+
     return {
         "total_calls": total,
         "completed_calls": completed,
@@ -1137,8 +1396,7 @@ def get_enhanced_analytics(customer_id: str) -> dict:
     client = get_client()
 
     # Get current billing period
-    now = datetime.now(timezone.utc)
-    period_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    period_start = billing_period_start()
 
     # Get all calls this period
     result = (
@@ -37,26 +37,59 @@ from app.models.database import (
 
 _flows: dict[str, ConversationFlow] = {}
 _versions: dict[str, list[FlowVersion]] = {}  # flow_id → versions
+_active_flow_ids: dict[tuple[str, str], str] = {}  # (customer_id, agent_id) → active flow_id
 
 
 def save_flow(flow: ConversationFlow) -> ConversationFlow:
     """Save or update a conversation flow."""
     _flows[flow.id] = flow
+    if flow.is_active:
+        _active_flow_ids[(flow.customer_id, flow.agent_id)] = flow.id
     return flow
 
 
-def get_flow(flow_id: str) -> ConversationFlow | None:
-    return _flows.get(flow_id)
+def get_flow(flow_id: str, customer_id: str | None = None) -> ConversationFlow | None:
+    """Look up a flow; with ``customer_id``, only if that customer owns it."""
+    flow = _flows.get(flow_id)
+    if flow is None or (customer_id is not None and flow.customer_id != customer_id):
+        return None
+    return flow
 
 
 def list_flows(customer_id: str) -> list[ConversationFlow]:
     return [f for f in _flows.values() if f.customer_id == customer_id]
 
 
-def delete_flow(flow_id: str) -> bool:
-    removed = _flows.pop(flow_id, None)
+def delete_flow(flow_id: str, customer_id: str | None = None) -> bool:
+    if get_flow(flow_id, customer_id) is None:
+        return False
+    removed = _flows.pop(flow_id)
     _versions.pop(flow_id, None)
-    return removed is not None
+    if removed.is_active:
+        _active_flow_ids.pop((removed.customer_id, removed.agent_id), None)
+    return True
+
+
+def deactivate_flows_for_agent(customer_id: str, agent_id: str, except_id: str = "") -> None:
+    """Clear the active flag on the agent's active flow, unless it is ``except_id``.
+
+    At most one flow per agent is active, so this is one index lookup
+    rather than a scan of the customer's flows.
+    """
+    active_id = _active_flow_ids.get((customer_id, agent_id))
+    if active_id is None or active_id == except_id:
+        return
+    del _active_flow_ids[(customer_id, agent_id)]
+    previous = _flows.get(active_id)
+    if previous is not None:
+        previous.is_active = False
+
+
+def activate_flow(flow: ConversationFlow) -> ConversationFlow:
+    """Make ``flow`` the single active flow for its agent."""
+    deactivate_flows_for_agent(flow.customer_id, flow.agent_id, except_id=flow.id)
+    flow.is_active = True
+    return save_flow(flow)
 
 
 def save_version(flow_id: str, version: FlowVersion) -> FlowVersion:
@@ -0,0 +1,74 @@
+"""Idempotency-Key replay for state-changing endpoints.
+
+A client that retries POST /billing/checkout or POST /calls after a
+timeout would otherwise create a second Stripe session or dial the
+number twice. Callers that send an ``Idempotency-Key`` header get the
+first request's result back for any retry with the same key: a retry
+that arrives while the first request is still running waits for it.
+
+Results are kept in-process for ten minutes. A request that fails is
+forgotten, so the client can retry it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class IdempotencyCache:
+    """Expiring map of idempotency key to the (eventual) result."""
+
+    def __init__(self, ttl: float = 600.0, maxsize: int = 10_000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        # Insertion order is expiry order, so the oldest entry is evicted first
+        self._entries: dict[Hashable, tuple[float, asyncio.Future]] = {}
+
+    async def run(self, key: Hashable | None, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Return ``await call()``, or the stored result for a repeated key.
+
+        A ``None`` key (no header sent) always runs ``call``.
+        """
+        if key is None:
+            return await call()
+
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, future = entry
+            if expires_at > now:
+                return await asyncio.shield(future)
+            del self._entries[key]
+
+        future = asyncio.get_running_loop().create_future()
+        if len(self._entries) >= self.maxsize:
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (now + self.ttl, future)
+
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            self._forget(key, future)
+            future.cancel()
+            raise
+        except Exception as exc:
+            self._forget(key, future)
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody was waiting
+            raise
+        future.set_result(result)
+        return result
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is future:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
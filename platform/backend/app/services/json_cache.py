@@ -0,0 +1,46 @@
+"""Small LRU of pre-serialized JSON response bodies.
+
+Hot read endpoints (/auth/me, GET /agents/{id}) rebuild and re-validate the
+same response model for a row that rarely changes. Callers key entries by
+``(row.id, row.updated_at)``: the database bumps ``updated_at`` on every
+write, so a changed row gets a new key and stale entries simply age out.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+from fastapi import Response
+from pydantic import BaseModel
+
+
+class JsonCache:
+    """LRU mapping a row key to its serialized response body."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, bytes] = OrderedDict()
+
+    def get(self, key: Hashable, build: Callable[[], BaseModel]) -> bytes:
+        """Return the JSON body for ``key``, serializing ``build()`` on a miss."""
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+            return body
+
+        body = build().model_dump_json().encode()
+        self._entries[key] = body
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return body
+
+    def response(self, key: Hashable, build: Callable[[], BaseModel]) -> Response:
+        """Wrap the cached body in a Response, skipping response_model validation."""
+        return Response(content=self.get(key, build), media_type="application/json")
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,28 @@
+"""Shared Twilio REST client.
+
+Each twilio ``Client`` owns an HTTP session with its own connection pool,
+so building one per request paid a fresh TLS handshake to api.twilio.com
+every time. Routes share one lazily created client instead.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from app.config import settings
+
+_twilio: Any = None
+
+
+def get_twilio_client() -> Any:
+    """Get or create the Twilio client.
+
+    Raises ImportError if the Twilio SDK is not installed, so callers keep
+    their existing simulated-provider fallbacks.
+    """
+    global _twilio
+    if _twilio is None:
+        from twilio.rest import Client as TwilioClient
+
+        _twilio = TwilioClient(settings.twilio_account_sid, settings.twilio_auth_token)
+    return _twilio
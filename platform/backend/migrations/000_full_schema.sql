@@ -19,6 +19,7 @@ CREATE TABLE IF NOT EXISTS customers (
     password_hash TEXT NOT NULL,
     plan TEXT DEFAULT 'free' CHECK (plan IN ('free', 'pro', 'enterprise')),
     stripe_customer_id TEXT,
+    agent_count INTEGER NOT NULL DEFAULT 0,  -- non-archived agents, kept by trigger
     created_at TIMESTAMPTZ DEFAULT NOW(),
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
@@ -306,6 +307,24 @@ CREATE TRIGGER update_customers_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+CREATE OR REPLACE FUNCTION sync_customer_agent_count()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status <> 'archived' THEN
+        UPDATE customers SET agent_count = agent_count - 1 WHERE id = OLD.customer_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status <> 'archived' THEN
+        UPDATE customers SET agent_count = agent_count + 1 WHERE id = NEW.customer_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER sync_customer_agent_count
+    AFTER INSERT OR DELETE OR UPDATE OF status, customer_id ON agents
+    FOR EACH ROW
+    EXECUTE FUNCTION sync_customer_agent_count();
+
 -- ──────────────────────────────────────────────────────────────────
 -- Vector similarity search function
 -- ──────────────────────────────────────────────────────────────────
@@ -340,6 +359,55 @@ BEGIN
 END;
 $$;
 
+-- ──────────────────────────────────────────────────────────────────
+-- Per-agent call roll-up (agent list)
+-- ──────────────────────────────────────────────────────────────────
+CREATE OR REPLACE FUNCTION agent_call_aggregates(
+    match_customer_id UUID
+)
+RETURNS TABLE (
+    agent_id UUID,
+    total_calls BIGINT,
+    avg_duration FLOAT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        c.agent_id,
+        COUNT(*) AS total_calls,
+        COALESCE(AVG(c.duration_seconds), 0) AS avg_duration
+    FROM calls c
+    WHERE c.customer_id = match_customer_id
+    GROUP BY c.agent_id;
+$$;
+
+-- ──────────────────────────────────────────────────────────────────
+-- Billing-period call totals (dashboard overview)
+-- ──────────────────────────────────────────────────────────────────
+CREATE OR REPLACE FUNCTION calls_period_stats(
+    match_customer_id UUID,
+    period_start TIMESTAMPTZ
+)
+RETURNS TABLE (
+    total BIGINT,
+    escalated BIGINT,
+    total_duration FLOAT,
+    total_cost BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        COUNT(*) AS total,
+        COUNT(*) FILTER (WHERE c.escalated_to_human) AS escalated,
+        COALESCE(SUM(c.duration_seconds), 0) AS total_duration,
+        COALESCE(SUM(c.cost_cents), 0) AS total_cost
+    FROM calls c
+    WHERE c.customer_id = match_customer_id
+      AND c.created_at >= period_start;
+$$;
+
 -- ──────────────────────────────────────────────────────────────────
 -- Row Level Security
 -- ──────────────────────────────────────────────────────────────────
@@ -0,0 +1,27 @@
+-- VoxBridge Platform — Agent call roll-up
+-- Per-agent call count and average duration in one query, for the agent list
+-- Run this in Supabase SQL editor after 005_qa_scores.sql
+
+-- ──────────────────────────────────────────────────────────────────
+-- agent_call_aggregates: one row per agent that has calls
+-- Replaces two calls-table queries per agent on GET /agents
+-- ──────────────────────────────────────────────────────────────────
+CREATE OR REPLACE FUNCTION agent_call_aggregates(
+    match_customer_id UUID
+)
+RETURNS TABLE (
+    agent_id UUID,
+    total_calls BIGINT,
+    avg_duration FLOAT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        c.agent_id,
+        COUNT(*) AS total_calls,
+        COALESCE(AVG(c.duration_seconds), 0) AS avg_duration
+    FROM calls c
+    WHERE c.customer_id = match_customer_id
+    GROUP BY c.agent_id;
+$$;
@@ -0,0 +1,36 @@
+-- VoxBridge Platform — Denormalized agent count
+-- Keeps customers.agent_count in step with the customer's non-archived
+-- agents so the plan-limit check on agent creation needs no COUNT query
+-- Run this in Supabase SQL editor after 006_agent_call_aggregates.sql
+
+ALTER TABLE customers ADD COLUMN IF NOT EXISTS agent_count INTEGER NOT NULL DEFAULT 0;
+
+-- Backfill from existing agents
+UPDATE customers c
+SET agent_count = (
+    SELECT COUNT(*) FROM agents a
+    WHERE a.customer_id = c.id AND a.status <> 'archived'
+);
+
+-- ──────────────────────────────────────────────────────────────────
+-- Maintained by trigger, so it moves in the same transaction as the
+-- agent insert / archive / delete that changes it
+-- ──────────────────────────────────────────────────────────────────
+CREATE OR REPLACE FUNCTION sync_customer_agent_count()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status <> 'archived' THEN
+        UPDATE customers SET agent_count = agent_count - 1 WHERE id = OLD.customer_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status <> 'archived' THEN
+        UPDATE customers SET agent_count = agent_count + 1 WHERE id = NEW.customer_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS sync_customer_agent_count ON agents;
+CREATE TRIGGER sync_customer_agent_count
+    AFTER INSERT OR DELETE OR UPDATE OF status, customer_id ON agents
+    FOR EACH ROW
+    EXECUTE FUNCTION sync_customer_agent_count();
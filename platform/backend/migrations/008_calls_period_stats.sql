@@ -0,0 +1,31 @@
+-- VoxBridge Platform — Calls overview roll-up
+-- Totals for the dashboard overview in one query instead of shipping every
+-- call row of the billing period to the API
+-- Run this in Supabase SQL editor after 007_customer_agent_count.sql
+
+-- ──────────────────────────────────────────────────────────────────
+-- calls_period_stats: one row of totals for calls created since
+-- period_start. Served by idx_calls_customer_created
+-- ──────────────────────────────────────────────────────────────────
+CREATE OR REPLACE FUNCTION calls_period_stats(
+    match_customer_id UUID,
+    period_start TIMESTAMPTZ
+)
+RETURNS TABLE (
+    total BIGINT,
+    escalated BIGINT,
+    total_duration FLOAT,
+    total_cost BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        COUNT(*) AS total,
+        COUNT(*) FILTER (WHERE c.escalated_to_human) AS escalated,
+        COALESCE(SUM(c.duration_seconds), 0) AS total_duration,
+        COALESCE(SUM(c.cost_cents), 0) AS total_cost
+    FROM calls c
+    WHERE c.customer_id = match_customer_id
+      AND c.created_at >= period_start;
+$$;
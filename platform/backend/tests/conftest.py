@@ -0,0 +1,67 @@
+"""Shared fixtures for the backend tests."""
+
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+import pytest
+from app.services import database
+
+
+class FakeQuery:
+    """One chained Supabase query against a FakeSupabase table."""
+
+    def __init__(self, client, rows):
+        self.client = client
+        self.rows = rows
+        self.filters = {}
+        self.changes = None
+        self.inserted = None
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def insert(self, row):
+        self.inserted = row
+        return self
+
+    def update(self, changes):
+        self.changes = changes
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def execute(self):
+        time.sleep(self.client.delay)
+        if self.inserted is not None:
+            self.rows.append(dict(self.inserted))
+            return SimpleNamespace(data=[dict(self.inserted)])
+        rows = [r for r in self.rows if all(r.get(c) == v for c, v in self.filters.items())]
+        if self.changes is not None:
+            for row in rows:
+                row.update(self.changes)
+        else:
+            self.client.selects += 1
+        return SimpleNamespace(data=[dict(r) for r in rows])
+
+
+class FakeSupabase:
+    """In-memory stand-in for the Supabase client: rows per table, select count."""
+
+    def __init__(self):
+        self.tables: dict[str, list[dict]] = defaultdict(list)
+        self.selects = 0
+        self.delay = 0.0  # seconds each query takes
+
+    def table(self, name):
+        return FakeQuery(self, self.tables[name])
+
+
+@pytest.fixture
+def fake_supabase(monkeypatch):
+    """Point the database service at an in-memory FakeSupabase."""
+    fake = FakeSupabase()
+    monkeypatch.setattr(database, "get_client", lambda: fake)
+    return fake
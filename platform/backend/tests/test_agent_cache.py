@@ -0,0 +1,64 @@
+"""Tests for the get_agent TTL cache in the database service."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from app.services import database
+
+
+@pytest.fixture
+def client(fake_supabase):
+    fake_supabase.tables["agents"].append(
+        {"id": "agent-1", "customer_id": "cust-1", "name": "Support"}
+    )
+    database._agent_cache.clear()
+    yield fake_supabase
+    database._agent_cache.clear()
+
+
+class TestAgentCache:
+    def test_repeat_lookup_hits_db_once(self, client):
+        assert database.get_agent("agent-1", "cust-1").name == "Support"
+        assert database.get_agent("agent-1", "cust-1").name == "Support"
+        assert client.selects == 1
+
+    def test_miss_is_not_cached(self, client):
+        assert database.get_agent("agent-2", "cust-1") is None
+        assert database.get_agent("agent-2", "cust-1") is None
+        assert client.selects == 2
+
+    def test_scoped_to_customer(self, client):
+        database.get_agent("agent-1", "cust-1")
+        assert database.get_agent("agent-1", "cust-2") is None
+
+    def test_entry_expires(self, client):
+        database.get_agent("agent-1", "cust-1")
+        agent = database._agent_cache[("agent-1", "cust-1")][1]
+        database._agent_cache[("agent-1", "cust-1")] = (0.0, agent)  # already expired
+        database.get_agent("agent-1", "cust-1")
+        assert client.selects == 2
+
+    def test_update_invalidates(self, client):
+        database.get_agent("agent-1", "cust-1")
+        database.update_agent("agent-1", "cust-1", {"name": "Sales"})
+        assert database.get_agent("agent-1", "cust-1").name == "Sales"
+
+    def test_delete_invalidates(self, client):
+        database.get_agent("agent-1", "cust-1")
+        database.delete_agent("agent-1", "cust-1")
+        assert database.get_agent("agent-1", "cust-1").status == "archived"
+
+    def test_concurrent_expiry_from_threads(self, client, monkeypatch):
+        class _SlowDict(dict):
+            def get(self, key, default=None):
+                value = super().get(key, default)
+                time.sleep(0.005)  # let other threads read the same entry
+                return value
+
+        client.delay = 0.01  # keep the entry missing while the others wake
+        expired = _SlowDict({("agent-1", "cust-1"): (0.0, None)})
+        monkeypatch.setattr(database, "_agent_cache", expired)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            agents = list(pool.map(lambda _: database.get_agent("agent-1", "cust-1"), range(4)))
+        assert all(a.name == "Support" for a in agents)
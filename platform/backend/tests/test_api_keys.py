@@ -0,0 +1,58 @@
+"""Tests for the active API key limit on key creation."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from app.api import keys
+from app.models.database import ApiKey, ApiKeyCreate
+from fastapi import HTTPException
+
+
+@pytest.fixture
+def store(monkeypatch):
+    rows: list[ApiKey] = []
+
+    def count_active(customer_id):
+        return sum(1 for k in rows if k.customer_id == customer_id and k.status == "active")
+
+    def create(customer_id, name):
+        time.sleep(0.01)  # widen the window between the count and the insert
+        key = ApiKey(customer_id=customer_id, key_hash="h", key_prefix="vb_test", name=name)
+        rows.append(key)
+        return key, "vb_test_full"
+
+    monkeypatch.setattr(keys, "count_active_api_keys", count_active)
+    monkeypatch.setattr(keys, "create_api_key", create)
+    return rows
+
+
+class TestCreateKeyLimit:
+    @pytest.mark.asyncio
+    async def test_rejects_past_limit(self, store, monkeypatch):
+        monkeypatch.setattr(keys, "MAX_ACTIVE_KEYS", 2)
+        customer = SimpleNamespace(id="cust-1")
+        await keys.create_key(ApiKeyCreate(name="a"), customer)
+        await keys.create_key(ApiKeyCreate(name="b"), customer)
+        with pytest.raises(HTTPException) as exc:
+            await keys.create_key(ApiKeyCreate(name="c"), customer)
+        assert exc.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_concurrent_creates_respect_limit(self, store, monkeypatch):
+        monkeypatch.setattr(keys, "MAX_ACTIVE_KEYS", 2)
+        customer = SimpleNamespace(id="cust-1")
+        results = await asyncio.gather(
+            *(keys.create_key(ApiKeyCreate(name=str(i)), customer) for i in range(5)),
+            return_exceptions=True,
+        )
+        assert len(store) == 2
+        assert sum(isinstance(r, HTTPException) for r in results) == 3
+
+    @pytest.mark.asyncio
+    async def test_limit_is_per_customer(self, store, monkeypatch):
+        monkeypatch.setattr(keys, "MAX_ACTIVE_KEYS", 1)
+        await keys.create_key(ApiKeyCreate(name="a"), SimpleNamespace(id="cust-1"))
+        await keys.create_key(ApiKeyCreate(name="a"), SimpleNamespace(id="cust-2"))
+        assert len(store) == 2
@@ -0,0 +1,133 @@
+"""Tests for the auth service: JWT tokens and password hashing."""
+
+import threading
+
+import bcrypt
+import pytest
+from app.api import auth as auth_api
+from app.config import settings
+from app.models.database import Customer, CustomerLogin
+from app.services import database
+from app.services.auth import (
+    create_access_token,
+    decode_token,
+    hash_password,
+    password_needs_rehash,
+    verify_password,
+)
+from fastapi import HTTPException
+from jose import jwt
+
+
+class TestAccessTokens:
+    def test_round_trip(self):
+        token = create_access_token("cust-1", "a@example.com")
+        payload = decode_token(token)
+        assert payload["sub"] == "cust-1"
+        assert payload["email"] == "a@example.com"
+        assert payload["exp"] > payload["iat"]
+
+    def test_matches_jose_encoding(self):
+        token = create_access_token("cust-1", "a@example.com")
+        payload = decode_token(token)
+        expected = jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+        assert token == expected
+
+    def test_tampered_signature_rejected(self):
+        token = create_access_token("cust-1", "a@example.com")
+        head, body, sig = token.split(".")
+        forged = ".".join([head, body, sig[::-1]])
+        assert decode_token(forged) is None
+
+    def test_wrong_secret_rejected(self):
+        token = jwt.encode(
+            {"sub": "cust-1"}, "not-the-secret", algorithm=settings.jwt_algorithm
+        )
+        assert decode_token(token) is None
+
+
+class TestPasswordHashing:
+    def test_argon2id_round_trip(self):
+        hashed = hash_password("hunter2")
+        assert hashed.startswith("$argon2id$")
+        assert verify_password("hunter2", hashed) is True
+        assert verify_password("wrong", hashed) is False
+
+    def test_legacy_bcrypt_hash_still_verifies(self):
+        legacy = bcrypt.hashpw(b"hunter2", bcrypt.gensalt(rounds=4)).decode()
+        assert verify_password("hunter2", legacy) is True
+        assert verify_password("wrong", legacy) is False
+        assert password_needs_rehash(legacy) is True
+
+    def test_current_hash_needs_no_rehash(self):
+        assert password_needs_rehash(hash_password("hunter2")) is False
+
+    def test_garbage_hash_rejected(self):
+        assert verify_password("hunter2", "not-a-hash") is False
+
+
+class TestCustomerEmailCache:
+    def setup_method(self):
+        database._email_cache.clear()
+
+    def test_repeated_miss_hits_db_once(self, fake_supabase):
+        assert database.get_customer_by_email("nobody@example.com") is None
+        assert database.get_customer_by_email("nobody@example.com") is None
+        assert fake_supabase.selects == 1
+
+    def test_signup_invalidates_cached_miss(self, fake_supabase):
+        assert database.get_customer_by_email("new@example.com") is None
+        database.create_customer("new@example.com", "New", "hash")
+        assert database.get_customer_by_email("new@example.com").name == "New"
+
+    def test_entry_expires(self, fake_supabase):
+        database.get_customer_by_email("x@example.com")
+        database._email_cache["x@example.com"] = (0.0, None)  # already expired
+        database.get_customer_by_email("x@example.com")
+        assert fake_supabase.selects == 2
+
+    def test_customer_write_drops_cached_hit(self, fake_supabase):
+        customer = database.create_customer("a@example.com", "A", "hash")
+        database.get_customer_by_email("a@example.com")
+        database.update_customer_password_hash(customer.id, "new-hash")
+        assert "a@example.com" not in database._email_cache
+
+
+class TestLoginTiming:
+    @pytest.mark.asyncio
+    async def test_unknown_email_still_verifies_a_hash(self, monkeypatch):
+        verified = []
+
+        def recording_verify(plain, hashed):
+            verified.append(hashed)
+            return verify_password(plain, hashed)
+
+        monkeypatch.setattr(auth_api, "get_customer_by_email", lambda email: None)
+        monkeypatch.setattr(auth_api, "verify_password", recording_verify)
+        with pytest.raises(HTTPException) as exc:
+            await auth_api.login(CustomerLogin(email="nobody@example.com", password="hunter2"))
+        assert exc.value.status_code == 401
+        assert verified == [auth_api._DUMMY_PASSWORD_HASH]
+
+    def test_dummy_hash_uses_current_parameters(self):
+        assert verify_password("hunter2", auth_api._DUMMY_PASSWORD_HASH) is False
+        assert password_needs_rehash(auth_api._DUMMY_PASSWORD_HASH) is False
+
+    @pytest.mark.asyncio
+    async def test_legacy_hash_upgraded_off_the_loop(self, monkeypatch):
+        legacy = bcrypt.hashpw(b"hunter2", bcrypt.gensalt(rounds=4)).decode()
+        customer = Customer(id="cust-1", email="a@example.com", name="A", password_hash=legacy)
+        loop_thread = threading.current_thread()
+        upgraded = []
+
+        def record_upgrade(customer_id, new_hash):
+            upgraded.append((customer_id, new_hash, threading.current_thread()))
+
+        monkeypatch.setattr(auth_api, "get_customer_by_email", lambda email: customer)
+        monkeypatch.setattr(auth_api, "update_customer_password_hash", record_upgrade)
+        resp = await auth_api.login(CustomerLogin(email="a@example.com", password="hunter2"))
+        assert resp.access_token
+        [(customer_id, new_hash, thread)] = upgraded
+        assert customer_id == "cust-1"
+        assert new_hash.startswith("$argon2id$")
+        assert thread is not loop_thread
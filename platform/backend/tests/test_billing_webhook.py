@@ -0,0 +1,119 @@
+"""Tests for Stripe webhook verification, dedupe and failure handling."""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import threading
+import time
+
+import httpx
+import pytest
+from app.api import billing
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+SECRET = "whsec_test"
+
+
+def _signed(event: dict) -> tuple[bytes, dict]:
+    payload = json.dumps(event).encode()
+    timestamp = int(time.time())
+    signature = hmac.new(
+        SECRET.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256
+    ).hexdigest()
+    return payload, {"stripe-signature": f"t={timestamp},v1={signature}"}
+
+
+def _event(event_id: str = "evt_1") -> dict:
+    return {
+        "id": event_id,
+        "type": "invoice.payment_failed",
+        "data": {"object": {"id": "in_1"}},
+    }
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(billing.settings, "stripe_webhook_secret", SECRET)
+    billing._seen_events.clear()
+    app = FastAPI()
+    app.include_router(billing.router)
+    yield TestClient(app, raise_server_exceptions=False)
+    billing._seen_events.clear()
+    billing._inflight_events.clear()
+
+
+@pytest.fixture
+def handled(monkeypatch):
+    calls = []
+    monkeypatch.setitem(billing._HANDLERS, "invoice.payment_failed", calls.append)
+    return calls
+
+
+def _post(client, event):
+    payload, headers = _signed(event)
+    return client.post("/billing/webhook", content=payload, headers=headers)
+
+
+class TestStripeWebhook:
+    def test_bad_signature_rejected(self, client, handled):
+        payload, _ = _signed(_event())
+        resp = client.post(
+            "/billing/webhook", content=payload, headers={"stripe-signature": "t=1,v1=bad"}
+        )
+        assert resp.status_code == 400
+        assert handled == []
+
+    def test_event_applied_once(self, client, handled):
+        assert _post(client, _event()).status_code == 200
+        assert _post(client, _event()).status_code == 200
+        assert handled == [{"id": "in_1"}]
+
+    def test_failed_handler_returns_500_and_allows_redelivery(self, client, monkeypatch):
+        attempts = []
+
+        def flaky(data):
+            attempts.append(data)
+            if len(attempts) == 1:
+                raise RuntimeError("database unavailable")
+
+        monkeypatch.setitem(billing._HANDLERS, "invoice.payment_failed", flaky)
+        assert _post(client, _event()).status_code == 500
+        assert "evt_1" not in billing._seen_events
+        assert _post(client, _event()).status_code == 200
+        assert len(attempts) == 2
+
+    @pytest.mark.asyncio
+    async def test_duplicate_during_failed_attempt_is_not_acked(self, client, monkeypatch):
+        started = threading.Event()
+        release = threading.Event()
+        attempts = []
+
+        def flaky(data):
+            attempts.append(data)
+            if len(attempts) == 1:
+                started.set()
+                release.wait(5)
+                raise RuntimeError("database unavailable")
+
+        monkeypatch.setitem(billing._HANDLERS, "invoice.payment_failed", flaky)
+        transport = httpx.ASGITransport(app=client.app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            payload, headers = _signed(_event())
+
+            def deliver():
+                return http.post("/billing/webhook", content=payload, headers=headers)
+
+            first = asyncio.create_task(deliver())
+            await asyncio.to_thread(started.wait, 5)
+            second = asyncio.create_task(deliver())
+            await asyncio.sleep(0.05)  # let the redelivery reach the in-flight wait
+            release.set()
+            responses = await asyncio.gather(first, second)
+            assert [r.status_code for r in responses] == [500, 500]
+            assert len(attempts) == 1
+            assert "evt_1" not in billing._seen_events
+
+            assert (await deliver()).status_code == 200
+            assert len(attempts) == 2
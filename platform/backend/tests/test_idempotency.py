@@ -0,0 +1,77 @@
+"""Tests for Idempotency-Key replay."""
+
+import asyncio
+
+import pytest
+from app.services.idempotency import IdempotencyCache
+
+
+def _counting_call(result="ok"):
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return result
+
+    return call, calls
+
+
+class TestIdempotencyCache:
+    @pytest.mark.asyncio
+    async def test_no_key_always_runs(self):
+        cache = IdempotencyCache()
+        call, calls = _counting_call()
+        await cache.run(None, call)
+        await cache.run(None, call)
+        assert len(calls) == 2
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_repeated_key_replays_result(self):
+        cache = IdempotencyCache()
+        call, calls = _counting_call({"call_id": "c1"})
+        first = await cache.run(("cust-1", "k"), call)
+        second = await cache.run(("cust-1", "k"), call)
+        assert first == second == {"call_id": "c1"}
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_retry_waits_for_first(self):
+        cache = IdempotencyCache()
+        call, calls = _counting_call("done")
+        results = await asyncio.gather(
+            cache.run(("cust-1", "k"), call),
+            cache.run(("cust-1", "k"), call),
+        )
+        assert results == ["done", "done"]
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_keys_scoped_per_customer(self):
+        cache = IdempotencyCache()
+        call, calls = _counting_call()
+        await cache.run(("cust-1", "k"), call)
+        await cache.run(("cust-2", "k"), call)
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_is_forgotten(self):
+        cache = IdempotencyCache()
+
+        async def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await cache.run(("cust-1", "k"), fail)
+        call, calls = _counting_call()
+        assert await cache.run(("cust-1", "k"), call) == "ok"
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_reruns(self):
+        cache = IdempotencyCache(ttl=0.0)
+        call, calls = _counting_call()
+        await cache.run(("cust-1", "k"), call)
+        await cache.run(("cust-1", "k"), call)
+        assert len(calls) == 2
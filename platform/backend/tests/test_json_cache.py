@@ -0,0 +1,83 @@
+"""Tests for the pre-serialized JSON response cache."""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from app.models.database import Customer, PlanTier
+from app.services.auth import customer_json_response, customer_to_response
+from app.services.json_cache import JsonCache
+
+
+def _customer(**overrides) -> Customer:
+    fields = {
+        "id": "cust-1",
+        "email": "a@example.com",
+        "name": "Alice",
+        "updated_at": datetime(2025, 1, 1, tzinfo=timezone.utc),
+    }
+    fields.update(overrides)
+    return Customer(**fields)
+
+
+# ──────────────────────────────────────────────────────────────────
+# JsonCache
+# ──────────────────────────────────────────────────────────────────
+
+class TestJsonCache:
+    def test_hit_skips_build(self):
+        cache = JsonCache()
+        customer = _customer()
+        builds = []
+
+        def build():
+            builds.append(1)
+            return customer_to_response(customer)
+
+        first = cache.get(("cust-1", customer.updated_at), build)
+        second = cache.get(("cust-1", customer.updated_at), build)
+        assert first is second
+        assert len(builds) == 1
+
+    def test_new_updated_at_is_a_miss(self):
+        cache = JsonCache()
+        old = _customer()
+        new = _customer(name="Alice B", updated_at=old.updated_at + timedelta(seconds=1))
+
+        cache.get((old.id, old.updated_at), lambda: customer_to_response(old))
+        body = cache.get((new.id, new.updated_at), lambda: customer_to_response(new))
+        assert json.loads(body)["name"] == "Alice B"
+        assert len(cache) == 2
+
+    def test_evicts_least_recently_used(self):
+        cache = JsonCache(maxsize=2)
+        customer = _customer()
+        build = lambda: customer_to_response(customer)
+
+        cache.get("a", build)
+        cache.get("b", build)
+        cache.get("a", build)  # refresh "a"
+        cache.get("c", build)  # evicts "b"
+        assert len(cache) == 2
+        assert "b" not in cache._entries
+        assert "a" in cache._entries
+
+    def test_clear(self):
+        cache = JsonCache()
+        cache.get("a", lambda: customer_to_response(_customer()))
+        cache.clear()
+        assert len(cache) == 0
+
+
+# ──────────────────────────────────────────────────────────────────
+# Customer response
+# ──────────────────────────────────────────────────────────────────
+
+class TestCustomerJsonResponse:
+    def test_matches_response_model(self):
+        customer = _customer(password_hash="secret", plan=PlanTier.PRO)
+        resp = customer_json_response(customer)
+        assert resp.media_type == "application/json"
+        data = json.loads(resp.body)
+        assert data == customer_to_response(customer).model_dump(mode="json")
+        assert "password_hash" not in data
+        assert data["plan"] == "pro"
@@ -84,6 +84,7 @@ class TestFlowCRUD:
         from app.services import flow_engine as fe
         fe._flows.clear()
         fe._versions.clear()
+        fe._active_flow_ids.clear()
 
     def test_save_and_get(self):
         from app.services import flow_engine as fe
@@ -115,6 +116,35 @@ class TestFlowCRUD:
         from app.services import flow_engine as fe
         assert fe.get_flow("nonexistent") is None
 
+    def test_activate_deactivates_previous_for_agent(self):
+        from app.models.database import ConversationFlow
+        from app.services import flow_engine as fe
+        first = fe.save_flow(ConversationFlow(customer_id="c1", agent_id="a1"))
+        second = fe.save_flow(ConversationFlow(customer_id="c1", agent_id="a1"))
+        other_agent = fe.save_flow(ConversationFlow(customer_id="c1", agent_id="a2"))
+        fe.activate_flow(first)
+        fe.activate_flow(other_agent)
+        fe.activate_flow(second)
+        assert fe.get_flow(first.id).is_active is False
+        assert fe.get_flow(second.id).is_active is True
+        assert fe.get_flow(other_agent.id).is_active is True
+
+    def test_reactivate_same_flow(self):
+        from app.models.database import ConversationFlow
+        from app.services import flow_engine as fe
+        flow = fe.save_flow(ConversationFlow(customer_id="c1", agent_id="a1"))
+        fe.activate_flow(flow)
+        fe.activate_flow(flow)
+        assert fe.get_flow(flow.id).is_active is True
+
+    def test_delete_active_flow_clears_index(self):
+        from app.models.database import ConversationFlow
+        from app.services import flow_engine as fe
+        flow = fe.save_flow(ConversationFlow(customer_id="c1", agent_id="a1"))
+        fe.activate_flow(flow)
+        fe.delete_flow(flow.id)
+        assert ("c1", "a1") not in fe._active_flow_ids
+
 
 # ──────────────────────────────────────────────────────────────────
 # Flow engine — validation
@@ -331,6 +361,8 @@ class TestAlertRuleCRUD:
         from app.services import alerts
         alerts._rules.clear()
         alerts._alerts.clear()
+        alerts._alerts_by_customer.clear()
+        alerts._alert_counts.clear()
 
     def test_create_and_get_rule(self):
         from app.services import alerts
@@ -380,6 +412,8 @@ class TestAlertCRUD:
         from app.services import alerts
         alerts._rules.clear()
         alerts._alerts.clear()
+        alerts._alerts_by_customer.clear()
+        alerts._alert_counts.clear()
 
     def test_create_alert(self):
         from app.services import alerts
@@ -427,6 +461,46 @@ class TestAlertCRUD:
         assert summary.warning == 1
         assert summary.info == 1
 
+    def test_list_newest_first_with_filters(self):
+        from app.models.database import Alert, AlertSeverity
+        from app.services import alerts
+        created = [
+            alerts.create_alert(Alert(customer_id="c1", title=f"A{i}", severity=sev))
+            for i, sev in enumerate([AlertSeverity.CRITICAL, AlertSeverity.INFO] * 3)
+        ]
+        alerts.create_alert(Alert(customer_id="c2", severity=AlertSeverity.CRITICAL))
+        critical = alerts.list_alerts("c1", severity="critical", limit=2)
+        assert [a.title for a in critical] == ["A4", "A2"]
+        assert alerts.list_alerts("c1")[0].id == created[-1].id
+
+    def test_summary_counts_follow_acknowledgement_and_eviction(self):
+        from app.models.database import Alert, AlertSeverity
+        from app.services import alerts
+        first = alerts.create_alert(Alert(customer_id="c1", severity=AlertSeverity.CRITICAL))
+        second = alerts.create_alert(Alert(customer_id="c1", severity=AlertSeverity.INFO))
+        alerts.acknowledge_alert(second.id)
+        alerts.acknowledge_alert(second.id)  # second ack is a no-op
+        summary = alerts.get_alert_summary("c1")
+        assert (summary.total, summary.unacknowledged, summary.critical) == (2, 1, 1)
+
+        alerts.acknowledge_all("c1")
+        assert alerts.get_alert_summary("c1").unacknowledged == 0
+
+        for _ in range(alerts.MAX_ALERTS - 1):
+            alerts.create_alert(Alert(customer_id="c2"))
+        assert alerts.get_alert(first.id) is None
+        summary = alerts.get_alert_summary("c1")
+        assert (summary.total, summary.critical, summary.info) == (1, 0, 1)
+
+    def test_eviction_drops_oldest_from_customer_index(self):
+        from app.models.database import Alert
+        from app.services import alerts
+        first = alerts.create_alert(Alert(customer_id="c1"))
+        for _ in range(alerts.MAX_ALERTS):
+            alerts.create_alert(Alert(customer_id="c1"))
+        assert alerts.get_alert(first.id) is None
+        assert len(alerts.list_alerts("c1", limit=alerts.MAX_ALERTS + 1)) == alerts.MAX_ALERTS
+
 
 # ──────────────────────────────────────────────────────────────────
 # Alert service — evaluation engine
@@ -437,6 +511,8 @@ class TestAlertEvaluation:
         from app.services import alerts
         alerts._rules.clear()
         alerts._alerts.clear()
+        alerts._alerts_by_customer.clear()
+        alerts._alert_counts.clear()
 
     def test_high_volume_triggers(self):
         from app.services import alerts
@@ -505,5 +581,7 @@ class TestAlertEvaluation:
         from app.models.database import AlertRule, AlertType
         alerts.create_rule(AlertRule(customer_id="c1", alert_type=AlertType.HIGH_VOLUME, config={"threshold": 10}))
         alerts.create_rule(AlertRule(customer_id="c1", alert_type=AlertType.PII_DETECTED))
-        triggered = alerts.evaluate_all_rules("c1", {"calls_in_window": 50, "pii_detected": True})
+        alerts.create_rule(AlertRule(customer_id="c1", alert_type=AlertType.HIGH_VOLUME, config={"threshold": 100}))
+        triggered, evaluated = alerts.evaluate_all_rules("c1", {"calls_in_window": 50, "pii_detected": True})
         assert len(triggered) == 2
+        assert evaluated == 3
@@ -394,6 +394,14 @@ class TestConnectorCRUD:
     def test_delete_nonexistent(self):
         assert conn_svc.delete_connector("nonexistent") is False
 
+    def test_scoped_to_customer(self):
+        conn = Connector(customer_id=CUSTOMER_ID, name="Owned")
+        conn_svc.create_connector(conn)
+        assert conn_svc.update_connector(conn.id, {"name": "X"}, "other-customer") is None
+        assert conn_svc.activate_connector(conn.id, "other-customer") is None
+        assert conn_svc.delete_connector(conn.id, "other-customer") is False
+        assert conn_svc.get_connector(conn.id, CUSTOMER_ID).name == "Owned"
+
 
 # ──────────────────────────────────────────────────────────────────────
 # Connector activation & config validation tests
@@ -20,6 +20,9 @@ Tests cover:
   - Compliance summary
 """
 
+import asyncio
+import threading
+
 import pytest
 
 from app.models.database import (
@@ -44,12 +47,16 @@ CUSTOMER_ID = "cust_test_sprint9"
 def _clear_stores():
     """Clear all in-memory stores before each test."""
     assist_svc._sessions.clear()
+    assist_svc._recent_utterances.clear()
     comp_svc._rules.clear()
+    comp_svc._rules_by_customer.clear()
     comp_svc._violations.clear()
     comp_svc._audit_log.clear()
     yield
     assist_svc._sessions.clear()
+    assist_svc._recent_utterances.clear()
     comp_svc._rules.clear()
+    comp_svc._rules_by_customer.clear()
     comp_svc._violations.clear()
     comp_svc._audit_log.clear()
 
@@ -107,19 +114,23 @@ class TestAssistSessionCRUD:
     def test_end_session(self):
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
-        assist_svc.add_transcript_entry(s.id, "caller", "Hello")
-        result = assist_svc.end_session(s.id)
+        assist_svc.add_transcript_entry(s, "caller", "Hello")
+        result = assist_svc.end_session(s)
         assert result.status == AssistSessionStatus.COMPLETED
         assert result.ended_at is not None
         assert result.call_summary != ""
 
-    def test_end_nonexistent_session(self):
-        assert assist_svc.end_session("nonexistent") is None
+    def test_get_session_for_customer(self):
+        s = AssistSession(customer_id=CUSTOMER_ID)
+        assist_svc.create_session(s)
+        assert assist_svc.get_session_for_customer(s.id, CUSTOMER_ID) is s
+        assert assist_svc.get_session_for_customer(s.id, "other") is None
+        assert assist_svc.get_session_for_customer("nonexistent", CUSTOMER_ID) is None
 
     def test_delete_session(self):
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
-        assert assist_svc.delete_session(s.id) is True
+        assert assist_svc.delete_session(s) is True
         assert assist_svc.get_session(s.id) is None
 
 
@@ -131,7 +142,7 @@ class TestPIIDetection:
     def test_detect_ssn(self):
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
-        suggestions = assist_svc.add_transcript_entry(s.id, "caller", "My SSN is 123-45-6789")
+        suggestions = assist_svc.add_transcript_entry(s, "caller", "My SSN is 123-45-6789")
         compliance = [su for su in suggestions if su.type == SuggestionType.COMPLIANCE]
         assert len(compliance) >= 1
         assert s.pii_detected is True
@@ -139,14 +150,14 @@ class TestPIIDetection:
     def test_detect_credit_card(self):
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
-        suggestions = assist_svc.add_transcript_entry(s.id, "caller", "My card is 4111 1111 1111 1111")
+        suggestions = assist_svc.add_transcript_entry(s, "caller", "My card is 4111 1111 1111 1111")
         compliance = [su for su in suggestions if su.type == SuggestionType.COMPLIANCE]
         assert len(compliance) >= 1
 
     def test_no_pii(self):
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
-        suggestions = assist_svc.add_transcript_entry(s.id, "caller", "I just wanted to say hello")
+        suggestions = assist_svc.add_transcript_entry(s, "caller", "I just wanted to say hello")
         compliance = [su for su in suggestions if su.type == SuggestionType.COMPLIANCE]
         assert len(compliance) == 0
         assert s.pii_detected is False
@@ -161,7 +172,7 @@ class TestSentimentDetection:
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
         suggestions = assist_svc.add_transcript_entry(
-            s.id, "caller", "This is ridiculous! I'm furious! This is the worst service ever!"
+            s, "caller", "This is ridiculous! I'm furious! This is the worst service ever!"
         )
         sentiment = [su for su in suggestions if su.type == SuggestionType.SENTIMENT]
         assert len(sentiment) >= 1
@@ -170,13 +181,13 @@ class TestSentimentDetection:
     def test_mild_negative(self):
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
-        suggestions = assist_svc.add_transcript_entry(s.id, "caller", "I'm frustrated with this")
+        suggestions = assist_svc.add_transcript_entry(s, "caller", "I'm frustrated with this")
         assert s.caller_sentiment == "negative"
 
     def test_neutral_sentiment(self):
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
-        assist_svc.add_transcript_entry(s.id, "caller", "I'd like to check my order status")
+        assist_svc.add_transcript_entry(s, "caller", "I'd like to check my order status")
         assert s.caller_sentiment == "neutral"
 
 
@@ -188,7 +199,7 @@ class TestResponseSuggestions:
     def test_order_status_suggestion(self):
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
-        suggestions = assist_svc.add_transcript_entry(s.id, "caller", "I want to track my order")
+        suggestions = assist_svc.add_transcript_entry(s, "caller", "I want to track my order")
         responses = [su for su in suggestions if su.type == SuggestionType.RESPONSE]
         assert len(responses) >= 1
         assert any("order" in r.content.lower() for r in responses)
@@ -196,21 +207,21 @@ class TestResponseSuggestions:
     def test_refund_suggestion(self):
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
-        suggestions = assist_svc.add_transcript_entry(s.id, "caller", "I need a refund")
+        suggestions = assist_svc.add_transcript_entry(s, "caller", "I need a refund")
         responses = [su for su in suggestions if su.type == SuggestionType.RESPONSE]
         assert len(responses) >= 1
 
     def test_knowledge_suggestion(self):
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
-        suggestions = assist_svc.add_transcript_entry(s.id, "caller", "How do I reset my password?")
+        suggestions = assist_svc.add_transcript_entry(s, "caller", "How do I reset my password?")
         knowledge = [su for su in suggestions if su.type == SuggestionType.KNOWLEDGE]
         assert len(knowledge) >= 1
 
     def test_cancel_action_suggestion(self):
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
-        suggestions = assist_svc.add_transcript_entry(s.id, "caller", "I want to cancel my subscription")
+        suggestions = assist_svc.add_transcript_entry(s, "caller", "I want to cancel my subscription")
         actions = [su for su in suggestions if su.type == SuggestionType.ACTION]
         assert len(actions) >= 1
 
@@ -218,15 +229,32 @@ class TestResponseSuggestions:
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
         # Agent speech shouldn't generate response suggestions (but may generate PII checks)
-        suggestions = assist_svc.add_transcript_entry(s.id, "agent", "Let me help you with that")
+        suggestions = assist_svc.add_transcript_entry(s, "agent", "Let me help you with that")
         responses = [su for su in suggestions if su.type == SuggestionType.RESPONSE]
         assert len(responses) == 0
 
+    def test_repeated_utterance_not_resuggested(self):
+        s = AssistSession(customer_id=CUSTOMER_ID)
+        assist_svc.create_session(s)
+        first = assist_svc.add_transcript_entry(s, "caller", "I need a refund")
+        again = assist_svc.add_transcript_entry(s, "caller", "  i need a REFUND ")
+        assert any(su.type == SuggestionType.RESPONSE for su in first)
+        assert not any(su.type == SuggestionType.RESPONSE for su in again)
+        assert len(s.transcript) == 2
+
+    def test_repeated_utterance_still_checked_for_pii(self):
+        s = AssistSession(customer_id=CUSTOMER_ID)
+        assist_svc.create_session(s)
+        assist_svc.add_transcript_entry(s, "caller", "My SSN is 123-45-6789")
+        again = assist_svc.add_transcript_entry(s, "caller", "My SSN is 123-45-6789")
+        assert any(su.type == SuggestionType.COMPLIANCE for su in again)
+        assert s.compliance_warnings == 2
+
     def test_no_suggestions_for_ended_session(self):
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
-        assist_svc.end_session(s.id)
-        suggestions = assist_svc.add_transcript_entry(s.id, "caller", "Hello")
+        assist_svc.end_session(s)
+        suggestions = assist_svc.add_transcript_entry(s, "caller", "Hello")
         assert len(suggestions) == 0
 
 
@@ -238,25 +266,25 @@ class TestAcceptDismiss:
     def test_accept_suggestion(self):
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
-        suggestions = assist_svc.add_transcript_entry(s.id, "caller", "I need help with a problem")
+        suggestions = assist_svc.add_transcript_entry(s, "caller", "I need help with a problem")
         if suggestions:
-            result = assist_svc.accept_suggestion(s.id, suggestions[0].id)
+            result = assist_svc.accept_suggestion(s, suggestions[0].id)
             assert result.accepted is True
             assert s.suggestions_accepted == 1
 
     def test_dismiss_suggestion(self):
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
-        suggestions = assist_svc.add_transcript_entry(s.id, "caller", "I need help with a problem")
+        suggestions = assist_svc.add_transcript_entry(s, "caller", "I need help with a problem")
         if suggestions:
-            result = assist_svc.dismiss_suggestion(s.id, suggestions[0].id)
+            result = assist_svc.dismiss_suggestion(s, suggestions[0].id)
             assert result.accepted is False
             assert s.suggestions_dismissed == 1
 
     def test_accept_nonexistent(self):
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
-        assert assist_svc.accept_suggestion(s.id, "fake_id") is None
+        assert assist_svc.accept_suggestion(s, "fake_id") is None
 
 
 # ──────────────────────────────────────────────────────────────────
@@ -267,23 +295,23 @@ class TestCallSummary:
     def test_generate_summary(self):
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
-        assist_svc.add_transcript_entry(s.id, "caller", "I need help with my order")
-        assist_svc.add_transcript_entry(s.id, "agent", "Sure, let me look that up")
-        assist_svc.end_session(s.id)
+        assist_svc.add_transcript_entry(s, "caller", "I need help with my order")
+        assist_svc.add_transcript_entry(s, "agent", "Sure, let me look that up")
+        assist_svc.end_session(s)
         assert "2 exchanges" in s.call_summary
 
     def test_generate_next_steps_with_pii(self):
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
-        assist_svc.add_transcript_entry(s.id, "caller", "My SSN is 123-45-6789")
-        assist_svc.end_session(s.id)
+        assist_svc.add_transcript_entry(s, "caller", "My SSN is 123-45-6789")
+        assist_svc.end_session(s)
         assert any("PII" in step for step in s.next_steps)
 
     def test_generate_next_steps_negative(self):
         s = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s)
-        assist_svc.add_transcript_entry(s.id, "caller", "This is terrible! Worst service! Unacceptable! I'm furious!")
-        assist_svc.end_session(s.id)
+        assist_svc.add_transcript_entry(s, "caller", "This is terrible! Worst service! Unacceptable! I'm furious!")
+        assist_svc.end_session(s)
         assert any("follow up" in step.lower() for step in s.next_steps)
 
     def test_empty_transcript_summary(self):
@@ -308,8 +336,8 @@ class TestAssistSummary:
         s2 = AssistSession(customer_id=CUSTOMER_ID)
         assist_svc.create_session(s1)
         assist_svc.create_session(s2)
-        assist_svc.add_transcript_entry(s1.id, "caller", "I need help")
-        assist_svc.add_transcript_entry(s2.id, "caller", "I need a refund")
+        assist_svc.add_transcript_entry(s1, "caller", "I need help")
+        assist_svc.add_transcript_entry(s2, "caller", "I need a refund")
         summary = assist_svc.get_assist_summary(CUSTOMER_ID)
         assert summary.total_sessions == 2
         assert summary.active_sessions == 2
@@ -378,6 +406,20 @@ class TestComplianceRuleCRUD:
         assert comp_svc.delete_rule(r.id) is True
         assert comp_svc.get_rule(r.id) is None
 
+    def test_list_rules_only_returns_own(self):
+        comp_svc.create_rule(ComplianceRule(customer_id=CUSTOMER_ID, name="Mine"))
+        other = comp_svc.create_rule(ComplianceRule(customer_id="other-customer", name="Theirs"))
+        assert [r.name for r in comp_svc.list_rules(CUSTOMER_ID)] == ["Mine"]
+        comp_svc.delete_rule(other.id)
+        assert comp_svc.list_rules("other-customer") == []
+
+    def test_scoped_to_customer(self):
+        r = ComplianceRule(customer_id=CUSTOMER_ID, name="Owned")
+        comp_svc.create_rule(r)
+        assert comp_svc.update_rule(r.id, {"name": "X"}, "other-customer") is None
+        assert comp_svc.delete_rule(r.id, "other-customer") is False
+        assert comp_svc.get_rule(r.id, CUSTOMER_ID).name == "Owned"
+
     def test_create_defaults(self):
         rules = comp_svc.create_default_rules(CUSTOMER_ID)
         assert len(rules) == 4
@@ -412,6 +454,14 @@ class TestPIIRedaction:
         result = comp_svc.redact_text(text)
         assert result == text
 
+    def test_digits_without_pii_unchanged(self):
+        text = "Your order 42 ships in 3 days"
+        assert comp_svc.redact_text(text) == text
+
+    def test_redact_cvv_and_dob(self):
+        result = comp_svc.redact_text("CVV: 123, born 04/15/1990")
+        assert result == "CVV: ***, born **/**/****"
+
 
 # ──────────────────────────────────────────────────────────────────
 # Transcript scanning tests
@@ -449,6 +499,85 @@ class TestTranscriptScanning:
         assert len(disclosure) >= 1
         assert "disclosure missing" in disclosure[0].description.lower()
 
+    def test_scan_card_number_hits_pii_and_pci_rules(self):
+        comp_svc.create_default_rules(CUSTOMER_ID)
+        transcript = [{"role": "caller", "content": "Card 4111 1111 1111 1111, card 4111-1111-1111-1111"}]
+        violations = comp_svc.scan_transcript(CUSTOMER_ID, "call_cc", transcript)
+        by_type = {v.rule_type: v for v in violations}
+        assert "2 occurrence(s)" in by_type[ComplianceRuleType.PII_REDACTION].transcript_excerpt
+        assert by_type[ComplianceRuleType.PCI_DSS].severity == "critical"
+
+    def test_scan_batch_keeps_item_order(self):
+        comp_svc.create_default_rules(CUSTOMER_ID)
+        clean = [{"role": "agent", "content": "This call may be recorded. How can I help?"}]
+        leaky = [{"role": "caller", "content": "My SSN is 123-45-6789"}]
+        results = comp_svc.scan_transcripts(CUSTOMER_ID, [("call_a", clean), ("call_b", leaky)])
+        assert len(results) == 2
+        assert all(v.call_id == "call_a" for v in results[0])
+        assert any(v.call_id == "call_b" and "Social Security" in v.description for v in results[1])
+
+    def test_find_violations_does_not_touch_store(self):
+        comp_svc.create_default_rules(CUSTOMER_ID)
+        transcript = [{"role": "caller", "content": "My SSN is 123-45-6789"}]
+        [found] = comp_svc.find_violations(
+            comp_svc.enabled_rules(CUSTOMER_ID), CUSTOMER_ID, [("call_f", transcript)],
+        )
+        assert found
+        assert comp_svc._violations == {}
+        comp_svc.record_violations(found)
+        assert len(comp_svc.list_violations(CUSTOMER_ID, limit=100)) == len(found)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_scans_while_listing(self, monkeypatch):
+        from app.api import compliance as comp_api
+
+        loop_thread = threading.current_thread()
+
+        class _LoopOnlyStore(dict):
+            """Fails if the violation store is written from a worker thread."""
+
+            def __setitem__(self, key, value):
+                assert threading.current_thread() is loop_thread
+                super().__setitem__(key, value)
+
+            def pop(self, *args):
+                assert threading.current_thread() is loop_thread
+                return super().pop(*args)
+
+        monkeypatch.setattr(comp_svc, "_violations", _LoopOnlyStore())
+        monkeypatch.setattr(comp_svc, "MAX_VIOLATIONS", 20)
+        comp_svc.create_default_rules(CUSTOMER_ID)
+        transcript = [
+            {"role": "caller", "content": "SSN 123-45-6789, card 4111 1111 1111 1111"},
+            {"role": "agent", "content": "I guarantee that's your fault"},
+        ]
+        done = False
+
+        async def read_while_scanning():
+            while not done:
+                for v in comp_svc.list_violations(CUSTOMER_ID, limit=1000):
+                    v.resolved = True  # make them evictable
+                comp_svc.get_compliance_summary(CUSTOMER_ID)
+                await asyncio.sleep(0)
+
+        reader = asyncio.create_task(read_while_scanning())
+        results = await asyncio.gather(
+            *(
+                comp_api.scan_transcript(
+                    comp_api.ScanRequest(call_id=f"call_{i}", transcript=transcript),
+                    customer_id=CUSTOMER_ID,
+                )
+                for i in range(10)
+            ),
+            comp_api.scan_transcripts(
+                comp_api.ScanBatchRequest(items=[{"call_id": "call_b", "transcript": transcript}]),
+                customer_id=CUSTOMER_ID,
+            ),
+        )
+        done = True
+        await reader
+        assert all(r["violations_found"] > 0 for r in results)
+
     def test_scan_disclosure_present(self):
         comp_svc.create_default_rules(CUSTOMER_ID)
         transcript = [
@@ -561,6 +690,15 @@ class TestAuditLog:
             comp_svc.log_action(CUSTOMER_ID, "a@b.com", AuditAction.LOGIN, description=f"Login {i}")
         entries = comp_svc.get_audit_log(CUSTOMER_ID, limit=5)
         assert len(entries) == 5
+        assert entries[0].description == "Login 19"
+
+    def test_oldest_entries_dropped_when_full(self, monkeypatch):
+        from collections import deque
+        monkeypatch.setattr(comp_svc, "_audit_log", deque(maxlen=3))
+        for i in range(5):
+            comp_svc.log_action(CUSTOMER_ID, "a@b.com", AuditAction.LOGIN, description=f"Login {i}")
+        entries = comp_svc.get_audit_log(CUSTOMER_ID)
+        assert [e.description for e in entries] == ["Login 4", "Login 3", "Login 2"]
 
 
 # ──────────────────────────────────────────────────────────────────